@@ -0,0 +1,266 @@
+"""
+Time and memory-profile the pipeline functions on synthetic data.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run_benchmarks --sizes small,medium --output bench.json
+    python -m benchmarks.run_benchmarks --sizes 20x750x10000 --compare bench.json
+
+Sizes are presets (see SIZES) or 'TICKERSxDAYSxHEADLINES'.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_analyst_ratings, generate_stock_folder
+from src.correlation_analysis import calculate_correlation
+from src.data_loader import load_analyst_ratings, load_stock_data_from_folder
+from src.data_processing import merge_stock_and_ratings
+from src.feature_engineering import add_technical_indicators
+from src.indicator_engine import add_technical_indicators_panel
+from src.sentimental_analysis import add_sentiment_analysis
+
+# name -> (tickers, trading days per ticker, headlines)
+SIZES = {
+    "small": (10, 500, 5_000),
+    "medium": (50, 1_000, 50_000),
+    "large": (200, 2_500, 500_000),
+}
+
+
+def parse_size(spec):
+    """
+    Resolve a preset name or 'TICKERSxDAYSxHEADLINES' into a (name, dims) pair.
+    """
+    if spec in SIZES:
+        return spec, SIZES[spec]
+    try:
+        tickers, days, headlines = (int(part) for part in spec.lower().split("x"))
+    except ValueError:
+        raise ValueError(
+            f"Unknown size '{spec}': use one of {sorted(SIZES)} or TICKERSxDAYSxHEADLINES"
+        )
+    return spec, (tickers, days, headlines)
+
+
+def _rows(value):
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(df) for df in value.values())
+    return None
+
+
+def measure(func, *args, memory=True, **kwargs):
+    """
+    Run `func` once for timing and, with `memory`, once more under tracemalloc.
+
+    The two passes are separate so tracing overhead does not inflate the
+    timing. Output printed by the pipeline functions is discarded.
+
+    Returns:
+        tuple: (result of the timed call, metrics dict).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        result = func(*args, **kwargs)
+        metrics = {
+            "wall_s": round(time.perf_counter() - wall_start, 6),
+            "cpu_s": round(time.process_time() - cpu_start, 6),
+            "peak_alloc_mb": None,
+            "rows_out": _rows(result),
+        }
+        if memory:
+            tracemalloc.start()
+            try:
+                func(*args, **kwargs)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            metrics["peak_alloc_mb"] = round(peak / 2**20, 3)
+    return result, metrics
+
+
+def run_size(name, dims, workdir, seed=0, memory=True):
+    """
+    Generate one synthetic dataset and benchmark every pipeline function on it.
+
+    Returns:
+        list: One record per benchmarked function.
+    """
+    n_tickers, n_days, n_headlines = dims
+    stock_folder = os.path.join(workdir, "yfinance_data")
+    ratings_file = os.path.join(workdir, "raw_analyst_ratings.csv")
+    tickers = generate_stock_folder(stock_folder, n_tickers, n_days, seed=seed)
+    generate_analyst_ratings(ratings_file, n_headlines, tickers, n_days, seed=seed)
+
+    records = []
+
+    def bench(benchmark, func, *args, **kwargs):
+        result, metrics = measure(func, *args, memory=memory, **kwargs)
+        records.append(
+            {
+                "size": name,
+                "tickers": n_tickers,
+                "days": n_days,
+                "headlines": n_headlines,
+                "benchmark": benchmark,
+                **metrics,
+            }
+        )
+        logging.info(f"[{name}] {benchmark}: {metrics}")
+        return result
+
+    stock_data = bench(
+        "load_stock_data_from_folder",
+        load_stock_data_from_folder,
+        stock_folder,
+        use_cache=False,
+    )
+    load_stock_data_from_folder(stock_folder)  # populate the Parquet cache
+    bench(
+        "load_stock_data_from_folder[cached]",
+        load_stock_data_from_folder,
+        stock_folder,
+    )
+    ratings = bench("load_analyst_ratings", load_analyst_ratings, ratings_file)
+    bench(
+        "add_sentiment_analysis[textblob]",
+        lambda df: add_sentiment_analysis(df.copy()),
+        ratings,
+    )
+    scored = bench(
+        "add_sentiment_analysis[lexicon]",
+        lambda df: add_sentiment_analysis(df.copy(), backend="lexicon"),
+        ratings,
+    )
+    enriched = bench(
+        "add_technical_indicators",
+        lambda data: add_technical_indicators(dict(data)),
+        stock_data,
+    )
+    bench("add_technical_indicators_panel", add_technical_indicators_panel, stock_data)
+    merged = bench("merge_stock_and_ratings", merge_stock_and_ratings, enriched, scored)
+    bench("calculate_correlation", calculate_correlation, merged)
+    return records
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """
+    Wall-time ratio (current / baseline) for every (size, benchmark) in both runs.
+    """
+    previous = {(r["size"], r["benchmark"]): r for r in baseline["results"]}
+    rows = []
+    for record in results:
+        old = previous.get((record["size"], record["benchmark"]))
+        if old and old["wall_s"]:
+            rows.append(
+                {
+                    "size": record["size"],
+                    "benchmark": record["benchmark"],
+                    "baseline_wall_s": old["wall_s"],
+                    "wall_s": record["wall_s"],
+                    "ratio": round(record["wall_s"] / old["wall_s"], 3),
+                }
+            )
+    return rows
+
+
+@contextlib.contextmanager
+def _quiet_logging(level=logging.WARNING):
+    """
+    Raise the root logger's level while benchmarking, so the pipeline's INFO
+    logs do not add to the timings, and restore it afterwards.
+    """
+    root = logging.getLogger()
+    previous = root.level
+    root.setLevel(level)
+    try:
+        yield
+    finally:
+        root.setLevel(previous)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline on synthetic data."
+    )
+    parser.add_argument(
+        "--sizes",
+        default="small",
+        help="Comma-separated presets (%s) or TICKERSxDAYSxHEADLINES."
+        % ", ".join(SIZES),
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed.")
+    parser.add_argument(
+        "--output", default="bench_results.json", help="JSON results file."
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the tracemalloc pass."
+    )
+    parser.add_argument(
+        "--compare", help="Previous results file to report wall-time ratios against."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [parse_size(spec.strip()) for spec in args.sizes.split(",") if spec.strip()]
+
+    results = []
+    with _quiet_logging():
+        for name, dims in sizes:
+            with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as workdir:
+                results.extend(
+                    run_size(
+                        name, dims, workdir, seed=args.seed, memory=not args.no_memory
+                    )
+                )
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(results, json.load(f))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for record in report.get("comparison", results):
+        print(json.dumps(record))
+    print(f"Results written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
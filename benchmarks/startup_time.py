@@ -0,0 +1,220 @@
+"""
+Startup- and import-time regression check for the `src/main.py` subcommands.
+
+Two measurements per subcommand, both with `python -X importtime`:
+
+- startup: `main.py <command> --help`, which parses the arguments and exits.
+  Heavy dependencies must only be imported on first use, so the check fails
+  if one shows up here or if a command exceeds the `--max-ms` budget.
+- run: `main.py <command>` on a tiny synthetic dataset in a fresh working
+  directory, so no checkpoint skips a stage. This reaches the lazy imports
+  of the command's stages, and the check fails if a heavy dependency that
+  is not in the command's `COMMAND_HEAVY_MODULES` is imported, i.e. one
+  that regressed into its path.
+
+Usage (from the repository root):
+
+    python -m benchmarks.startup_time --max-ms 1500 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+MAIN = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "main.py"
+)
+HEAVY_MODULES = ("talib", "pynance", "sklearn", "textblob", "scipy", "matplotlib")
+# TextBlob imports NLTK, which imports SciPy and scikit-learn when installed.
+_TEXTBLOB = ("textblob", "scipy", "sklearn")
+# Heavy dependencies each subcommand may import while it runs.
+COMMAND_HEAVY_MODULES = {
+    "run": (*_TEXTBLOB, "talib", "matplotlib"),
+    "load": (),
+    "sentiment": _TEXTBLOB,
+    "indicators": ("talib",),
+    "merge": (*_TEXTBLOB, "talib"),
+    "correlate": (*_TEXTBLOB, "talib"),
+    "report": (*_TEXTBLOB, "talib", "matplotlib"),
+    "live": _TEXTBLOB,
+    "serve": (*_TEXTBLOB, "talib"),
+}
+# Extra arguments that make a long-running subcommand return, and a log line
+# after which it is stopped.
+COMMAND_RUN_ARGS = {
+    "live": ["--duration", "0.5", "--workers", "1"],
+    "serve": ["--port", "0"],
+}
+COMMAND_STOP_AFTER = {"serve": "Serving features on"}
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        tuple: (total import time of top-level imports in ms, set of imported
+               top-level package names).
+    """
+    total_us = 0
+    packages = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        packages.add(name.strip().split(".")[0])
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, packages
+
+
+def measure_startup(command):
+    """
+    Import time and heavy modules loaded when starting `main.py <command>`.
+    """
+    argv = [sys.executable, "-X", "importtime", MAIN]
+    if command is not None:
+        argv.append(command)
+    proc = subprocess.run(
+        argv + ["--help"], capture_output=True, text=True, cwd=os.path.dirname(MAIN)
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"'{' '.join(argv)} --help' failed:\n{proc.stderr[-2000:]}")
+    import_ms, packages = parse_importtime(proc.stderr)
+    return {
+        "command": command or "(none)",
+        "import_ms": round(import_ms, 1),
+        "heavy_modules": sorted(packages.intersection(HEAVY_MODULES)),
+    }
+
+
+def make_workspace(directory, n_tickers=3, n_days=60, n_headlines=200):
+    """
+    Write a tiny synthetic `data/` folder for `main.py` to run on.
+
+    Args:
+        directory (str): Working directory for the run.
+    """
+    from benchmarks.synthetic_data import (
+        generate_analyst_ratings,
+        generate_stock_folder,
+    )
+
+    data_dir = os.path.join(directory, "data")
+    tickers = generate_stock_folder(
+        os.path.join(data_dir, "yfinance_data"), n_tickers, n_days
+    )
+    generate_analyst_ratings(
+        os.path.join(data_dir, "raw_analyst_ratings", "raw_analyst_ratings.csv"),
+        n_headlines,
+        tickers,
+        n_days,
+    )
+
+
+def measure_command(command, timeout=300):
+    """
+    Import time and heavy modules loaded while `main.py <command>` runs on a
+    tiny synthetic dataset in a fresh working directory.
+
+    Returns:
+        dict: 'command', 'import_ms', 'heavy_modules' and
+              'unexpected_modules' (heavy modules outside the command's
+              `COMMAND_HEAVY_MODULES`).
+
+    Raises:
+        RuntimeError: If the command fails or times out.
+    """
+    argv = [sys.executable, "-X", "importtime", MAIN, command]
+    argv += COMMAND_RUN_ARGS.get(command, [])
+    stop_after = COMMAND_STOP_AFTER.get(command)
+    with tempfile.TemporaryDirectory() as workdir:
+        make_workspace(workdir)
+        proc = subprocess.Popen(
+            argv,
+            cwd=workdir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        lines = []
+        try:
+            for line in proc.stderr:
+                lines.append(line)
+                if stop_after is not None and stop_after in line:
+                    proc.terminate()
+                    break
+            proc.wait()
+        finally:
+            timer.cancel()
+            proc.stderr.close()
+    stderr = "".join(lines)
+    if stop_after is not None:
+        completed = stop_after in stderr
+    else:
+        completed = proc.returncode == 0 and "execution failed" not in stderr
+    if not completed:
+        raise RuntimeError(f"'{' '.join(argv)}' failed:\n{stderr[-2000:]}")
+    import_ms, packages = parse_importtime(stderr)
+    heavy = sorted(packages.intersection(HEAVY_MODULES))
+    return {
+        "command": command,
+        "import_ms": round(import_ms, 1),
+        "heavy_modules": heavy,
+        "unexpected_modules": [
+            name for name in heavy if name not in COMMAND_HEAVY_MODULES[command]
+        ],
+    }
+
+
+def main(argv=None):
+    sys.path.insert(0, os.path.dirname(MAIN))
+    from main import COMMAND_HELP
+
+    parser = argparse.ArgumentParser(description="Check main.py startup import time.")
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Fail if a command imports for longer at startup.",
+    )
+    parser.add_argument(
+        "--startup-only",
+        action="store_true",
+        help="Skip running the subcommands on synthetic data.",
+    )
+    parser.add_argument("--output", help="Optional JSON results file.")
+    args = parser.parse_args(argv)
+
+    startup = [measure_startup(command) for command in [None, *COMMAND_HELP]]
+    failures = [
+        r["command"]
+        for r in startup
+        if r["heavy_modules"]
+        or (args.max_ms is not None and r["import_ms"] > args.max_ms)
+    ]
+    runs = []
+    if not args.startup_only:
+        runs = [measure_command(command) for command in COMMAND_HELP]
+        failures += [f"{r['command']} (run)" for r in runs if r["unexpected_modules"]]
+    for record in startup:
+        print(json.dumps({"mode": "startup", **record}))
+    for record in runs:
+        print(json.dumps({"mode": "run", **record}))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"startup": startup, "run": runs}, f, indent=2)
+    if failures:
+        print(f"Startup regression in: {failures}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
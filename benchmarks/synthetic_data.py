@@ -0,0 +1,123 @@
+import os
+import numpy as np
+import pandas as pd
+
+PUBLISHERS = [
+    "Benzinga Newsdesk",
+    "Lisa Levin",
+    "ETF Professor",
+    "Paul Quintaro",
+    "Reuters",
+    "Zacks",
+]
+HEADLINE_TEMPLATES = [
+    "{t} shares are trading higher after strong quarterly results",
+    "{t} stock falls sharply as guidance disappoints",
+    "Analyst upgrades {t} to Buy, raises price target",
+    "{t} downgraded to Neutral on weak demand",
+    "Why Is {t} Stock Trading Lower Today?",
+    "{t} reports record revenue, beats estimates!",
+    "Stocks That Hit 52-Week Highs On {d}",
+    "{t} is not a good buy right now, says analyst",
+    "Earnings Scheduled For {d}",
+    "{t} announces new buyback program",
+]
+
+
+def ticker_symbols(n_tickers):
+    """
+    Deterministic, unique upper-case ticker symbols ("AAA", "AAB", ...).
+    """
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    idx = np.arange(n_tickers)
+    return [
+        "".join(letters[[(i // 676) % 26, (i // 26) % 26, i % 26]]) for i in idx
+    ]
+
+
+def generate_stock_folder(folder, n_tickers, n_days, seed=0, start="2015-01-01"):
+    """
+    Write `n_tickers` random-walk price files in the yfinance CSV layout.
+
+    Args:
+        folder (str): Output folder (created if needed).
+        n_tickers (int): Number of `<TICKER>_historical_data.csv` files.
+        n_days (int): Business days per file.
+        seed (int): Random seed; equal seeds produce identical files.
+        start (str): First trading date.
+
+    Returns:
+        list: Ticker symbols written.
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_days).strftime("%Y-%m-%d")
+    tickers = ticker_symbols(n_tickers)
+    for ticker in tickers:
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+        spread = close * rng.uniform(0, 0.02, n_days)
+        pd.DataFrame(
+            {
+                "Date": dates,
+                "Open": close + rng.normal(0, 0.5, n_days) * spread,
+                "High": close + spread,
+                "Low": close - spread,
+                "Close": close,
+                "Adj Close": close,
+                "Volume": rng.integers(10_000, 5_000_000, n_days),
+                "Dividends": 0.0,
+                "Stock Splits": 0.0,
+            }
+        ).to_csv(os.path.join(folder, f"{ticker}_historical_data.csv"), index=False)
+    return tickers
+
+
+def generate_analyst_ratings(
+    path, n_headlines, tickers, n_days, publishers=PUBLISHERS, seed=0,
+    start="2015-01-01",
+):
+    """
+    Write `n_headlines` analyst-rating rows in the raw_analyst_ratings layout.
+
+    Headlines are drawn from fixed templates, so duplicates and syndicated
+    variants occur as in the real feed. Both 'stock' and 'symbol' columns are
+    written.
+
+    Args:
+        path (str): Output CSV path.
+        n_headlines (int): Number of rows.
+        tickers (list): Symbols to draw from.
+        n_days (int): Calendar span of publication dates, in business days.
+        publishers (list): Publisher names to draw from.
+        seed (int): Random seed; equal seeds produce identical files.
+        start (str): First publication date.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(start, periods=n_days)
+    published = days[rng.integers(0, n_days, n_headlines)] + pd.to_timedelta(
+        rng.integers(0, 24 * 3600, n_headlines), unit="s"
+    )
+    symbols = np.asarray(tickers)[rng.integers(0, len(tickers), n_headlines)]
+    templates = np.asarray(HEADLINE_TEMPLATES)[
+        rng.integers(0, len(HEADLINE_TEMPLATES), n_headlines)
+    ]
+    day_names = published.strftime("%B %d, %Y")
+    headlines = [
+        template.format(t=symbol, d=day)
+        for template, symbol, day in zip(templates, symbols, day_names)
+    ]
+    pd.DataFrame(
+        {
+            "headline": headlines,
+            "url": [f"https://example.com/{i}" for i in range(n_headlines)],
+            "publisher": np.asarray(publishers)[
+                rng.integers(0, len(publishers), n_headlines)
+            ],
+            "date": published.strftime("%Y-%m-%d %H:%M:%S") + "-04:00",
+            "stock": symbols,
+            "symbol": symbols,
+        }
+    ).to_csv(path)
@@ -0,0 +1,114 @@
+import logging
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Column roles used by the compact dtype policy.
+SYMBOL_COLUMNS = ("stock", "symbol", "stock_name")
+CATEGORY_COLUMNS = ("publisher",)
+TEXT_COLUMNS = ("headline", "url")
+TEXT_DTYPE = "string[pyarrow]"
+
+
+def memory_mb(data):
+    """
+    Deep memory footprint in MB of a DataFrame or a dict of DataFrames.
+    """
+    if isinstance(data, dict):
+        return sum(memory_mb(df) for df in data.values())
+    if isinstance(data, pd.DataFrame):
+        return data.memory_usage(deep=True).sum() / 2**20
+    return 0.0
+
+
+def symbol_dtype(*symbol_sets):
+    """
+    Shared categorical dictionary for ticker symbols.
+
+    Every symbol column compacted with the same dtype shares one set of
+    categories, so joins and comparisons on them stay on integer codes.
+
+    Args:
+        *symbol_sets: Iterables of symbols (columns, index, dict keys).
+
+    Returns:
+        pd.CategoricalDtype: Sorted union of the non-null symbols.
+    """
+    symbols = set()
+    for values in symbol_sets:
+        if not isinstance(values, (pd.Series, pd.Index)):
+            values = pd.Series(list(values))
+        symbols.update(values.dropna().astype(str).unique())
+    return pd.CategoricalDtype(sorted(symbols))
+
+
+def _downcast_integers(series):
+    if series.isna().any():
+        return series
+    kind = "unsigned" if (series >= 0).all() else "integer"
+    return pd.to_numeric(series, downcast=kind)
+
+
+def compact_frame(df, symbols=None):
+    """
+    Apply the compact dtype policy to one DataFrame.
+
+    - float64 columns (prices, indicators, polarity) become float32;
+    - integer columns such as volume are downcast to the smallest type that
+      holds them;
+    - symbol columns become categoricals using `symbols` as the shared
+      dictionary, publishers become categoricals;
+    - headlines and URLs become Arrow-backed strings.
+
+    Args:
+        df (pd.DataFrame): Frame to compact. It is not modified.
+        symbols (pd.CategoricalDtype, optional): Shared symbol dictionary;
+            built from the frame's own symbol columns when omitted.
+
+    Returns:
+        pd.DataFrame: The compacted frame.
+    """
+    present = [col for col in SYMBOL_COLUMNS if col in df.columns]
+    if symbols is None and present:
+        symbols = symbol_dtype(*(df[col] for col in present))
+
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if col in present:
+            values = series.astype(str).where(series.notna())
+            converted[col] = values.astype(symbols)
+        elif col in CATEGORY_COLUMNS:
+            converted[col] = series.astype("category")
+        elif col in TEXT_COLUMNS:
+            converted[col] = series.astype(TEXT_DTYPE)
+        elif series.dtype == np.float64:
+            converted[col] = series.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            converted[col] = _downcast_integers(series)
+    return df.assign(**converted) if converted else df
+
+
+def compact_stage(stage, data, symbols=None):
+    """
+    Compact a stage output and log its memory footprint before and after.
+
+    Args:
+        stage (str): Stage name used in the log line.
+        data (pd.DataFrame or dict): Frame or dict of frames to compact.
+        symbols (pd.CategoricalDtype, optional): Shared symbol dictionary.
+
+    Returns:
+        Same type as `data`, compacted.
+    """
+    before = memory_mb(data)
+    if isinstance(data, dict):
+        compacted = {key: compact_frame(df, symbols) for key, df in data.items()}
+    else:
+        compacted = compact_frame(data, symbols)
+    after = memory_mb(compacted)
+    logging.info(f"{stage} memory: {before:.2f} MB -> {after:.2f} MB (compact)")
+    return compacted
@@ -1,51 +1,120 @@
-from scipy.stats import pearsonr
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import logging
 
+try:
+    from .data_processing import merge_stock_and_rollup
+    from .price_store import PriceStore
+    from .profiling import instrument
+except ImportError:
+    from data_processing import merge_stock_and_rollup
+    from price_store import PriceStore
+    from profiling import instrument
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
 
+@instrument("calculate_correlation")
 def calculate_correlation(
-    df, sentiment_col="Sentiment_Polarity", returns_col="Daily_Returns"
+    df,
+    sentiment_col="Sentiment_Polarity",
+    returns_col="Daily_Returns",
+    plot=False,
+    price_store=None,
+    ticker_col="stock_name",
+    rollup=None,
+    stock_data=None,
 ):
     """
-    Calculate and visualize the correlation between sentiment and stock returns.
+    Calculate and optionally visualize the correlation between sentiment and stock returns.
 
     Args:
         df (pd.DataFrame): Merged DataFrame containing sentiment and stock data.
         sentiment_col (str): Name of the sentiment column.
         returns_col (str): Name of the daily returns column.
+        plot (bool): Draw a (blocking) scatter plot of the daily means.
+        price_store (PriceStore, optional): Read `returns_col` from the store
+            for each row's (`ticker_col`, day) instead of from `df`, so scored
+            ratings can be correlated without merging them first.
+        ticker_col (str): Ticker column used with `price_store`.
+        rollup (SentimentRollup, optional): Read daily sentiment from the
+            rollup instead of `df` (which is then not used). Returns come from
+            `stock_data` or `price_store`, and each (ticker, day) return is
+            weighted by its headline count, which gives the same daily means
+            as the merged frame in O(days x tickers). Days without returns
+            are skipped.
+        stock_data (dict or PriceStore, optional): Stock bars used with `rollup`.
 
     Returns:
         float: Pearson correlation coefficient.
     """
     try:
-        # Check required columns
-        required_columns = {"date", sentiment_col, returns_col}
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Missing columns in the DataFrame: {missing_columns}")
-
-        # Group sentiment and returns by date
-        daily_sentiment = df.groupby("date")[sentiment_col].mean().reset_index()
-        daily_returns = df.groupby("date")[returns_col].mean().reset_index()
-
-        # Merge sentiment and returns data
-        analysis_data = pd.merge(daily_sentiment, daily_returns, on="date")
+        if rollup is not None:
+            prices = stock_data if stock_data is not None else price_store
+            if prices is None:
+                raise ValueError("A rollup needs stock_data or price_store for the returns.")
+            daily = merge_stock_and_rollup(prices, rollup)
+            if returns_col not in daily.columns:
+                raise ValueError(f"Missing columns in the DataFrame: {[returns_col]}")
+            daily = daily.dropna(subset=[returns_col])
+            totals = (
+                daily.assign(_weighted=daily[returns_col] * daily["Headline_Count"])
+                .groupby("date")[["Sentiment_Sum", "Headline_Count", "_weighted"]]
+                .sum()
+            )
+            analysis_data = pd.DataFrame(
+                {
+                    "date": totals.index,
+                    sentiment_col: totals["Sentiment_Sum"] / totals["Headline_Count"],
+                    returns_col: totals["_weighted"] / totals["Headline_Count"],
+                }
+            ).reset_index(drop=True)
+        elif price_store is not None:
+            if ticker_col not in df.columns:
+                raise ValueError(f"Missing columns in the DataFrame: {[ticker_col]}")
+            df = df.assign(
+                **{
+                    returns_col: price_store.lookup(
+                        returns_col, df[ticker_col], df["date"]
+                    )
+                }
+            )
+
+        if rollup is None:
+            # Check required columns
+            required_columns = {"date", sentiment_col, returns_col}
+            missing_columns = [col for col in required_columns if col not in df.columns]
+            if missing_columns:
+                raise ValueError(f"Missing columns in the DataFrame: {missing_columns}")
+
+            # Group sentiment and returns by date
+            daily_sentiment = df.groupby("date")[sentiment_col].mean().reset_index()
+            daily_returns = df.groupby("date")[returns_col].mean().reset_index()
+
+            # Merge sentiment and returns data
+            analysis_data = pd.merge(daily_sentiment, daily_returns, on="date")
         if analysis_data.empty:
             raise ValueError(
                 "No data available for correlation analysis after merging."
             )
 
-        # Compute Pearson Correlation
+        from scipy.stats import pearsonr
+
+        # Compute Pearson Correlation (in float64, also for compact inputs)
         correlation, _ = pearsonr(
-            analysis_data[sentiment_col], analysis_data[returns_col]
+            analysis_data[sentiment_col].to_numpy(dtype=float),
+            analysis_data[returns_col].to_numpy(dtype=float),
         )
+        correlation = float(correlation)
         logging.info(f"Pearson Correlation Coefficient: {correlation:.4f}")
 
+        if not plot:
+            return correlation
+
+        import matplotlib.pyplot as plt
+
         # Visualization
         plt.figure(figsize=(8, 6))
         plt.scatter(
@@ -66,3 +135,201 @@ def calculate_correlation(
     except Exception as e:
         logging.error(f"Error during correlation calculation: {e}")
         raise
+
+
+def _pearson_from_sums(n, sx, sy, sxx, syy, sxy, min_periods):
+    """
+    Pearson r and two-sided p-value from paired sums, element-wise.
+    """
+    from scipy.stats import t as t_dist
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx**2) * (n * syy - sy**2)
+        r = np.clip(cov / np.sqrt(var), -1.0, 1.0)
+        r = np.where((n >= min_periods) & (var > 0), r, np.nan)
+        dof = n - 2
+        t_stat = r * np.sqrt(dof / np.maximum(1.0 - r**2, 1e-300))
+        p = np.where(dof > 0, 2 * t_dist.sf(np.abs(t_stat), np.maximum(dof, 1)), np.nan)
+    return r, np.where(np.isnan(r), np.nan, p)
+
+
+def _center(panel):
+    """
+    Subtract each column's mean over its non-NaN cells.
+
+    Pearson r does not change, but the sums of squares and products stay
+    small, so n*Σxy - ΣxΣy does not lose digits to cancellation when the
+    values sit far from zero (prices, long windows).
+    """
+    valid = ~np.isnan(panel)
+    counts = valid.sum(axis=0)
+    totals = np.where(valid, panel, 0.0).sum(axis=0)
+    means = np.divide(totals, counts, out=np.zeros(panel.shape[1]), where=counts > 0)
+    return panel - means
+
+
+def _paired_terms(x, y):
+    """
+    Per-cell terms (n, x, y, x^2, y^2, xy) with cells missing either value zeroed.
+    """
+    mask = ~(np.isnan(x) | np.isnan(y))
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    return mask.astype(float), x, y, x * x, y * y, x * y
+
+
+def _shift(panel, lag):
+    """
+    Shift a dates x tickers panel so row t holds the value of row t + lag.
+    """
+    out = np.full(panel.shape, np.nan)
+    if lag >= 0:
+        out[: len(panel) - lag] = panel[lag:]
+    else:
+        out[-lag:] = panel[:lag]
+    return out
+
+
+CORRELATION_MATRIX_COLUMNS = [
+    "kind",
+    "ticker",
+    "lag",
+    "window_end",
+    "n",
+    "correlation",
+    "p_value",
+]
+
+
+@instrument("calculate_correlation_matrix")
+def calculate_correlation_matrix(
+    df,
+    sentiment_col="Sentiment_Polarity",
+    returns_col="Daily_Returns",
+    ticker_col="stock_name",
+    stock_data=None,
+    max_lag=0,
+    window=None,
+    min_periods=3,
+):
+    """
+    Compute per-ticker, lagged and rolling sentiment/return correlations in one pass.
+
+    Daily mean sentiment and returns are pivoted into dates x tickers panels
+    and centered per ticker. Every correlation is derived from sums of x, y,
+    x^2, y^2 and xy over those panels (compensated rolling sums for the
+    windows), so no per-ticker or per-window `pearsonr` loop is needed.
+
+    Args:
+        df (pd.DataFrame): Merged DataFrame containing sentiment and stock data.
+        sentiment_col (str): Name of the sentiment column.
+        returns_col (str): Name of the daily returns column.
+        ticker_col (str): Name of the ticker column.
+        stock_data (dict or PriceStore, optional): Enriched stock data. If
+            given, returns are taken from every trading day, not only days
+            with headlines, which lagged correlations need. From a
+            `PriceStore` only the tickers in `df` are read.
+        max_lag (int): Correlate sentiment on day t with returns on day
+            t + lag (in trading days) for every lag in [-max_lag, max_lag].
+        window (int, optional): Rolling window length in days.
+        min_periods (int): Minimum paired observations for a coefficient.
+
+    Returns:
+        pd.DataFrame: Tidy rows of 'kind' ('ticker', 'lag' or 'rolling'),
+                      'ticker', 'lag', 'window_end', 'n', 'correlation' and
+                      'p_value'. Empty when `stock_data` holds none of the
+                      tickers in `df`.
+    """
+    required_columns = {"date", ticker_col, sentiment_col}
+    if stock_data is None:
+        required_columns.add(returns_col)
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns in the DataFrame: {missing_columns}")
+
+    days = pd.to_datetime(df["date"]).dt.normalize()
+    sentiment = df.pivot_table(
+        index=days, columns=ticker_col, values=sentiment_col, aggfunc="mean"
+    )
+    if stock_data is not None:
+        shared = [ticker for ticker in stock_data if ticker in sentiment.columns]
+        if not shared:
+            logging.warning("No ticker of the ratings has stock data to correlate.")
+            return pd.DataFrame(columns=CORRELATION_MATRIX_COLUMNS)
+    if isinstance(stock_data, PriceStore):
+        store = stock_data.select(tickers=shared)
+        returns = pd.DataFrame(
+            store.panel(returns_col).T,
+            index=store.dates.normalize(),
+            columns=store.tickers,
+        )
+    elif stock_data is not None:
+        returns = pd.concat(
+            {
+                ticker: stock.set_index(pd.to_datetime(stock["date"]).dt.normalize())[
+                    returns_col
+                ]
+                for ticker, stock in stock_data.items()
+                if ticker in shared
+            },
+            axis=1,
+            sort=True,
+        )
+    else:
+        returns = df.pivot_table(
+            index=days, columns=ticker_col, values=returns_col, aggfunc="mean"
+        )
+    dates = sentiment.index.union(returns.index)
+    tickers = sentiment.columns
+    x = _center(sentiment.reindex(index=dates, columns=tickers).to_numpy(dtype=float))
+    y = _center(returns.reindex(index=dates, columns=tickers).to_numpy(dtype=float))
+
+    frames = []
+    for lag in range(-max_lag, max_lag + 1):
+        sums = [term.sum(axis=0) for term in _paired_terms(x, _shift(y, lag))]
+        r, p = _pearson_from_sums(*sums, min_periods)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "kind": "ticker" if lag == 0 else "lag",
+                    "ticker": tickers,
+                    "lag": lag,
+                    "window_end": pd.NaT,
+                    "n": sums[0].astype(int),
+                    "correlation": r,
+                    "p_value": p,
+                }
+            )
+        )
+
+    if window:
+        # pandas' rolling sum adds and removes values with Kahan compensation,
+        # so errors do not build up along the panel like a cumsum difference.
+        sums = [
+            pd.DataFrame(term).rolling(window, min_periods=1).sum().to_numpy()
+            for term in _paired_terms(x, y)
+        ]
+        sums = [total[window - 1 :] for total in sums]
+        r, p = _pearson_from_sums(*sums, min_periods)
+        ends = np.repeat(dates[window - 1 :], len(tickers))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "kind": "rolling",
+                    "ticker": np.tile(tickers, len(r)),
+                    "lag": 0,
+                    "window_end": ends,
+                    "n": np.rint(sums[0]).astype(int).ravel(),
+                    "correlation": r.ravel(),
+                    "p_value": p.ravel(),
+                }
+            ).dropna(subset=["correlation"])
+        )
+
+    result = pd.concat(frames, ignore_index=True)
+    logging.info(
+        f"Computed {len(result)} correlations for {len(tickers)} tickers "
+        f"(max_lag={max_lag}, window={window})."
+    )
+    return result
@@ -1,18 +1,164 @@
+import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import os
 
+try:
+    from .compact import compact_stage
+    from .profiling import instrument
+except ImportError:
+    from compact import compact_stage
+    from profiling import instrument
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+STOCK_CACHE_DIRNAME = ".parquet_cache"
+STOCK_CACHE_MANIFEST = "manifest.json"
+# Part of every cache entry; bump it when the parsing below changes so that
+# frames cached by an older version are parsed again.
+STOCK_SCHEMA_VERSION = 2
+
+# Explicit schema of the yfinance price files, so pandas never has to infer
+# dtypes. Columns outside this layout are not loaded. Volume is read as float64
+# so a blank cell or a value like '1000.0' does not fail the whole file.
+STOCK_SCHEMA = {
+    "Date": "str",
+    "Open": "float64",
+    "High": "float64",
+    "Low": "float64",
+    "Close": "float64",
+    "Adj Close": "float64",
+    "Volume": "float64",
+    "Dividends": "float64",
+    "Stock Splits": "float64",
+}
+STOCK_REQUIRED_COLUMNS = {"Date", "Open", "High", "Low", "Close", "Volume"}
+STOCK_DATE_FORMAT = "%Y-%m-%d"
+
+# Hit/miss counts of the most recent cached folder load.
+last_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _read_stock_csv(filepath):
+    """
+    Read and clean a single stock price CSV file using the pinned price schema.
+
+    The header is read first so files missing required columns are rejected
+    without parsing their body. Dates are parsed with STOCK_DATE_FORMAT;
+    values it does not match (a time or UTC offset) fall back to flexible
+    parsing of their wall-clock part. Volume is stored as int64 again when
+    every value is a whole number.
+
+    Args:
+        filepath (str): Path to the stock price CSV file.
+
+    Returns:
+        pd.DataFrame or None: Cleaned DataFrame sorted by date, or None if the
+                              file is missing required columns.
+    """
+    header = pd.read_csv(filepath, nrows=0).columns
+    if not STOCK_REQUIRED_COLUMNS.issubset(header):
+        return None
+
+    usecols = [col for col in header if col in STOCK_SCHEMA]
+    stock_df = pd.read_csv(
+        filepath,
+        usecols=usecols,
+        dtype={col: STOCK_SCHEMA[col] for col in usecols},
+    )
+    raw_dates = stock_df["Date"]
+    dates = pd.to_datetime(raw_dates, format=STOCK_DATE_FORMAT, errors="coerce")
+    failed = (dates.isna() & raw_dates.notna()).to_numpy()
+    if failed.any():
+        dates[failed] = pd.to_datetime(
+            raw_dates[failed].str.slice(0, 19), format="mixed", errors="coerce"
+        )
+    stock_df["Date"] = dates
+    volume = stock_df["Volume"]
+    if volume.notna().all() and (volume % 1 == 0).all():
+        stock_df["Volume"] = volume.astype(np.int64)
+    stock_df.columns = stock_df.columns.str.lower()
+    stock_df.dropna(subset=["date"], inplace=True)
+    stock_df.sort_values("date", inplace=True)
+    return stock_df
 
-def load_stock_data_from_folder(folder_path):
+
+def _ingest_stock_file(filepath):
+    """
+    Process-pool task wrapping `_read_stock_csv`.
+
+    Returns:
+        tuple: (DataFrame or None, error message or None).
+    """
+    try:
+        return _read_stock_csv(filepath), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _load_cache_manifest(cache_dir):
+    """
+    Read the cache manifest, returning an empty one if it is missing or corrupt.
+    """
+    manifest_path = os.path.join(cache_dir, STOCK_CACHE_MANIFEST)
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache_manifest(cache_dir, manifest):
+    """
+    Atomically write the cache manifest.
+    """
+    manifest_path = os.path.join(cache_dir, STOCK_CACHE_MANIFEST)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _save_cache_frame(df, cache_file):
+    """
+    Atomically write a cached stock frame, so a crash never leaves a partial
+    Parquet file under a name the manifest reports as valid.
+    """
+    tmp_path = cache_file + ".tmp"
+    try:
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, cache_file)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@instrument("load_stock_data")
+def load_stock_data_from_folder(
+    folder_path, use_cache=True, workers=None, compact=False
+):
     """
     Load all stock price CSV files from a folder into a dictionary.
 
+    When caching is enabled, cleaned frames are kept as Parquet files in a
+    hidden cache directory next to the CSVs. Each entry is keyed on the source
+    file path, size and modification time and on STOCK_SCHEMA_VERSION, so
+    only new or changed files, or all files after a parser change, are
+    parsed again.
+
     Args:
         folder_path (str): Path to the folder containing stock price CSV files.
+        use_cache (bool): Reuse and refresh the Parquet cache in
+                          `<folder_path>/.parquet_cache`.
+        workers (int, optional): Number of worker processes used to parse the
+                                 CSVs that are not cached. None or 1 parses
+                                 serially; 0 uses one worker per CPU.
+        compact (bool): Store prices as float32 and downcast volume, see
+                        `compact.compact_frame`. The cache keeps full precision.
 
     Returns:
         dict: A dictionary where keys are file names without extensions,
@@ -25,31 +171,123 @@ def load_stock_data_from_folder(folder_path):
     if not os.path.exists(folder_path):
         raise FileNotFoundError(f"The folder '{folder_path}' does not exist!")
 
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".csv"):
-            filepath = os.path.join(folder_path, filename)
-            stock_name = filename.replace("_historical_data.csv", "")
-            try:
-                stock_df = pd.read_csv(filepath)
-                required_cols = {"Date", "Open", "High", "Low", "Close", "Volume"}
-                if not required_cols.issubset(stock_df.columns):
+    cache_dir = os.path.join(folder_path, STOCK_CACHE_DIRNAME)
+    manifest = {}
+    if use_cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            manifest = _load_cache_manifest(cache_dir)
+        except OSError as e:
+            logging.warning(f"Stock cache disabled, cannot create {cache_dir}: {e}")
+            use_cache = False
+
+    # Resolve every CSV to a cache hit or a file that has to be parsed.
+    results = {}
+    new_manifest = {}
+    to_parse = []
+    errors = []
+    for filename in sorted(os.listdir(folder_path)):
+        if not filename.endswith(".csv"):
+            continue
+        filepath = os.path.join(folder_path, filename)
+        stock_name = filename.replace("_historical_data.csv", "")
+        try:
+            stat = os.stat(filepath)
+        except OSError as e:
+            errors.append((filename, str(e)))
+            continue
+        key = os.path.abspath(filepath)
+        entry = manifest.get(key)
+        cache_file = os.path.join(cache_dir, f"{stock_name}.parquet")
+        if (
+            use_cache
+            and entry is not None
+            and entry.get("schema") == STOCK_SCHEMA_VERSION
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and (entry["skipped"] or os.path.exists(cache_file))
+        ):
+            results[filename] = ("hit", stock_name, key, entry, cache_file)
+        else:
+            results[filename] = ("miss", stock_name, key, stat, cache_file)
+            to_parse.append(filepath)
+
+    if workers == 0:
+        workers = os.cpu_count()
+    if workers and workers > 1 and len(to_parse) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = dict(zip(to_parse, pool.map(_ingest_stock_file, to_parse)))
+    else:
+        parsed = {filepath: _ingest_stock_file(filepath) for filepath in to_parse}
+
+    hits = misses = 0
+    for filename, (status, stock_name, key, info, cache_file) in results.items():
+        filepath = os.path.join(folder_path, filename)
+        try:
+            if status == "hit":
+                try:
+                    stock_df = None if info["skipped"] else pd.read_parquet(cache_file)
+                except Exception as e:
                     logging.warning(
-                        f"{filename} is missing required columns. Skipping..."
+                        f"Unreadable stock cache {cache_file}, parsing {filename} "
+                        f"again: {e}"
                     )
+                    status, info = "miss", os.stat(filepath)
+                    parsed[filepath] = _ingest_stock_file(filepath)
+                else:
+                    hits += 1
+                    new_manifest[key] = info
+            if status == "miss":
+                misses += 1
+                stock_df, error = parsed[filepath]
+                if error is not None:
+                    errors.append((filename, error))
                     continue
+                if use_cache:
+                    if stock_df is not None:
+                        _save_cache_frame(stock_df, cache_file)
+                    new_manifest[key] = {
+                        "schema": STOCK_SCHEMA_VERSION,
+                        "size": info.st_size,
+                        "mtime_ns": info.st_mtime_ns,
+                        "skipped": stock_df is None,
+                    }
+            if stock_df is None:
+                logging.warning(f"{filename} is missing required columns. Skipping...")
+                continue
+            stock_data[stock_name] = stock_df
+        except Exception as e:
+            errors.append((filename, str(e)))
+
+    if errors:
+        details = "\n".join(f"  {filename}: {error}" for filename, error in errors)
+        logging.error(f"Failed to process {len(errors)} file(s):\n{details}")
 
-                stock_df["Date"] = pd.to_datetime(stock_df["Date"], errors="coerce")
-                stock_df.columns = stock_df.columns.str.lower()
-                stock_df.dropna(subset=["date"], inplace=True)
-                stock_df.sort_values("date", inplace=True)
-                stock_data[stock_name] = stock_df
-            except Exception as e:
-                logging.error(f"Failed to process {filename}: {e}")
+    if use_cache:
+        # Drop cache files whose source CSV has disappeared.
+        live_names = {
+            os.path.basename(key).replace("_historical_data.csv", "")
+            for key in new_manifest
+        }
+        for key in set(manifest) - set(new_manifest):
+            stale_name = os.path.basename(key).replace("_historical_data.csv", "")
+            if stale_name in live_names:
+                continue
+            stale_file = os.path.join(cache_dir, f"{stale_name}.parquet")
+            if os.path.exists(stale_file):
+                os.remove(stale_file)
+        try:
+            _save_cache_manifest(cache_dir, new_manifest)
+        except OSError as e:
+            logging.warning(f"Failed to update stock cache manifest: {e}")
+        last_cache_stats.update(hits=hits, misses=misses)
+        logging.info(f"Stock cache: {hits} hits, {misses} misses.")
 
     logging.info(f"Loaded data for {len(stock_data)} stocks.")
+    if compact:
+        stock_data = compact_stage("load_stock_data", stock_data)
     return stock_data
 
-
 import logging
 import pandas as pd
 import os
@@ -59,15 +297,22 @@ logging.basicConfig(
 )
 
 
-def load_analyst_ratings(filepath):
+@instrument("load_analyst_ratings")
+def load_analyst_ratings(filepath, compact=False, with_index=False):
     """
     Load and preprocess raw analyst ratings data.
 
     Args:
         filepath (str): Path to the analyst ratings CSV file.
+        compact (bool): Store symbols and publishers as categoricals (symbol
+                        columns share one dictionary) and headlines as
+                        Arrow-backed strings, see `compact.compact_frame`.
+        with_index (bool): Also return the symbol/publisher `HeadlineIndex`,
+                           loaded from or persisted to `<filepath>.index.npz`.
 
     Returns:
-        pd.DataFrame: Cleaned analyst ratings dataframe.
+        pd.DataFrame: Cleaned analyst ratings dataframe, or a
+                      (DataFrame, HeadlineIndex) tuple with `with_index`.
 
     Raises:
         FileNotFoundError: If the file does not exist.
@@ -96,7 +341,386 @@ def load_analyst_ratings(filepath):
         logging.info(
             f"Loaded and cleaned analyst ratings data. Total records: {len(ratings_df)}"
         )
+        if compact:
+            ratings_df = compact_stage("load_analyst_ratings", ratings_df)
+        if with_index:
+            return ratings_df, load_headline_index(filepath, ratings_df)
         return ratings_df
     except Exception as e:
         logging.error(f"Error while loading or processing {filepath}: {e}")
         raise
+
+
+RATINGS_REQUIRED_COLUMNS = {"date", "headline", "publisher", "symbol"}
+# Timestamps are parsed from their first 19 characters, which drops any UTC
+# offset and keeps the wall-clock time, like `tz_localize(None)` above.
+RATINGS_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def iter_analyst_ratings(
+    filepath, chunksize=100_000, date_format=RATINGS_DATE_FORMAT, dedup=True
+):
+    """
+    Stream cleaned analyst ratings in bounded-size chunks.
+
+    Applies the same cleaning as `load_analyst_ratings`, but never holds more
+    than one chunk of rows in memory. Duplicate rows are detected through a
+    set of 64-bit row digests instead of a full-row hash table. That set is
+    the only state kept across chunks and grows with the number of unique
+    rows, roughly 70 bytes per row as Python ints in a set. Pass
+    `dedup=False` for memory that stays flat per chunk, leaving duplicates
+    in. All columns are read as strings ('date' is parsed afterwards), so
+    pandas never infers a different dtype per chunk and a row hashes the same
+    in every chunk.
+
+    Args:
+        filepath (str): Path to the analyst ratings CSV file.
+        chunksize (int): Number of CSV rows read per chunk.
+        date_format (str): strptime format of the first 19 characters of the
+                           'date' column.
+        dedup (bool): Drop rows that repeat an earlier row of the file.
+
+    Yields:
+        pd.DataFrame: Cleaned, de-duplicated chunk of analyst ratings.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the required columns are missing in the file.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"The file '{filepath}' does not exist!")
+
+    header = pd.read_csv(filepath, nrows=0).columns
+    if not RATINGS_REQUIRED_COLUMNS.issubset(header):
+        raise ValueError(
+            f"The file '{filepath}' is missing one or more required columns: {RATINGS_REQUIRED_COLUMNS}"
+        )
+
+    dtypes = {col: "str" for col in header}
+    seen = set()
+    total = 0
+    for chunk in pd.read_csv(filepath, chunksize=chunksize, dtype=dtypes):
+        chunk["date"] = pd.to_datetime(
+            chunk["date"].astype(str).str.slice(0, 19),
+            format=date_format,
+            errors="coerce",
+        )
+        chunk.dropna(subset=["date", "headline"], inplace=True)
+        if chunk.empty:
+            continue
+
+        if dedup:
+            digests = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+            keep = ~pd.Series(digests).duplicated().to_numpy()
+            keep &= np.fromiter(
+                (digest not in seen for digest in digests.tolist()),
+                bool,
+                len(digests),
+            )
+            seen.update(digests[keep].tolist())
+            chunk = chunk[keep]
+        total += len(chunk)
+        yield chunk
+
+    logging.info(f"Streamed and cleaned analyst ratings data. Total records: {total}")
+
+
+@instrument("write_analyst_ratings_parquet")
+def write_analyst_ratings_parquet(
+    filepath,
+    output_path,
+    chunksize=100_000,
+    date_format=RATINGS_DATE_FORMAT,
+    dedup=True,
+):
+    """
+    Clean the raw analyst ratings file chunk by chunk into a Parquet file.
+
+    Args:
+        filepath (str): Path to the analyst ratings CSV file.
+        output_path (str): Destination Parquet file.
+        chunksize (int): Number of CSV rows read per chunk.
+        date_format (str): See `iter_analyst_ratings`.
+        dedup (bool): See `iter_analyst_ratings`.
+
+    Returns:
+        int: Number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    rows = 0
+    try:
+        for chunk in iter_analyst_ratings(filepath, chunksize, date_format, dedup):
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(output_path, schema)
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    logging.info(f"Wrote {rows} analyst ratings to {output_path}")
+    return rows
+
+
+HEADLINE_INDEX_SUFFIX = ".index.npz"
+
+
+def normalize_symbol(symbol):
+    """
+    Normalize a ticker symbol for index lookups: stripped and upper-cased.
+    """
+    return str(symbol).strip().upper()
+
+
+def _postings(keys, dates):
+    """
+    CSR posting lists: row positions grouped by key, date-sorted within a key.
+
+    Returns:
+        tuple: (sorted keys, offsets, rows, dates) where the postings of
+               `keys[k]` are `rows[offsets[k]:offsets[k + 1]]`, published at
+               `dates[offsets[k]:offsets[k + 1]]` (int64 nanoseconds).
+    """
+    codes, uniques = pd.factorize(keys, sort=True)
+    valid = (codes >= 0) & (dates != np.iinfo(np.int64).min)
+    order = np.flatnonzero(valid)
+    order = order[np.lexsort((dates[order], codes[order]))]
+    counts = np.bincount(codes[order], minlength=len(uniques))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return np.asarray(uniques, dtype=str), offsets, order.astype(np.int64), dates[order]
+
+
+def _end_bound(end):
+    # A bare date (midnight) includes that whole calendar day.
+    end = pd.Timestamp(end)
+    if end == end.normalize():
+        end += pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns")
+    return end
+
+
+class HeadlineIndex:
+    """
+    Inverted index from normalized symbols, and optionally publishers, to the
+    positions of their rows in a ratings frame.
+
+    Each key's rows are stored date-sorted, so "news for ticker X between
+    dates A and B" is two binary searches instead of a boolean scan of the
+    whole frame. Positions are `iloc` offsets into the frame the index was
+    built from.
+    """
+
+    def __init__(self, postings, n_rows, meta=None):
+        self._postings = postings
+        self._lookup = {
+            name: {key: k for k, key in enumerate(lists[0])}
+            for name, lists in postings.items()
+        }
+        self.n_rows = n_rows
+        self.meta = dict(meta or {})
+
+    @classmethod
+    def build(cls, ratings_df, symbol_column="stock", publisher_column=None, meta=None):
+        """
+        Index a ratings frame.
+
+        Args:
+            ratings_df (pd.DataFrame): Ratings with a 'date' column.
+            symbol_column (str): Column holding the ticker symbols.
+            publisher_column (str, optional): Also index this publisher column.
+            meta (dict, optional): JSON-serializable metadata stored with the index.
+
+        Returns:
+            HeadlineIndex: The index.
+        """
+        dates = pd.to_datetime(ratings_df["date"]).to_numpy("datetime64[ns]").view(np.int64)
+        symbols = ratings_df[symbol_column].astype(str).where(
+            ratings_df[symbol_column].notna()
+        )
+        postings = {"symbol": _postings(symbols.str.strip().str.upper(), dates)}
+        if publisher_column is not None:
+            postings["publisher"] = _postings(ratings_df[publisher_column], dates)
+        return cls(postings, len(ratings_df), meta)
+
+    def keys(self, by="symbol"):
+        """
+        Indexed keys ('symbol' or 'publisher'), sorted.
+        """
+        return list(self._posting_lists(by)[0])
+
+    def counts(self, by="symbol"):
+        """
+        Number of rows per key, as a Series sorted by descending count.
+        """
+        keys, offsets, _, _ = self._posting_lists(by)
+        return pd.Series(np.diff(offsets), index=keys, name="count").sort_values(
+            ascending=False, kind="stable"
+        )
+
+    def _posting_lists(self, by):
+        if by not in self._postings:
+            raise ValueError(f"Index has no '{by}' postings: {list(self._postings)}")
+        return self._postings[by]
+
+    def _range(self, by, key, start, end):
+        keys, offsets, rows, dates = self._posting_lists(by)
+        k = self._lookup[by].get(key)
+        if k is None:
+            return rows[:0], dates[:0]
+        lo, hi = offsets[k], offsets[k + 1]
+        if start is not None:
+            lo += np.searchsorted(dates[lo:hi], pd.Timestamp(start).value, side="left")
+        if end is not None:
+            hi = offsets[k] + np.searchsorted(
+                dates[offsets[k] : hi], _end_bound(end).value, side="right"
+            )
+        return rows[lo:hi], dates[lo:hi]
+
+    def lookup(self, symbols=None, start=None, end=None, publishers=None):
+        """
+        Row positions for symbols and/or publishers published in [start, end].
+
+        Args:
+            symbols (str or list, optional): Ticker symbols (case-insensitive).
+            start (str or Timestamp, optional): First publication time.
+            end (str or Timestamp, optional): Last publication time; a bare
+                                              date includes that whole day.
+            publishers (str or list, optional): Publishers; requires an index
+                                                built with `publisher_column`.
+
+        Returns:
+            np.ndarray: Matching row positions in date order.
+
+        Raises:
+            ValueError: If neither symbols nor publishers are given.
+        """
+        if symbols is None and publishers is None:
+            raise ValueError("Pass symbols and/or publishers to look up.")
+        selected = []
+        for by, values, normalize in [
+            ("symbol", symbols, normalize_symbol),
+            ("publisher", publishers, str),
+        ]:
+            if values is None:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            parts = [self._range(by, normalize(value), start, end) for value in values]
+            rows = np.concatenate([p[0] for p in parts]) if parts else np.empty(0, np.int64)
+            dates = np.concatenate([p[1] for p in parts]) if parts else np.empty(0, np.int64)
+            selected.append((rows, dates))
+
+        rows, dates = selected[0]
+        if len(selected) == 2:
+            keep = np.isin(rows, selected[1][0])
+            rows, dates = rows[keep], dates[keep]
+        return rows[np.lexsort((rows, dates))]
+
+    def save(self, path):
+        """
+        Atomically write the index to an `.npz` file.
+        """
+        arrays = {}
+        for name, (keys, offsets, rows, dates) in self._postings.items():
+            arrays.update(
+                {
+                    f"{name}_keys": keys,
+                    f"{name}_offsets": offsets,
+                    f"{name}_rows": rows,
+                    f"{name}_dates": dates,
+                }
+            )
+        arrays["meta"] = np.array(json.dumps({"n_rows": self.n_rows, **self.meta}))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by `save`.
+        """
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            postings = {
+                name: tuple(
+                    data[f"{name}_{part}"] for part in ("keys", "offsets", "rows", "dates")
+                )
+                for name in ("symbol", "publisher")
+                if f"{name}_keys" in data
+            }
+        return cls(postings, meta.pop("n_rows"), meta)
+
+
+def load_headline_index(filepath, ratings_df, symbol_column=None):
+    """
+    Load the persisted headline index of a ratings file, rebuilding it if stale.
+
+    The index is stored next to the data as `<filepath>.index.npz` and is
+    reused while the source file's size and modification time and the number
+    of cleaned rows are unchanged.
+
+    Args:
+        filepath (str): Path of the ratings file `ratings_df` was loaded from.
+        ratings_df (pd.DataFrame): The cleaned ratings, as returned by
+                                   `load_analyst_ratings`.
+        symbol_column (str, optional): Symbol column; 'stock' if present,
+                                       else 'symbol'.
+
+    Returns:
+        HeadlineIndex: Index with symbol and (if present) publisher postings.
+    """
+    if symbol_column is None:
+        symbol_column = "stock" if "stock" in ratings_df.columns else "symbol"
+    stat = os.stat(filepath)
+    source = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "symbol_column": symbol_column,
+    }
+    index_path = filepath + HEADLINE_INDEX_SUFFIX
+    if os.path.exists(index_path):
+        try:
+            index = HeadlineIndex.load(index_path)
+            if index.meta == source and index.n_rows == len(ratings_df):
+                return index
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable headline index {index_path}: {e}")
+
+    publisher_column = "publisher" if "publisher" in ratings_df.columns else None
+    index = HeadlineIndex.build(ratings_df, symbol_column, publisher_column, meta=source)
+    try:
+        index.save(index_path)
+    except OSError as e:
+        logging.warning(f"Failed to persist headline index {index_path}: {e}")
+    logging.info(f"Built headline index over {index.n_rows} ratings.")
+    return index
+
+
+def query_headlines(
+    ratings_df, index, symbols=None, start=None, end=None, publishers=None
+):
+    """
+    Ratings for the given symbols and/or publishers within a date range.
+
+    Args:
+        ratings_df (pd.DataFrame): The frame `index` was built from.
+        index (HeadlineIndex): Its headline index.
+        symbols, start, end, publishers: See `HeadlineIndex.lookup`.
+
+    Returns:
+        pd.DataFrame: Matching rows in publication order.
+    """
+    if index.n_rows != len(ratings_df):
+        raise ValueError(
+            f"Index covers {index.n_rows} rows but the frame has {len(ratings_df)}."
+        )
+    return ratings_df.iloc[
+        index.lookup(symbols=symbols, start=start, end=end, publishers=publishers)
+    ]
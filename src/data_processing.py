@@ -1,41 +1,261 @@
 import pandas as pd
 
+try:
+    from .compact import compact_stage, symbol_dtype
+    from .near_duplicates import CLUSTER_COLUMN, collapse_near_duplicates
+    from .price_store import PriceStore
+    from .profiling import instrument
+except ImportError:
+    from compact import compact_stage, symbol_dtype
+    from near_duplicates import CLUSTER_COLUMN, collapse_near_duplicates
+    from price_store import PriceStore
+    from profiling import instrument
 
-def merge_stock_and_ratings(stock_data, analyst_ratings_sentiment):
+
+def _next_session_day(timestamps, market_close):
+    """
+    Map publication timestamps to the calendar day whose session they affect.
+
+    Headlines published at or after the market close move to the next day;
+    weekends and holidays are resolved later by the as-of join.
+    """
+    close = pd.Timedelta(f"{market_close}:00")
+    day = timestamps.dt.normalize()
+    after_close = (timestamps - day) >= close
+    return day + pd.to_timedelta(after_close.astype(int), unit="D")
+
+
+def _select_store(store, ratings, symbol_column, align):
+    """
+    Narrow a PriceStore to the tickers and trading days the ratings can join.
+    """
+    symbols = set(ratings[symbol_column].dropna().astype(str).str.upper())
+    tickers = [ticker for ticker in store if ticker.upper() in symbols]
+    published = pd.to_datetime(ratings["date"]).dropna()
+    if published.empty:
+        return store.select(tickers=tickers)
+    start = published.min().normalize()
+    end = published.max().normalize() + pd.Timedelta(days=1)
+    if align == "next_session":
+        # The as-of join looks forward to the next session, so keep the tail open.
+        end = None
+    return store.select(tickers=tickers, start=start, end=end)
+
+
+@instrument("merge_stock_and_ratings")
+def merge_stock_and_ratings(
+    stock_data,
+    analyst_ratings_sentiment,
+    symbol_column="stock",
+    align="exact",
+    market_close="16:00",
+    compact=False,
+    collapse_duplicates=False,
+    cluster_column=CLUSTER_COLUMN,
+):
     """
     Merge stock data with analyst ratings.
 
+    All stock frames are concatenated into one long frame and joined to the
+    ratings in a single pass on a (ticker, trading day) key. Symbols are
+    upper-cased once into a categorical that shares its categories with the
+    stock keys, so the merge is linear in the total number of rows.
+
     Args:
-        stock_data (dict): Dictionary of stock data DataFrames (one for each stock).
-        analyst_ratings (pd.DataFrame): Analyst ratings DataFrame with columns like 'date', 'headline'.
+        stock_data (dict or PriceStore): Dictionary of stock data DataFrames
+            (one for each stock), or a `PriceStore`, of which only the tickers
+            and date range covered by the ratings are read.
+        analyst_ratings_sentiment (pd.DataFrame): Analyst ratings DataFrame with columns like 'date', 'headline'.
+        symbol_column (str): Ratings column holding the ticker symbol.
+        align (str): 'exact' joins each headline to the bar of its calendar
+                     day. 'next_session' moves headlines published at or after
+                     `market_close` to the next day and joins each headline
+                     to the first trading day on or after that (as-of join),
+                     so weekend and holiday news reaches the next session.
+                     The original timestamp is kept as 'published_at'.
+        market_close (str): Session close time ('HH:MM') used by 'next_session'.
+        compact (bool): Compact both sides before the join (see
+                        `compact.compact_frame`), so the rows copied into the
+                        merged frame hold float32 values, categorical symbols
+                        and publishers, and Arrow-backed headlines. The
+                        stock names and the ratings symbols share one dictionary.
+        collapse_duplicates (bool): Keep one headline per ticker, join day and
+                        near-duplicate cluster before the join, with a
+                        'duplicates' column counting the rows it stands for
+                        (see `near_duplicates.collapse_near_duplicates`).
+        cluster_column (str): Cluster id column used by `collapse_duplicates`.
 
     Returns:
         pd.DataFrame: A merged DataFrame containing stock data and corresponding analyst ratings.
+
+    Raises:
+        ValueError: If `align` is unknown, or `collapse_duplicates` is set
+                    and the cluster id column is missing.
     """
-    merged_data = []
-
-    for stock_name, stock_df in stock_data.items():
-        print(f"Merging data for stock: {stock_name}...")
-        ratings_for_stock = analyst_ratings_sentiment[
-            analyst_ratings_sentiment["stock"].str.upper() == stock_name.upper()
-        ]
-
-        if ratings_for_stock.empty:
-            print(f"No matching analyst ratings for stock: {stock_name}. Skipping...")
-            continue
-        stock_df["date"] = pd.to_datetime(stock_df["date"])
-        ratings_for_stock.loc[:, "date"] = pd.to_datetime(
-            ratings_for_stock["date"]
-        ).dt.date
-        merged_stock_data = pd.merge(
-            stock_df,
-            ratings_for_stock,
-            on=["date"],
-            how="inner",
+    if align not in ("exact", "next_session"):
+        raise ValueError(f"Unknown align mode '{align}'")
+    if not stock_data or analyst_ratings_sentiment.empty:
+        return pd.DataFrame()
+    if isinstance(stock_data, PriceStore):
+        stock_data = _select_store(
+            stock_data, analyst_ratings_sentiment, symbol_column, align
+        )
+        if not stock_data:
+            return pd.DataFrame()
+
+    names = list(stock_data)
+    upper_names = pd.Index(names).str.upper()
+    ticker_dtype = pd.CategoricalDtype(upper_names.unique())
+
+    stock_long = pd.concat(
+        [df.assign(stock_name=name) for name, df in stock_data.items()],
+        ignore_index=True,
+    )
+    stock_long["date"] = pd.to_datetime(stock_long["date"])
+    stock_long["_ticker"] = pd.Categorical(
+        stock_long["stock_name"].str.upper(), dtype=ticker_dtype
+    )
+    stock_long["_day"] = stock_long["date"].dt.normalize()
+    stock_columns = [col for col in stock_long.columns if col != "stock_name"]
+
+    published = pd.to_datetime(analyst_ratings_sentiment["date"])
+    symbols = analyst_ratings_sentiment[symbol_column].astype(str).str.upper()
+    symbols = symbols.where(symbols.isin(ticker_dtype.categories))
+    ratings = analyst_ratings_sentiment.drop(columns="date").assign(
+        _ticker=pd.Categorical(symbols, dtype=ticker_dtype)
+    )
+    matched = (ratings["_ticker"].notna() & published.notna()).to_numpy()
+    ratings, published = ratings[matched], published[matched]
+    if collapse_duplicates:
+        if cluster_column not in ratings.columns:
+            raise ValueError(f"Column '{cluster_column}' not found in the ratings data.")
+        day = (
+            published.dt.normalize()
+            if align == "exact"
+            else _next_session_day(published, market_close)
+        )
+        ratings = collapse_near_duplicates(
+            ratings.assign(_published=published),
+            symbol_column="_ticker",
+            cluster_column=cluster_column,
+            day=day,
+        )
+        published = ratings.pop("_published")
+    if compact:
+        symbols = symbol_dtype(names, ratings[symbol_column])
+        stock_long = compact_stage("merge_stock_and_ratings[stock]", stock_long, symbols)
+        ratings = compact_stage("merge_stock_and_ratings[ratings]", ratings, symbols)
+
+    if align == "exact":
+        ratings["_day"] = published.dt.normalize()
+        merged = pd.merge(stock_long, ratings, on=["_ticker", "_day"], how="inner")
+    else:
+        ratings["published_at"] = published
+        ratings["_effective"] = _next_session_day(published, market_close)
+        merged = pd.merge_asof(
+            ratings.sort_values("_effective"),
+            stock_long.sort_values("_day"),
+            left_on="_effective",
+            right_on="_day",
+            by="_ticker",
+            direction="forward",
+        )
+        merged = merged.dropna(subset=["_day"]).sort_values(
+            ["_ticker", "_day"], kind="stable"
         )
-        merged_stock_data["stock_name"] = stock_name
-        merged_data.append(merged_stock_data)
-    merged_data = (
-        pd.concat(merged_data, ignore_index=True) if merged_data else pd.DataFrame()
+
+    ordered = [col for col in stock_columns if col in merged.columns]
+    ordered += [col for col in merged.columns if col not in ordered]
+    ordered.remove("stock_name")
+    merged = merged[ordered + ["stock_name"]]
+    merged = merged.drop(columns=["_ticker", "_day", "_effective"], errors="ignore")
+    merged = merged.reset_index(drop=True)
+
+    print(
+        f"Merged {len(merged)} rows for {merged['stock_name'].nunique()} stocks "
+        f"out of {len(names)}."
+    )
+    return merged
+
+
+ROLLUP_COLUMNS = {
+    "count": "Headline_Count",
+    "sum": "Sentiment_Sum",
+    "mean": "Sentiment_Polarity",
+    "std": "Sentiment_Std",
+    "min": "Sentiment_Min",
+    "max": "Sentiment_Max",
+}
+
+
+@instrument("merge_stock_and_rollup")
+def merge_stock_and_rollup(stock_data, rollup):
+    """
+    Join stock bars with the daily sentiment aggregates of a rollup.
+
+    The result has one row per ticker and trading day with headlines, not
+    one per headline, so it is built in O(days x tickers). Publishers are
+    combined. With a 'next_session' rollup, days without a session (weekends,
+    holidays) are carried to the next trading day of the ticker and combined
+    with it.
+
+    Args:
+        stock_data (dict or PriceStore): Stock bars with a 'date' column.
+        rollup (SentimentRollup): Materialized sentiment aggregates.
+
+    Returns:
+        pd.DataFrame: The stock columns, 'stock_name', and 'Headline_Count',
+                      'Sentiment_Sum', 'Sentiment_Polarity' (daily mean),
+                      'Sentiment_Std', 'Sentiment_Min' and 'Sentiment_Max'.
+    """
+    try:
+        from .sentiment_rollup import combine_rollup_stats, rollup_moments
+    except ImportError:
+        from sentiment_rollup import combine_rollup_stats, rollup_moments
+
+    cells = combine_rollup_stats(rollup.table, ["ticker", "trading_date"])
+    if not stock_data or cells.empty:
+        return pd.DataFrame()
+    symbols = set(cells["ticker"])
+    names = [name for name in stock_data if str(name).upper() in symbols]
+    if isinstance(stock_data, PriceStore):
+        start = None if rollup.align == "next_session" else cells["trading_date"].min()
+        stock_data = stock_data.select(tickers=names, start=start)
+    if not names:
+        return pd.DataFrame()
+
+    stock_long = pd.concat(
+        [stock_data[name].assign(stock_name=name) for name in names],
+        ignore_index=True,
+    )
+    stock_long["date"] = pd.to_datetime(stock_long["date"])
+    stock_long["_ticker"] = stock_long["stock_name"].astype(str).str.upper()
+    stock_long["_day"] = stock_long["date"].dt.normalize().astype("datetime64[ns]")
+    cells = cells.rename(columns={"ticker": "_ticker"}).astype(
+        {"trading_date": "datetime64[ns]"}
+    )
+
+    if rollup.align == "next_session":
+        cells = pd.merge_asof(
+            cells.sort_values("trading_date"),
+            stock_long[["_ticker", "_day"]].drop_duplicates().sort_values("_day"),
+            left_on="trading_date",
+            right_on="_day",
+            by="_ticker",
+            direction="forward",
+        ).dropna(subset=["_day"])
+        cells = combine_rollup_stats(cells, ["_ticker", "_day"])
+    else:
+        cells = cells.rename(columns={"trading_date": "_day"})
+
+    merged = pd.merge(
+        stock_long, rollup_moments(cells), on=["_ticker", "_day"], how="inner"
+    )
+    merged = merged.rename(columns=ROLLUP_COLUMNS).drop(
+        columns=["_ticker", "_day", "sumsq"]
+    )
+    print(
+        f"Merged {len(merged)} daily rows for {merged['stock_name'].nunique()} "
+        f"stocks from the sentiment rollup."
     )
-    return merged_data
+    return merged.reset_index(drop=True)
@@ -1,35 +1,92 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
-from textblob import TextBlob
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
 
+try:
+    from .near_duplicates import cluster_representatives
+    from .price_store import PriceStore
+    from .sentimental_analysis import score_headlines
+except ImportError:
+    from near_duplicates import cluster_representatives
+    from price_store import PriceStore
+    from sentimental_analysis import score_headlines
 
-def plot_stock_prices(stock_data_dict):
+
+def _new_figure(output_dir, figsize, nrows=1, ncols=1):
+    """
+    Figure and axes for an EDA plot.
+
+    Without `output_dir` this is a pyplot figure for `plt.show()`. With it,
+    the figure is drawn on the Agg canvas and never registered with pyplot,
+    so plots render headless (CI, servers) and nothing is left open.
+    """
+    if output_dir is None:
+        import matplotlib.pyplot as plt
+
+        return plt.subplots(nrows, ncols, figsize=figsize)
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(nrows, ncols)
+
+
+def _finish_figure(fig, output_dir, name):
+    """
+    Show the figure, or save it as `<output_dir>/<name>.png` and release it.
+
+    Returns:
+        str or None: Path of the saved file.
+    """
+    if output_dir is None:
+        import matplotlib.pyplot as plt
+
+        plt.show()
+        return None
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{name}.png")
+    fig.savefig(path)
+    fig.clf()
+    return path
+
+
+def plot_stock_prices(stock_data_dict, output_dir=None):
     """
     Plot the closing prices of stocks over time.
 
     Args:
         stock_data_dict (dict): A dictionary where keys are stock symbols and values are
                                  DataFrames containing stock price data with at least
-                                 'date' and 'close' columns.
+                                 'date' and 'close' columns, or a `PriceStore`.
+        output_dir (str, optional): Save the charts as '<stock>_close.png'
+                                    here instead of showing them.
 
     Returns:
-        None
+        list: Paths of the saved charts (empty when shown).
     """
+    paths = []
     for stock, df in stock_data_dict.items():
-        plt.figure(figsize=(10, 5))
-        plt.plot(df["date"], df["close"], label="Close Price", color="blue")
-        plt.title(f"{stock} Closing Prices Over Time")
-        plt.xlabel("Date")
-        plt.ylabel("Close Price (USD)")
-        plt.legend()
-        plt.grid()
-        plt.show()
-
-
-def analyst_ratings_summary(analyst_ratings_df, symbol_column="Symbol"):
+        fig, ax = _new_figure(output_dir, (10, 5))
+        ax.plot(df["date"], df["close"], label="Close Price", color="blue")
+        ax.set_title(f"{stock} Closing Prices Over Time")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Close Price (USD)")
+        ax.legend()
+        ax.grid()
+        paths.append(_finish_figure(fig, output_dir, f"{stock}_close"))
+    return [path for path in paths if path]
+
+
+def analyst_ratings_summary(
+    analyst_ratings_df,
+    symbol_column="Symbol",
+    index=None,
+    stats=None,
+    output_dir=None,
+):
     """
     Summarize the analyst ratings for different stocks and visualize the count.
 
@@ -37,22 +94,37 @@ def analyst_ratings_summary(analyst_ratings_df, symbol_column="Symbol"):
         analyst_ratings_df (pd.DataFrame): DataFrame containing analyst ratings data,
                                            including a 'Symbol' column for stock symbols.
         symbol_column (str): The column in the dataframe that contains the stock symbols.
+        index (HeadlineIndex, optional): Headline index of the frame; counts
+                                         are read from its posting lists
+                                         (normalized symbols) without a scan.
+        stats (HeadlineStats, optional): Precomputed statistics to plot from.
+        output_dir (str, optional): Save the chart as 'ratings_per_stock.png'
+                                    here instead of showing it.
 
     Returns:
         pd.DataFrame: A summary table showing the count of ratings for each stock symbol.
     """
-    if symbol_column in analyst_ratings_df.columns:
-        summary = analyst_ratings_df[symbol_column].value_counts().reset_index()
+    if (
+        stats is not None
+        or index is not None
+        or symbol_column in analyst_ratings_df.columns
+    ):
+        if stats is not None:
+            summary = stats.symbol_counts.reset_index()
+        elif index is not None:
+            summary = index.counts("symbol").reset_index()
+        else:
+            summary = analyst_ratings_df[symbol_column].value_counts().reset_index()
         summary.columns = ["Stock", "Ratings Count"]
 
         # Bar Chart for Ratings Count
-        plt.figure(figsize=(10, 6))
-        plt.bar(summary["Stock"], summary["Ratings Count"], color="skyblue")
-        plt.title("Analyst Ratings Count by Stock")
-        plt.xlabel("Stock")
-        plt.ylabel("Ratings Count")
-        plt.xticks(rotation=45)
-        plt.show()
+        fig, ax = _new_figure(output_dir, (10, 6))
+        ax.bar(summary["Stock"], summary["Ratings Count"], color="skyblue")
+        ax.set_title("Analyst Ratings Count by Stock")
+        ax.set_xlabel("Stock")
+        ax.set_ylabel("Ratings Count")
+        ax.tick_params(axis="x", labelrotation=45)
+        _finish_figure(fig, output_dir, "ratings_per_stock")
 
         return summary
     else:
@@ -60,93 +132,360 @@ def analyst_ratings_summary(analyst_ratings_df, symbol_column="Symbol"):
         return pd.DataFrame()
 
 
-def analyze_text_length_and_frequency(df):
+def analyze_text_length_and_frequency(df, stats=None, output_dir=None):
     """
     Analyze and visualize the length of article headlines.
 
     Args:
         df (pd.DataFrame): DataFrame containing article headlines in a 'headline' column.
+        stats (HeadlineStats, optional): Precomputed statistics; the histogram
+                                         is drawn from them and `df` is not read.
+        output_dir (str, optional): Save the chart as 'headline_lengths.png'
+                                    here instead of showing it.
 
     Returns:
-        None
+        str or None: Path of the saved chart.
     """
-    # Headline Length Analysis
-    df["headline_length"] = df["headline"].apply(lambda x: len(str(x)))
+    if stats is None:
+        # Headline Length Analysis
+        df["headline_length"] = df["headline"].str.len().fillna(0).astype(int)
+        length_counts = np.bincount(df["headline_length"])
+    else:
+        length_counts = stats.length_counts
+    lengths = np.flatnonzero(length_counts)
 
     # Histogram for Headline Length
-    plt.figure(figsize=(10, 6))
-    plt.hist(df["headline_length"], bins=30, color="skyblue", edgecolor="black")
-    plt.title("Distribution of Headline Lengths")
-    plt.xlabel("Headline Length")
-    plt.ylabel("Frequency")
-    plt.grid()
-    plt.show()
+    fig, ax = _new_figure(output_dir, (10, 6))
+    ax.hist(
+        lengths,
+        bins=30,
+        weights=length_counts[lengths],
+        color="skyblue",
+        edgecolor="black",
+    )
+    ax.set_title("Distribution of Headline Lengths")
+    ax.set_xlabel("Headline Length")
+    ax.set_ylabel("Frequency")
+    ax.grid()
+    return _finish_figure(fig, output_dir, "headline_lengths")
 
 
-def analyze_article_per_publisher(df):
+def analyze_article_per_publisher(df, stats=None, rollup=None, output_dir=None):
     """
     Analyze the number of articles published by each publisher and visualize it.
 
     Args:
         df (pd.DataFrame): DataFrame containing article data with a 'publisher' column.
+        stats (HeadlineStats, optional): Precomputed statistics; `df` is not read.
+        rollup (SentimentRollup, optional): Sentiment rollup whose publisher
+                                            totals are used; `df` is not read.
+        output_dir (str, optional): Save the chart as
+                                    'articles_per_publisher.png' here instead
+                                    of showing it.
 
     Returns:
-        None
+        str or None: Path of the saved chart.
     """
-    articles_per_publisher = df.groupby("publisher").size().sort_values(ascending=False)
+    if rollup is not None:
+        articles_per_publisher = rollup.totals("publisher")
+    elif stats is not None:
+        articles_per_publisher = stats.publisher_counts
+    else:
+        articles_per_publisher = df.groupby("publisher").size().sort_values(
+            ascending=False
+        )
     print("\nArticles per Publisher:")
     print(articles_per_publisher)
 
-    articles_per_publisher.plot(kind="bar", figsize=(12, 6), color="orange")
-    plt.title("Number of Articles per Publisher")
-    plt.xlabel("Publisher")
-    plt.ylabel("Article Count")
-    plt.xticks(rotation=45)
-    plt.show()
+    fig, ax = _new_figure(output_dir, (12, 6))
+    articles_per_publisher.plot(kind="bar", ax=ax, color="orange")
+    ax.set_title("Number of Articles per Publisher")
+    ax.set_xlabel("Publisher")
+    ax.set_ylabel("Article Count")
+    ax.tick_params(axis="x", labelrotation=45)
+    return _finish_figure(fig, output_dir, "articles_per_publisher")
 
 
-def analyze_sentiment(df):
+def analyze_sentiment(
+    df, cache=None, backend="textblob", stats=None, output_dir=None
+):
     """
     Perform sentiment analysis on article headlines and visualize the sentiment distribution.
 
     Args:
         df (pd.DataFrame): DataFrame containing article headlines in a 'headline' column.
+        cache (SentimentCache, optional): Persistent polarity cache shared with
+                                          `add_sentiment_analysis`.
+        backend (str): Scoring backend, 'textblob' or the vectorized 'lexicon'.
+        stats (HeadlineStats, optional): Precomputed statistics with sentiment
+                                         counts; `df` is not read or scored.
+        output_dir (str, optional): Save the chart as
+                                    'sentiment_distribution.png' here instead
+                                    of showing it.
 
     Returns:
-        None
+        str or None: Path of the saved chart.
     """
-    df["sentiment"] = df["headline"].apply(
-        lambda x: TextBlob(str(x)).sentiment.polarity
-    )
-    df["sentiment_category"] = df["sentiment"].apply(
-        lambda x: "positive" if x > 0 else ("negative" if x < 0 else "neutral")
-    )
-
-    sentiment_counts = df["sentiment_category"].value_counts()
+    if stats is None:
+        df["sentiment"] = score_headlines(
+            df["headline"], cache=cache, backend=backend
+        ).to_numpy()
+        # Headlines without a score (missing text) get no category.
+        df["sentiment_category"] = np.select(
+            [df["sentiment"] > 0, df["sentiment"] < 0, df["sentiment"] == 0],
+            ["positive", "negative", "neutral"],
+            None,
+        )
+        sentiment_counts = df["sentiment_category"].value_counts()
+    else:
+        sentiment_counts = stats.sentiment_counts
+    sentiment_counts = sentiment_counts[sentiment_counts > 0]
 
     # Pie Chart for Sentiment
-    plt.figure(figsize=(8, 6))
-    plt.pie(
+    fig, ax = _new_figure(output_dir, (8, 6))
+    ax.pie(
         sentiment_counts,
         labels=sentiment_counts.index,
         autopct="%1.1f%%",
         startangle=140,
-        colors=["lightgreen", "salmon", "lightgray"],
+        colors=[SENTIMENT_COLORS[category] for category in sentiment_counts.index],
     )
-    plt.title("Sentiment Distribution")
-    plt.show()
+    ax.set_title("Sentiment Distribution")
+    return _finish_figure(fig, output_dir, "sentiment_distribution")
+
 
+SENTIMENT_CATEGORIES = ["negative", "neutral", "positive"]
+SENTIMENT_COLORS = {
+    "negative": "salmon",
+    "neutral": "lightgray",
+    "positive": "lightgreen",
+}
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
-def perform_topic_modeling(df):
+
+def _add_counts(total, counts):
+    if total is None:
+        return counts
+    return total.add(counts, fill_value=0).astype(np.int64)
+
+
+class HeadlineStats:
+    """
+    Headline statistics gathered in one pass, consumed by the EDA plots.
+
+    Attributes:
+        n_rows (int): Headlines counted.
+        length_counts (np.ndarray): `length_counts[n]` headlines have n
+            characters; missing headlines count as length 0.
+        publisher_counts (pd.Series): Headlines per publisher, descending.
+        symbol_counts (pd.Series): Headlines per symbol, descending.
+        hour_counts (np.ndarray): Headlines per publication hour (0-23).
+        weekday_counts (np.ndarray): Headlines per weekday (Monday = 0).
+        sentiment_counts (pd.Series or None): Headlines per sentiment
+            category, None if sentiment was not available. Headlines with a
+            NaN polarity are not in any category.
+        sentiment_missing (int): Headlines with a NaN polarity.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.length_counts = np.zeros(0, dtype=np.int64)
+        self.publisher_counts = None
+        self.symbol_counts = None
+        self.hour_counts = np.zeros(24, dtype=np.int64)
+        self.weekday_counts = np.zeros(7, dtype=np.int64)
+        self.sentiment_counts = None
+        self.sentiment_missing = 0
+
+    def update(self, chunk, symbol_column, sentiment):
+        """
+        Add one chunk of headlines. Each column is read once, vectorized.
+        """
+        self.n_rows += len(chunk)
+
+        lengths = np.bincount(
+            chunk["headline"].str.len().fillna(0).to_numpy(dtype=np.int64)
+        )
+        size = max(len(lengths), len(self.length_counts))
+        self.length_counts = np.pad(self.length_counts, (0, size - len(self.length_counts)))
+        self.length_counts[: len(lengths)] += lengths
+
+        if "publisher" in chunk.columns:
+            self.publisher_counts = _add_counts(
+                self.publisher_counts, chunk["publisher"].value_counts()
+            )
+        if symbol_column in chunk.columns:
+            self.symbol_counts = _add_counts(
+                self.symbol_counts, chunk[symbol_column].value_counts()
+            )
+
+        if "date" in chunk.columns:
+            published = pd.to_datetime(chunk["date"]).dropna()
+            self.hour_counts += np.bincount(published.dt.hour, minlength=24)
+            self.weekday_counts += np.bincount(published.dt.weekday, minlength=7)
+
+        if sentiment is not None:
+            sentiment = np.asarray(sentiment, dtype=float)
+            scored = ~np.isnan(sentiment)
+            self.sentiment_missing += int((~scored).sum())
+            signs = np.sign(sentiment[scored]) + 1
+            counts = pd.Series(
+                np.bincount(signs.astype(int), minlength=3), index=SENTIMENT_CATEGORIES
+            )
+            self.sentiment_counts = _add_counts(self.sentiment_counts, counts)
+
+    def finish(self):
+        for name in ("publisher_counts", "symbol_counts"):
+            counts = getattr(self, name)
+            if counts is not None:
+                setattr(self, name, counts.sort_values(ascending=False, kind="stable"))
+        if self.sentiment_counts is not None:
+            self.sentiment_counts = self.sentiment_counts.sort_values(
+                ascending=False, kind="stable"
+            )
+        return self
+
+
+def compute_headline_stats(
+    data,
+    symbol_column="stock",
+    sentiment_column="sentiment",
+    score_sentiment=False,
+    cache=None,
+    backend="textblob",
+):
+    """
+    Compute every headline statistic used by the EDA plots in one pass.
+
+    Headline lengths, publisher and symbol counts, publication hour and
+    weekday distributions and sentiment category counts are accumulated
+    together, chunk by chunk, so a file streamed with
+    `data_loader.iter_analyst_ratings` never has to be held in memory.
+
+    Args:
+        data (pd.DataFrame or iterable): Headline frame or chunks of one.
+        symbol_column (str): Column holding the ticker symbols.
+        sentiment_column (str): Polarity column used when present.
+        score_sentiment (bool): Score headlines with `score_headlines` when
+                                the polarity column is missing.
+        cache (SentimentCache, optional): Polarity cache used when scoring.
+        backend (str): Scoring backend used when scoring, 'textblob' (the
+                       default, as in `analyze_sentiment`) or 'lexicon'.
+
+    Returns:
+        HeadlineStats: The accumulated statistics.
+    """
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    stats = HeadlineStats()
+    for chunk in chunks:
+        if sentiment_column in chunk.columns:
+            sentiment = chunk[sentiment_column].to_numpy()
+        elif score_sentiment:
+            sentiment = score_headlines(
+                chunk["headline"], cache=cache, backend=backend
+            ).to_numpy()
+        else:
+            sentiment = None
+        stats.update(chunk, symbol_column, sentiment)
+    return stats.finish()
+
+
+def plot_publication_times(stats, output_dir=None):
+    """
+    Plot the publication hour and weekday distributions of a HeadlineStats.
+
+    With `output_dir`, the chart is saved as 'publication_times.png' there
+    and its path returned instead of showing it.
+    """
+    fig, (ax_hour, ax_day) = _new_figure(output_dir, (14, 5), ncols=2)
+    ax_hour.bar(range(24), stats.hour_counts, color="steelblue")
+    ax_hour.set_title("Articles by Publication Hour")
+    ax_hour.set_xlabel("Hour")
+    ax_hour.set_ylabel("Article Count")
+    ax_day.bar(WEEKDAY_NAMES, stats.weekday_counts, color="teal")
+    ax_day.set_title("Articles by Weekday")
+    ax_day.set_ylabel("Article Count")
+    return _finish_figure(fig, output_dir, "publication_times")
+
+
+def plot_daily_sentiment(rollup, by=None, top=5, output_dir=None):
+    """
+    Plot the daily mean polarity from a sentiment rollup.
+
+    Args:
+        rollup (SentimentRollup): Materialized sentiment aggregates.
+        by (str, optional): 'ticker' or 'publisher' to draw one line for each
+                            of the `top` groups with the most headlines.
+        top (int): Number of groups drawn with `by`.
+        output_dir (str, optional): Save the chart as 'daily_sentiment.png'
+                                    here instead of showing it.
+
+    Returns:
+        pd.DataFrame: The plotted daily aggregates.
+    """
+    daily = rollup.daily(by)
+    fig, ax = _new_figure(output_dir, (12, 6))
+    if by is None:
+        ax.plot(daily["trading_date"], daily["mean"], label="All headlines")
+    else:
+        groups = rollup.totals(by).index[:top]
+        daily = daily[daily[by].isin(groups)]
+        for group, rows in daily.groupby(by, sort=False):
+            ax.plot(rows["trading_date"], rows["mean"], label=str(group))
+    ax.set_title("Daily Mean Sentiment")
+    ax.set_xlabel("Trading Date")
+    ax.set_ylabel("Mean Polarity")
+    ax.legend()
+    ax.grid()
+    _finish_figure(fig, output_dir, "daily_sentiment")
+    return daily
+
+
+def perform_topic_modeling(
+    df,
+    streaming=False,
+    chunksize=10_000,
+    workers=None,
+    model_path=None,
+    cluster_column=None,
+):
     """
     Perform topic modeling using Latent Dirichlet Allocation (LDA) on article headlines.
 
     Args:
         df (pd.DataFrame): DataFrame containing article headlines in a 'headline' column.
+        streaming (bool): Use `stream_topic_modeling` (hashed features and
+                          online LDA over chunks) instead of a batch fit.
+        chunksize (int): Headlines per chunk in streaming mode.
+        workers (int, optional): Vectorization processes in streaming mode.
+        model_path (str, optional): Streaming model file to resume and save.
+        cluster_column (str, optional): Near-duplicate cluster id column; only
+                                        the first headline of each cluster
+                                        is modeled.
 
     Returns:
         None
     """
+    from sklearn.decomposition import LatentDirichletAllocation
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    if cluster_column is not None and cluster_column in df.columns:
+        df = df[cluster_representatives(df, cluster_column)]
+
+    if streaming:
+        chunks = (
+            df["headline"].iloc[start : start + chunksize]
+            for start in range(0, len(df), chunksize)
+        )
+        lda, terms = stream_topic_modeling(
+            chunks, workers=workers, model_path=model_path
+        )
+        print("\nTopic Modeling:")
+        for index, words in enumerate(top_topic_terms(lda, terms)):
+            print(f"Topic {index}:")
+            print(words)
+        return
+
     vectorizer = TfidfVectorizer(stop_words="english")
     X = vectorizer.fit_transform(df["headline"])
 
@@ -164,7 +503,135 @@ def perform_topic_modeling(df):
         )
 
 
-def plot_with_indicators(df, stock_name):
+TOPIC_HASH_FEATURES = 2**18
+
+
+def _topic_vectorizer(n_features):
+    """
+    Stateless term-count vectorizer shared by the parent and worker processes.
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(
+        n_features=n_features, stop_words="english", alternate_sign=False, norm=None
+    )
+
+
+def _vectorize_headline_chunk(task):
+    """
+    Hash one chunk of headlines into term counts.
+
+    Returns:
+        tuple: (sparse count matrix, {feature index: term} for the chunk's terms).
+    """
+    headlines, n_features = task
+    vectorizer = _topic_vectorizer(n_features)
+    analyzer = vectorizer.build_analyzer()
+    terms = sorted({term for text in headlines for term in analyzer(text)})
+    indices = vectorizer.transform(terms).indices if terms else []
+    return vectorizer.transform(headlines), dict(zip(indices.tolist(), terms))
+
+
+def stream_topic_modeling(
+    headline_chunks,
+    n_topics=5,
+    n_features=TOPIC_HASH_FEATURES,
+    workers=None,
+    model_path=None,
+    random_state=42,
+):
+    """
+    Fit LDA incrementally over chunks of headlines in bounded memory.
+
+    Headlines are mapped to a fixed-width hashed term space, so no
+    vocabulary is built. Chunks are vectorized in a process pool (at most
+    two chunks per worker in flight) and fed to online LDA with
+    `partial_fit`. If `model_path` exists, fitting resumes from the saved
+    model instead of starting from scratch, and the updated model is saved
+    back.
+
+    Args:
+        headline_chunks (iterable): Iterable of headline sequences.
+        n_topics (int): Number of topics for a new model.
+        n_features (int): Width of the hashed feature space for a new model.
+        workers (int, optional): Vectorization processes; None or 1 is serial.
+        model_path (str, optional): joblib file holding the model, its
+                                    feature width and the index -> term map.
+        random_state (int): Seed of a new model.
+
+    Returns:
+        tuple: (fitted LatentDirichletAllocation, {feature index: term}).
+    """
+    import joblib
+    from sklearn.decomposition import LatentDirichletAllocation
+
+    if model_path and os.path.exists(model_path):
+        saved = joblib.load(model_path)
+        lda, n_features, terms = saved["lda"], saved["n_features"], saved["terms"]
+    else:
+        lda = LatentDirichletAllocation(
+            n_components=n_topics, learning_method="online", random_state=random_state
+        )
+        terms = {}
+
+    tasks = ((list(map(str, chunk)), n_features) for chunk in headline_chunks)
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(_vectorize_headline_chunk, task))
+                if len(pending) >= 2 * workers:
+                    _partial_fit_chunk(lda, terms, *pending.popleft().result())
+            while pending:
+                _partial_fit_chunk(lda, terms, *pending.popleft().result())
+    else:
+        for task in tasks:
+            _partial_fit_chunk(lda, terms, *_vectorize_headline_chunk(task))
+
+    if model_path:
+        directory = os.path.dirname(model_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        joblib.dump({"lda": lda, "n_features": n_features, "terms": terms}, model_path)
+    return lda, terms
+
+
+def _partial_fit_chunk(lda, terms, X, chunk_terms):
+    if X.shape[0]:
+        lda.partial_fit(X)
+    for index, term in chunk_terms.items():
+        terms.setdefault(index, term)
+
+
+def top_topic_terms(lda, terms, n_terms=10):
+    """
+    Return the `n_terms` highest-weighted terms of every topic.
+    """
+    return [
+        [terms.get(i, f"#{i}") for i in topic.argsort()[: -n_terms - 1 : -1]]
+        for topic in lda.components_
+    ]
+
+
+def assign_topics(headlines, model_path):
+    """
+    Assign the most likely topic to new headlines with a saved streaming model.
+
+    Args:
+        headlines (iterable): Headlines to classify.
+        model_path (str): File written by `stream_topic_modeling`.
+
+    Returns:
+        np.ndarray: Topic index per headline.
+    """
+    import joblib
+
+    saved = joblib.load(model_path)
+    X = _topic_vectorizer(saved["n_features"]).transform(list(map(str, headlines)))
+    return saved["lda"].transform(X).argmax(axis=1)
+
+
+def plot_with_indicators(df, stock_name, output_dir=None):
     """
     Plot stock closing prices with technical indicators like SMA, RSI, and MACD.
 
@@ -172,37 +639,182 @@ def plot_with_indicators(df, stock_name):
         df (pd.DataFrame): DataFrame containing stock data with 'date', 'close', 'SMA_20',
                            'SMA_50', 'RSI', 'MACD', and 'MACD_signal' columns.
         stock_name (str): Name of the stock to include in the plot title.
+        output_dir (str, optional): Save the charts as '<stock>_sma.png',
+                                    '<stock>_rsi.png' and '<stock>_macd.png'
+                                    here instead of showing them.
 
     Returns:
-        None
+        list: Paths of the saved charts (empty when shown).
     """
+    paths = []
+
     # Closing Price with SMAs
-    plt.figure(figsize=(12, 6))
-    plt.plot(df["date"], df["close"], label="Close Price", color="blue")
-    plt.plot(df["date"], df["SMA_20"], label="SMA 20", color="orange")
-    plt.plot(df["date"], df["SMA_50"], label="SMA 50", color="red")
-    plt.title(f"{stock_name} Closing Price with SMA")
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.legend()
-    plt.show()
+    fig, ax = _new_figure(output_dir, (12, 6))
+    ax.plot(df["date"], df["close"], label="Close Price", color="blue")
+    ax.plot(df["date"], df["SMA_20"], label="SMA 20", color="orange")
+    ax.plot(df["date"], df["SMA_50"], label="SMA 50", color="red")
+    ax.set_title(f"{stock_name} Closing Price with SMA")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Price")
+    ax.legend()
+    paths.append(_finish_figure(fig, output_dir, f"{stock_name}_sma"))
 
     # RSI
-    plt.figure(figsize=(12, 3))
-    plt.plot(df["date"], df["RSI"], color="green")
-    plt.axhline(70, color="red", linestyle="--", label="Overbought")
-    plt.axhline(30, color="blue", linestyle="--", label="Oversold")
-    plt.title(f"{stock_name} RSI")
-    plt.xlabel("Date")
-    plt.ylabel("RSI")
-    plt.legend()
-    plt.show()
+    fig, ax = _new_figure(output_dir, (12, 3))
+    ax.plot(df["date"], df["RSI"], color="green")
+    ax.axhline(70, color="red", linestyle="--", label="Overbought")
+    ax.axhline(30, color="blue", linestyle="--", label="Oversold")
+    ax.set_title(f"{stock_name} RSI")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("RSI")
+    ax.legend()
+    paths.append(_finish_figure(fig, output_dir, f"{stock_name}_rsi"))
 
     # MACD
-    plt.figure(figsize=(12, 3))
-    plt.plot(df["date"], df["MACD"], label="MACD", color="purple")
-    plt.plot(df["date"], df["MACD_signal"], label="Signal Line", color="orange")
-    plt.title(f"{stock_name} MACD")
-    plt.xlabel("Date")
-    plt.legend()
-    plt.show()
+    fig, ax = _new_figure(output_dir, (12, 3))
+    ax.plot(df["date"], df["MACD"], label="MACD", color="purple")
+    ax.plot(df["date"], df["MACD_signal"], label="Signal Line", color="orange")
+    ax.set_title(f"{stock_name} MACD")
+    ax.set_xlabel("Date")
+    ax.legend()
+    paths.append(_finish_figure(fig, output_dir, f"{stock_name}_macd"))
+    return [path for path in paths if path]
+
+
+def lttb_downsample(x, y, n_out):
+    """
+    Select the indices of `n_out` points that preserve the shape of a series.
+
+    Uses Largest-Triangle-Three-Buckets: the first and last points are kept,
+    and from every intermediate bucket the point forming the largest
+    triangle with the previously selected point and the next bucket's mean.
+
+    Args:
+        x (np.ndarray): Numeric x values (e.g. dates as int64), ascending.
+        y (np.ndarray): Values to plot.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices into `x`/`y`.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        start, stop = edges[b], max(edges[b + 1], edges[b] + 1)
+        next_stop = edges[b + 2] if b + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean() if next_stop > stop else x[-1]
+        next_y = np.nanmean(y[stop:next_stop]) if next_stop > stop else y[-1]
+        area = np.abs(
+            (x[prev] - next_x) * (y[start:stop] - y[prev])
+            - (x[prev] - x[start:stop]) * (next_y - y[prev])
+        )
+        prev = start + int(np.nanargmax(area)) if not np.isnan(area).all() else start
+        selected[b + 1] = prev
+    return selected
+
+
+CHART_COLUMNS = ["close", "SMA_20", "SMA_50", "RSI", "MACD", "Signal"]
+
+
+def _chart_columns(df):
+    """
+    Date-sorted arrays of the charted columns of one ticker.
+    """
+    df = df.sort_values("date")
+    columns = {col: df[col].to_numpy() for col in CHART_COLUMNS if col in df.columns}
+    columns["date"] = pd.to_datetime(df["date"]).to_numpy()
+    return columns
+
+
+def _render_stock_chart(task):
+    """
+    Render one ticker's price/indicator chart to a file with the Agg canvas.
+
+    Figures are created through `matplotlib.figure.Figure`, never registered
+    with pyplot, so no GUI backend is touched and nothing is left open.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    ticker, columns, path, max_points, dpi = task
+    if isinstance(columns, PriceStore):
+        columns = _chart_columns(columns[ticker])
+    x = columns["date"]
+    keep = lttb_downsample(x.astype("int64"), columns["close"], max_points)
+    dates = pd.to_datetime(x[keep])
+
+    panels = [["close", "SMA_20", "SMA_50"], ["RSI"], ["MACD", "Signal"]]
+    panels = [[col for col in cols if col in columns] for cols in panels]
+    panels = [cols for cols in panels if cols]
+
+    fig = Figure(figsize=(12, 3 + 2 * len(panels)), dpi=dpi)
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(len(panels), 1, sharex=True, squeeze=False)[:, 0]
+    for ax, cols in zip(axes, panels):
+        for col in cols:
+            ax.plot(dates, columns[col][keep], label=col, linewidth=0.8)
+        if cols == ["RSI"]:
+            ax.axhline(70, color="red", linestyle="--")
+            ax.axhline(30, color="blue", linestyle="--")
+        ax.legend(loc="upper left")
+        ax.grid(True)
+    axes[0].set_title(f"{ticker} Closing Price with Indicators")
+    fig.savefig(path)
+    fig.clf()
+    return path
+
+
+def export_stock_charts(
+    stock_data, output_dir, fmt="png", workers=None, max_points=1000, dpi=100
+):
+    """
+    Render one chart per ticker to image files without blocking on plt.show().
+
+    Each ticker is a separate task in a process pool, rendered with the Agg
+    canvas. Series longer than `max_points` are downsampled with LTTB, so
+    render time and memory stay bounded for long histories.
+
+    Args:
+        stock_data (dict or PriceStore): Dictionary of stock DataFrames with
+                           'date', 'close' and optionally 'SMA_20', 'SMA_50',
+                           'RSI', 'MACD' and 'Signal' columns. With a
+                           `PriceStore`, workers receive only the store path
+                           and read their ticker from the shared memory map.
+        output_dir (str): Directory for the image files.
+        fmt (str): Image format, 'png' or 'svg'.
+        workers (int, optional): Worker processes; None or 1 renders serially.
+        max_points (int): Maximum points drawn per series.
+        dpi (int): Resolution of raster output.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if isinstance(stock_data, PriceStore):
+        sources = (
+            [(ticker, stock_data) for ticker in stock_data]
+            if "close" in stock_data.fields
+            else []
+        )
+    else:
+        sources = [
+            (ticker, _chart_columns(df))
+            for ticker, df in stock_data.items()
+            if "date" in df.columns and "close" in df.columns
+        ]
+    tasks = [
+        (ticker, columns, os.path.join(output_dir, f"{ticker}.{fmt}"), max_points, dpi)
+        for ticker, columns in sources
+    ]
+
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_render_stock_chart, tasks))
+    return [_render_stock_chart(task) for task in tasks]
@@ -0,0 +1,281 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+try:
+    from .indicator_engine import build_panel
+    from .price_store import PriceStore
+    from .profiling import instrument
+except ImportError:
+    from indicator_engine import build_panel
+    from price_store import PriceStore
+    from profiling import instrument
+
+EVENT_MODELS = ("market", "mean", "market_adjusted")
+DEFAULT_WINDOWS = ((-1, 1), (-5, 5))
+DEFAULT_ESTIMATION_WINDOW = (-120, -11)
+
+
+def window_column(window):
+    """
+    Name of the CAR column of an event window, e.g. 'CAR[-5,+5]'.
+    """
+    lo, hi = window
+    return f"CAR[{lo:+d},{hi:+d}]"
+
+
+def sentiment_bucket(polarity):
+    """
+    'negative', 'neutral' or 'positive' by the sign of the polarity.
+    """
+    polarity = np.asarray(polarity, dtype=float)
+    return np.select([polarity > 0, polarity < 0], ["positive", "negative"], "neutral")
+
+
+def _return_panels(stock_data, market=None):
+    """
+    Daily returns of every ticker over its own bars, and the market return.
+
+    As in `compute_indicator_panels`, the NaN rows of each column of the
+    dates x tickers close panel are moved below its bars (a stable sort), so
+    row k of a column is the ticker's k-th session and a return after a gap
+    in its bars spans the gap. The market is the equal-weighted mean return
+    of all tickers on each date, or the return of the `market` ticker (e.g.
+    an index ETF in the data).
+
+    Returns:
+        tuple: (dates, tickers, order, counts, returns, market_returns)
+               where `returns[k, j]` is the return of `tickers[j]` on its
+               k-th bar, dated `dates[order[k, j]]`, `counts[j]` is its number
+               of bars and `market_returns` is indexed by date.
+    """
+    if isinstance(stock_data, PriceStore):
+        dates, tickers, close = stock_data.dates, stock_data.tickers, stock_data.panel("close").T
+    else:
+        dates, tickers, close = build_panel(stock_data)
+    order = np.argsort(np.isnan(close), axis=0, kind="stable")
+    counts = (~np.isnan(close)).sum(axis=0)
+    compressed = np.take_along_axis(close, order, axis=0)
+    returns = np.full(close.shape, np.nan)
+    returns[1:] = compressed[1:] / compressed[:-1] - 1.0
+    by_date = np.empty_like(returns)
+    np.put_along_axis(by_date, order, returns, axis=0)
+    if market is None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            market_returns = np.nanmean(by_date, axis=1)
+    else:
+        if market not in tickers:
+            raise ValueError(f"Market ticker '{market}' not in the stock data")
+        market_returns = by_date[:, list(tickers).index(market)]
+    dates = pd.DatetimeIndex(dates).normalize()
+    return dates, list(tickers), order, counts, returns, market_returns
+
+
+def _window_sums(cumulative, rows, cols, lo, hi):
+    """
+    Sums over rows [t0 + lo, t0 + hi] of a zero-prefixed cumulative panel,
+    clipped to the panel, for every event at once.
+    """
+    n_dates = cumulative.shape[0] - 1
+    start = np.clip(rows + lo, 0, n_dates)
+    stop = np.clip(rows + hi + 1, 0, n_dates)
+    return cumulative[stop, cols] - cumulative[start, cols]
+
+
+@instrument("compute_abnormal_returns")
+def compute_abnormal_returns(
+    events,
+    stock_data,
+    windows=DEFAULT_WINDOWS,
+    model="market",
+    estimation_window=DEFAULT_ESTIMATION_WINDOW,
+    min_estimation=30,
+    ticker_col="stock_name",
+    sentiment_col="Sentiment_Polarity",
+    market=None,
+):
+    """
+    Cumulative abnormal returns (CAR) around every headline event at once.
+
+    Each event is placed on the ticker's first trading day on or after its
+    publication day (day 0). Windows count the ticker's own sessions, so a
+    date on which it has no bar is skipped rather than counted, and the
+    return after such a gap spans it. Expected returns come from a per-event
+    model estimated over `estimation_window` (sessions relative to day 0):
+
+    - 'market': OLS alpha and beta of the ticker's return on the market return;
+    - 'mean': the ticker's mean return;
+    - 'market_adjusted': the market return itself (alpha 0, beta 1).
+
+    The model parameters of all events come from cumulative sums over the
+    sessions x tickers return panel, and the event windows are gathered with
+    one fancy-indexing lookup of shape events x window days. There is no
+    per-event Python loop. A CAR is NaN when its window has no returns or the
+    estimation window has fewer than `min_estimation` returns.
+
+    Args:
+        events (pd.DataFrame): Headline events with 'date' and `ticker_col`,
+                               e.g. scored ratings or merged data.
+        stock_data (dict or PriceStore): Price data with 'date' and 'close'.
+        windows (iterable): (first, last) trading-day offsets of each event window.
+        model (str): 'market', 'mean' or 'market_adjusted'.
+        estimation_window (tuple): (first, last) offsets of the estimation window.
+        min_estimation (int): Minimum returns in the estimation window.
+        ticker_col (str): Ticker column of `events`; matched case-insensitively.
+        sentiment_col (str): Polarity column used for 'sentiment_bucket'.
+        market (str, optional): Ticker used as the market; default equal-weighted.
+
+    Returns:
+        pd.DataFrame: One row per event (same index) with the ticker,
+                      'publisher' and 'sentiment_bucket' when available,
+                      'event_day' and one CAR column per window.
+
+    Raises:
+        ValueError: If the model is unknown, the estimation window overlaps
+                    an event window or there is no price data.
+    """
+    if model not in EVENT_MODELS:
+        raise ValueError(f"Unknown event model '{model}', expected one of {EVENT_MODELS}")
+    windows = [tuple(window) for window in windows]
+    first = min(lo for lo, _ in windows)
+    last = max(hi for _, hi in windows)
+    est_lo, est_hi = estimation_window
+    if model != "market_adjusted" and est_hi >= first:
+        raise ValueError(
+            f"Estimation window {estimation_window} overlaps the event windows {windows}"
+        )
+
+    dates, tickers, order, counts, returns, market_returns = _return_panels(
+        stock_data, market
+    )
+    n_dates = len(dates)
+    if n_dates == 0:
+        raise ValueError("No price data with 'date' and 'close' for the event study")
+    # Market return on the date of each ticker's k-th session.
+    market_panel = market_returns[order]
+    # Bars of each ticker before each date; at the event date this is the
+    # session index of day 0.
+    sessions = np.arange(n_dates)[:, None] < counts[None, :]
+    has_bar = np.empty_like(sessions)
+    np.put_along_axis(has_bar, order, sessions, axis=0)
+    bars_before = np.zeros((n_dates + 1, len(tickers)), dtype=int)
+    np.cumsum(has_bar, axis=0, out=bars_before[1:])
+
+    positions = {}
+    for j, ticker in enumerate(tickers):
+        positions.setdefault(str(ticker).upper(), j)
+    cols = (
+        events[ticker_col].astype(str).str.upper().map(positions)
+        .fillna(-1).to_numpy(dtype=int)
+    )
+    days = pd.to_datetime(events["date"]).dt.normalize().to_numpy()
+    known = cols >= 0
+    cols = np.where(known, cols, 0)
+    rows = bars_before[dates.searchsorted(days), cols]
+    ok = known & (rows < counts[cols]) & ~pd.isna(days)
+    rows, cols = np.where(ok, rows, 0), np.where(ok, cols, 0)
+
+    # Per-event model parameters from cumulative sums over the estimation window.
+    if model == "market_adjusted":
+        alpha, beta = np.zeros(len(rows)), np.ones(len(rows))
+    else:
+        valid = ~np.isnan(returns) & ~np.isnan(market_panel)
+        r0, m0 = np.where(valid, returns, 0.0), np.where(valid, market_panel, 0.0)
+        sums = {}
+        for name, term in [
+            ("n", valid.astype(float)),
+            ("r", r0),
+            ("m", m0),
+            ("rm", r0 * m0),
+            ("mm", m0 * m0),
+        ]:
+            cumulative = np.zeros((n_dates + 1, returns.shape[1]))
+            np.cumsum(term, axis=0, out=cumulative[1:])
+            sums[name] = _window_sums(cumulative, rows, cols, est_lo, est_hi)
+        n = sums["n"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if model == "mean":
+                alpha, beta = sums["r"] / n, np.zeros(len(rows))
+            else:
+                beta = (n * sums["rm"] - sums["r"] * sums["m"]) / (
+                    n * sums["mm"] - sums["m"] ** 2
+                )
+                alpha = (sums["r"] - beta * sums["m"]) / n
+        estimable = n >= min_estimation
+        alpha, beta = np.where(estimable, alpha, np.nan), np.where(estimable, beta, np.nan)
+
+    # Gather every event window at once: events x (last - first + 1) sessions.
+    window_rows = rows[:, None] + np.arange(first, last + 1)[None, :]
+    inside = (window_rows >= 0) & (window_rows < counts[cols][:, None])
+    window_rows = np.clip(window_rows, 0, n_dates - 1)
+    abnormal = returns[window_rows, cols[:, None]] - (
+        alpha[:, None] + beta[:, None] * market_panel[window_rows, cols[:, None]]
+    )
+    abnormal[~inside | ~ok[:, None]] = np.nan
+
+    present = [c for c in (ticker_col, "publisher") if c in events.columns]
+    result = events[present].copy()
+    if sentiment_col in events.columns:
+        result["sentiment_bucket"] = sentiment_bucket(events[sentiment_col])
+    result["event_day"] = np.where(ok, dates[order[rows, cols]], np.datetime64("NaT"))
+    for lo, hi in windows:
+        span = abnormal[:, lo - first : hi - first + 1]
+        observed = (~np.isnan(span)).sum(axis=1)
+        result[window_column((lo, hi))] = np.where(
+            observed > 0, np.nansum(span, axis=1), np.nan
+        )
+    return result
+
+
+def aggregate_abnormal_returns(cars, by):
+    """
+    Mean CAR, its standard deviation, event count and t-statistic per group.
+
+    Args:
+        cars (pd.DataFrame): Output of `compute_abnormal_returns`.
+        by (str): Grouping column, e.g. 'sentiment_bucket', 'publisher' or
+                  the ticker column.
+
+    Returns:
+        pd.DataFrame: Tidy rows of `by`, 'window', 'n', 'mean_car',
+                      'std_car' and 't_stat'.
+    """
+    car_columns = [col for col in cars.columns if col.startswith("CAR[")]
+    long = cars.melt(
+        id_vars=[by], value_vars=car_columns, var_name="window", value_name="car"
+    ).dropna(subset=["car"])
+    stats = (
+        long.groupby([by, "window"], observed=True, sort=True)["car"]
+        .agg(n="count", mean_car="mean", std_car="std")
+        .reset_index()
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats["t_stat"] = stats["mean_car"] / (stats["std_car"] / np.sqrt(stats["n"]))
+    return stats
+
+
+def run_event_study(
+    events,
+    stock_data,
+    by=("sentiment_bucket", "publisher", "stock_name"),
+    **kwargs,
+):
+    """
+    Compute event CARs and aggregate them by each of `by`.
+
+    Args:
+        events (pd.DataFrame): See `compute_abnormal_returns`.
+        stock_data (dict or PriceStore): See `compute_abnormal_returns`.
+        by (iterable): Grouping columns; those absent from the result are skipped.
+        **kwargs: Passed to `compute_abnormal_returns`.
+
+    Returns:
+        dict: 'events' -> per-event CARs, and each grouping column -> its aggregate.
+    """
+    cars = compute_abnormal_returns(events, stock_data, **kwargs)
+    results = {"events": cars}
+    for column in by:
+        if column in cars.columns:
+            results[column] = aggregate_abnormal_returns(cars, column)
+    return results
@@ -1,32 +1,234 @@
-import talib
-import pynance as pn
-import talib
+import copy
+import json
+import os
+import numpy as np
 import pandas as pd
 
+try:
+    from .compact import compact_stage
+    from .profiling import instrument
+except ImportError:
+    from compact import compact_stage
+    from profiling import instrument
 
-def add_technical_indicators(stock_data):
+INDICATOR_COLUMNS = ["SMA_20", "SMA_50", "RSI", "MACD", "Signal", "Hist", "Daily_Returns"]
+SMA_PERIODS = (20, 50)
+RSI_PERIOD = 14
+MACD_PERIODS = {"fast": 12, "slow": 26, "signal": 9}
+SMA_COLUMNS = [INDICATOR_COLUMNS.index(f"SMA_{period}") for period in SMA_PERIODS]
+RSI_COLUMN, MACD_COLUMN, SIGNAL_COLUMN, HIST_COLUMN, RETURNS_COLUMN = (
+    INDICATOR_COLUMNS.index(col)
+    for col in ("RSI", "MACD", "Signal", "Hist", "Daily_Returns")
+)
+
+
+def new_indicator_state():
+    """
+    Return an empty per-ticker indicator state.
+
+    The state holds everything needed to extend the indicators by one bar:
+    the last 50 closes for the SMA windows, Wilder's RSI averages and the
+    three MACD EMAs (each seeded with the SMA of its first `period` inputs).
+    """
+    return {
+        "last_date": None,
+        "closes": [],
+        "rsi": {"count": 0, "gain": 0.0, "loss": 0.0},
+        "fast": {"count": 0, "value": 0.0},
+        "slow": {"count": 0, "value": 0.0},
+        "signal": {"count": 0, "value": 0.0},
+    }
+
+
+def _advance_ema(ema, x, period):
+    """
+    Feed one value into an SMA-seeded EMA state and return its value or NaN.
+    """
+    ema["count"] += 1
+    if ema["count"] < period:
+        ema["value"] += x
+        return np.nan
+    if ema["count"] == period:
+        ema["value"] = (ema["value"] + x) / period
+    else:
+        ema["value"] += (x - ema["value"]) * 2.0 / (period + 1)
+    return ema["value"]
+
+
+def _advance_indicators(state, closes):
+    """
+    Extend the indicators by the given closes, updating `state` in place.
+
+    Every bar costs O(1) (the SMA windows are bounded), so appending N bars
+    costs O(N) whatever the length of the history.
+
+    Returns:
+        np.ndarray: One row of INDICATOR_COLUMNS values per close.
+    """
+    rows = np.full((len(closes), len(INDICATOR_COLUMNS)), np.nan)
+    window = state["closes"]
+    rsi = state["rsi"]
+    for i, close in enumerate(closes):
+        close = float(close)
+        prev_close = window[-1] if window else None
+        window.append(close)
+        del window[: -max(SMA_PERIODS)]
+
+        for col, period in zip(SMA_COLUMNS, SMA_PERIODS):
+            if len(window) >= period:
+                rows[i, col] = sum(window[-period:]) / period
+
+        if prev_close is not None:
+            rows[i, RETURNS_COLUMN] = close / prev_close - 1.0
+            change = close - prev_close
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            rsi["count"] += 1
+            if rsi["count"] <= RSI_PERIOD:
+                rsi["gain"] += gain
+                rsi["loss"] += loss
+                if rsi["count"] == RSI_PERIOD:
+                    rsi["gain"] /= RSI_PERIOD
+                    rsi["loss"] /= RSI_PERIOD
+            else:
+                rsi["gain"] = (rsi["gain"] * (RSI_PERIOD - 1) + gain) / RSI_PERIOD
+                rsi["loss"] = (rsi["loss"] * (RSI_PERIOD - 1) + loss) / RSI_PERIOD
+            if rsi["count"] >= RSI_PERIOD:
+                total = rsi["gain"] + rsi["loss"]
+                rows[i, RSI_COLUMN] = 100.0 * rsi["gain"] / total if total else 0.0
+
+        # As in TA-Lib, the fast EMA starts late so both EMAs seed on the bar
+        # where the slow one becomes available, and the three lines stay
+        # empty until the signal EMA is seeded.
+        slow = _advance_ema(state["slow"], close, MACD_PERIODS["slow"])
+        fast = np.nan
+        if state["slow"]["count"] > MACD_PERIODS["slow"] - MACD_PERIODS["fast"]:
+            fast = _advance_ema(state["fast"], close, MACD_PERIODS["fast"])
+        if not np.isnan(slow):
+            macd = fast - slow
+            signal = _advance_ema(state["signal"], macd, MACD_PERIODS["signal"])
+            if not np.isnan(signal):
+                rows[i, MACD_COLUMN] = macd
+                rows[i, SIGNAL_COLUMN] = signal
+                rows[i, HIST_COLUMN] = macd - signal
+    return rows
+
+
+def load_indicator_state(state_path):
+    """
+    Load persisted per-ticker indicator states, or an empty dict.
+    """
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def save_indicator_state(states, state_path):
+    """
+    Atomically persist per-ticker indicator states as JSON.
+    """
+    directory = os.path.dirname(state_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(states, f)
+    os.replace(tmp_path, state_path)
+
+
+def _update_ticker_indicators(df, state):
+    """
+    Fill INDICATOR_COLUMNS for the bars of `df` newer than the state.
+
+    Bars up to `state['last_date']` keep the indicator values already in the
+    frame, so the frame may hold the previous output plus new bars, or only
+    the new bars. If older bars are present without indicator columns, the
+    state is reset and the full history is recomputed.
+
+    Returns:
+        tuple: (updated DataFrame, updated state).
+    """
+    df = df.sort_values(by="date")
+    dates = pd.to_datetime(df["date"])
+    if state is not None and state["last_date"] is not None:
+        seen = (dates <= pd.Timestamp(state["last_date"])).to_numpy()
+        if seen.any() and not set(INDICATOR_COLUMNS).issubset(df.columns):
+            state = None
+    if state is None or state["last_date"] is None:
+        state = new_indicator_state()
+        seen = np.zeros(len(df), dtype=bool)
+
+    # Indicators are computed in float64, also for compact (float32) frames.
+    df = df.assign(
+        **{
+            col: df[col].astype(np.float64) if col in df.columns else np.nan
+            for col in INDICATOR_COLUMNS
+        }
+    )
+    new = ~seen
+    if new.any():
+        df.loc[new, INDICATOR_COLUMNS] = _advance_indicators(
+            state, df.loc[new, "close"].to_numpy(dtype=np.float64)
+        )
+        state["last_date"] = dates[new].max().isoformat()
+    return df, state
+
+
+@instrument("add_technical_indicators")
+def add_technical_indicators(stock_data, state_path=None, compact=False):
     """
     Adds technical indicators (SMA, RSI, MACD) and daily returns to stock data.
 
     Parameters:
     stock_data (dict): A dictionary where keys are stock tickers and values are DataFrames.
+    state_path (str, optional): Enables the incremental mode. Per-ticker
+        indicator state (SMA windows, Wilder RSI averages, MACD EMAs) is
+        loaded from and saved to this JSON file, and only bars newer than the
+        saved state are computed. Frames must carry the indicator columns
+        from the previous run for the bars already processed. Results are
+        identical to a full recompute in this mode and agree with TA-Lib,
+        including its warm-up NaNs.
+    compact (bool): Store prices and indicators as float32 (see
+        `compact.compact_frame`). Indicators are still computed in float64.
 
     Returns:
     dict: Updated dictionary with technical indicators added.
     """
+    if state_path is not None:
+        states = load_indicator_state(state_path)
+        for ticker, df in stock_data.items():
+            try:
+                if "close" not in df.columns or "date" not in df.columns:
+                    print(f"Skipping {ticker}: Missing 'close' or 'date' column.")
+                    continue
+                # A copy, so a ticker that fails keeps its saved state.
+                stock_data[ticker], states[ticker] = _update_ticker_indicators(
+                    df, copy.deepcopy(states.get(ticker))
+                )
+            except Exception as e:
+                print(f"Error processing {ticker}: {e}")
+        save_indicator_state(states, state_path)
+        if compact:
+            return compact_stage("add_technical_indicators", stock_data)
+        return stock_data
+
+    import talib
+
     for ticker, df in stock_data.items():
         try:
             if "close" not in df.columns or "date" not in df.columns:
                 print(f"Skipping {ticker}: Missing 'close' or 'date' column.")
                 continue
             df = df.sort_values(by="date")
-            df["SMA_20"] = talib.SMA(df["close"], timeperiod=20)
-            df["SMA_50"] = talib.SMA(df["close"], timeperiod=50)
-            df["RSI"] = talib.RSI(df["close"], timeperiod=14)
+            # TA-Lib only accepts float64 input (compact frames hold float32).
+            close = df["close"].astype(np.float64)
+            df["SMA_20"] = talib.SMA(close, timeperiod=20)
+            df["SMA_50"] = talib.SMA(close, timeperiod=50)
+            df["RSI"] = talib.RSI(close, timeperiod=14)
             df["MACD"], df["Signal"], df["Hist"] = talib.MACD(
-                df["close"], fastperiod=12, slowperiod=26, signalperiod=9
+                close, fastperiod=12, slowperiod=26, signalperiod=9
             )
-            df["Daily_Returns"] = df["close"].pct_change()
+            df["Daily_Returns"] = close.pct_change()
             stock_data[ticker] = df
             print(f"Technical indicators added for {ticker}:")
             print(
@@ -47,4 +249,6 @@ def add_technical_indicators(stock_data):
         except Exception as e:
             print(f"Error processing {ticker}: {e}")
 
+    if compact:
+        return compact_stage("add_technical_indicators", stock_data)
     return stock_data
@@ -0,0 +1,432 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+
+try:
+    from .correlation_analysis import _pearson_from_sums, _paired_terms
+    from .price_store import PriceStore
+    from .sentiment_rollup import SentimentRollup
+except ImportError:
+    from correlation_analysis import _pearson_from_sums, _paired_terms
+    from price_store import PriceStore
+    from sentiment_rollup import SentimentRollup
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+FEATURE_KINDS = ("indicators", "sentiment", "correlation")
+SENTIMENT_FIELDS = ["trading_date", "count", "mean", "std", "min", "max"]
+DATE_COLUMNS = ("date", "trading_date", "start", "end")
+RESPONSE_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "json": "application/json",
+}
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by the total size of its values.
+
+    Values are DataFrames, sized by their deep memory usage. Inserting a
+    value evicts the least recently used entries until the total fits in
+    `max_bytes`; a value larger than the whole budget is not cached.
+    """
+
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """
+        The cached value of `key`, marked as recently used, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Cache `value` under `key`, evicting least recently used entries.
+        """
+        size = int(value.memory_usage(deep=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            while self.bytes + size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+            self._entries[key] = (value, size)
+            self.bytes += size
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def encode_frame(df, fmt="json"):
+    """
+    Serialize a result frame as an Arrow IPC stream or compact JSON.
+
+    Compact JSON is `{"columns": [...], "data": [[...], ...]}` with ISO dates
+    and no index.
+
+    Returns:
+        tuple: (content type, body bytes).
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if fmt not in RESPONSE_FORMATS:
+        raise ValueError(
+            f"Unknown format '{fmt}', expected one of {list(RESPONSE_FORMATS)}"
+        )
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return RESPONSE_FORMATS[fmt], sink.getvalue().to_pybytes()
+    body = df.to_json(orient="split", index=False, date_format="iso")
+    return RESPONSE_FORMATS[fmt], body.encode("utf-8")
+
+
+def decode_frame(body, content_type):
+    """
+    Inverse of `encode_frame`.
+    """
+    if content_type == RESPONSE_FORMATS["arrow"]:
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    payload = json.loads(body)
+    df = pd.DataFrame(payload["data"], columns=payload["columns"])
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+
+class FeatureService:
+    """
+    Per-ticker indicators, daily sentiment and correlation stats over
+    precomputed artifacts.
+
+    Indicators are read from a memory-mapped `PriceStore` and daily
+    sentiment from a `SentimentRollup`. The correlation of a ticker pairs
+    its daily mean sentiment with the store's 'Daily_Returns' over the
+    requested range. Results are cached per (kind, ticker, start, end) in an
+    `LRUCache`. `prewarm` fills the cache for hot tickers over their full
+    history. Request latencies are kept per kind for `metrics`.
+    """
+
+    def __init__(
+        self, price_store, rollup, cache_bytes=256 * 2**20, latency_window=10_000
+    ):
+        if isinstance(price_store, str):
+            price_store = PriceStore(price_store)
+        if isinstance(rollup, str):
+            rollup = SentimentRollup.load(rollup)
+        self.store = price_store
+        daily = rollup.daily("ticker")
+        self._sentiment = {
+            ticker: frame.drop(columns="ticker").reset_index(drop=True)
+            for ticker, frame in daily.groupby("ticker", sort=False)
+        }
+        self._tickers = {ticker.upper(): ticker for ticker in self.store.tickers}
+        for ticker in self._sentiment:
+            self._tickers.setdefault(ticker, ticker)
+        self.cache = LRUCache(cache_bytes)
+        self._latency_window = latency_window
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    @property
+    def tickers(self):
+        return sorted(self._tickers.values())
+
+    def _resolve(self, ticker):
+        resolved = self._tickers.get(str(ticker).upper())
+        if resolved is None:
+            raise KeyError(f"Unknown ticker '{ticker}'")
+        return resolved
+
+    def _indicators(self, ticker, start, end):
+        if ticker not in self.store.tickers:
+            return pd.DataFrame(columns=["date", *self.store.fields])
+        return self.store.select(tickers=[ticker], start=start, end=end)[ticker]
+
+    def _daily_sentiment(self, ticker, start, end):
+        daily = self._sentiment.get(ticker.upper())
+        if daily is None:
+            return pd.DataFrame(columns=SENTIMENT_FIELDS)
+        days = daily["trading_date"]
+        keep = np.ones(len(daily), dtype=bool)
+        if start is not None:
+            keep &= (days >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            keep &= (days <= pd.Timestamp(end)).to_numpy()
+        return daily.loc[keep, SENTIMENT_FIELDS]
+
+    def _correlation(self, ticker, start, end, min_periods=3):
+        sentiment = self._daily_sentiment(ticker, start, end)
+        if ticker in self.store.tickers and "Daily_Returns" in self.store.fields:
+            returns = self.store.lookup(
+                "Daily_Returns", [ticker] * len(sentiment), sentiment["trading_date"]
+            )
+        else:
+            returns = np.full(len(sentiment), np.nan)
+        sums = [
+            np.array([term.sum()])
+            for term in _paired_terms(sentiment["mean"].to_numpy(dtype=float), returns)
+        ]
+        r, p = _pearson_from_sums(*sums, min_periods)
+        return pd.DataFrame(
+            {
+                "ticker": [ticker],
+                "start": [
+                    pd.Timestamp(start) if start else sentiment["trading_date"].min()
+                ],
+                "end": [pd.Timestamp(end) if end else sentiment["trading_date"].max()],
+                "n": [int(sums[0][0])],
+                "correlation": r,
+                "p_value": p,
+            }
+        )
+
+    def features(self, kind, ticker, start=None, end=None):
+        """
+        One kind of feature for a ticker and inclusive date range, cached.
+
+        Args:
+            kind (str): 'indicators', 'sentiment' or 'correlation'.
+            ticker (str): Ticker, matched case-insensitively.
+            start, end (str, optional): Date bounds.
+
+        Returns:
+            pd.DataFrame: The features; treat it as read-only, it is shared
+                          through the cache.
+
+        Raises:
+            KeyError: If the ticker is unknown.
+            ValueError: If the kind or a date is invalid.
+        """
+        if kind not in FEATURE_KINDS:
+            raise ValueError(
+                f"Unknown feature kind '{kind}', expected one of {FEATURE_KINDS}"
+            )
+        ticker = self._resolve(ticker)
+        start = None if start is None else pd.Timestamp(start).isoformat()
+        end = None if end is None else pd.Timestamp(end).isoformat()
+        key = (kind, ticker, start, end)
+        result = self.cache.get(key)
+        if result is None:
+            if kind == "indicators":
+                result = self._indicators(ticker, start, end)
+            elif kind == "sentiment":
+                result = self._daily_sentiment(ticker, start, end)
+            else:
+                result = self._correlation(ticker, start, end)
+            self.cache.put(key, result)
+        return result
+
+    def prewarm(self, tickers):
+        """
+        Cache every feature kind of the given tickers over their full history.
+
+        Returns:
+            int: Number of tickers warmed; unknown tickers are skipped.
+        """
+        warmed = 0
+        for ticker in tickers:
+            try:
+                for kind in FEATURE_KINDS:
+                    self.features(kind, ticker)
+            except KeyError:
+                logging.warning(f"Cannot prewarm unknown ticker '{ticker}'")
+                continue
+            warmed += 1
+        logging.info(f"Prewarmed {warmed} tickers: {self.cache.stats()}")
+        return warmed
+
+    def record_latency(self, endpoint, seconds):
+        with self._lock:
+            window = self._latencies.setdefault(
+                endpoint, deque(maxlen=self._latency_window)
+            )
+            window.append(seconds)
+
+    def metrics(self):
+        """
+        p50/p99 request latency in milliseconds per endpoint, and cache stats.
+        """
+        with self._lock:
+            latencies = {
+                name: np.array(values) * 1000
+                for name, values in self._latencies.items()
+            }
+        return {
+            "latency": {
+                name: {
+                    "requests": len(values),
+                    "p50_ms": float(np.percentile(values, 50)),
+                    "p99_ms": float(np.percentile(values, 99)),
+                }
+                for name, values in latencies.items()
+                if len(values)
+            },
+            "cache": self.cache.stats(),
+        }
+
+
+def make_handler(service):
+    """
+    HTTP request handler class serving `service`.
+
+    Routes:
+        GET /<kind>/<ticker>?start=&end=&format=arrow|json
+        GET /tickers
+        GET /metrics
+    """
+
+    class FeatureHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type="application/json"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            started = time.perf_counter()
+            url = urlparse(self.path)
+            parts = [part for part in url.path.split("/") if part]
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            endpoint = parts[0] if parts else ""
+            content_type = "application/json"
+            try:
+                if parts == ["metrics"]:
+                    status, body = 200, service.metrics()
+                elif parts == ["tickers"]:
+                    status, body = 200, service.tickers
+                elif len(parts) == 2 and parts[0] in FEATURE_KINDS:
+                    frame = service.features(
+                        parts[0], parts[1], query.get("start"), query.get("end")
+                    )
+                    content_type, body = encode_frame(
+                        frame, query.get("format", "json")
+                    )
+                    status = 200
+                else:
+                    endpoint = "not_found"
+                    status, body = 404, {"error": f"Unknown path '{url.path}'"}
+            except KeyError as e:
+                status, body = 404, {"error": str(e.args[0])}
+            except ValueError as e:
+                status, body = 400, {"error": str(e)}
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode("utf-8")
+            # Recorded before the response is written, so a client that reads
+            # /metrics right after a response sees that request counted.
+            service.record_latency(endpoint, time.perf_counter() - started)
+            self._send(status, body, content_type)
+
+        def address_string(self):
+            # Unix-socket clients have no (host, port) address.
+            return self.client_address[0] if self.client_address else "unix"
+
+        def log_message(self, format, *args):
+            logging.debug(f"{self.address_string()} {format % args}")
+
+    return FeatureHandler
+
+
+class UnixHTTPServer(ThreadingHTTPServer):
+    """
+    Threading HTTP server listening on a Unix domain socket.
+    """
+
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        self.socket.bind(self.server_address)
+        self.server_name, self.server_port = "localhost", 0
+
+    def get_request(self):
+        request, _ = self.socket.accept()
+        return request, ("unix", 0)
+
+
+def create_feature_server(service, host="127.0.0.1", port=8050, unix_socket=None):
+    """
+    HTTP server for a `FeatureService` on a local TCP port or a Unix socket.
+
+    Call `serve_forever()` on the result (e.g. in a thread) and
+    `shutdown()` to stop it.
+    """
+    handler = make_handler(service)
+    if unix_socket is not None:
+        return UnixHTTPServer(unix_socket, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def fetch_features(base_url, kind, ticker, start=None, end=None, fmt="arrow"):
+    """
+    Client helper for notebooks: request features and return a DataFrame.
+
+    Args:
+        base_url (str): Server URL, e.g. 'http://127.0.0.1:8050'.
+        kind (str): 'indicators', 'sentiment' or 'correlation'.
+        ticker (str): Ticker.
+        start, end (str, optional): Date bounds.
+        fmt (str): 'arrow' or 'json'.
+
+    Returns:
+        pd.DataFrame: The features.
+    """
+    from urllib.parse import urlencode
+    from urllib.request import urlopen
+
+    query = {"format": fmt, **{k: v for k, v in (("start", start), ("end", end)) if v}}
+    url = f"{base_url.rstrip('/')}/{kind}/{ticker}?{urlencode(query)}"
+    with urlopen(url) as response:
+        return decode_frame(response.read(), response.headers["Content-Type"])
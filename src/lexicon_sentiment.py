@@ -0,0 +1,280 @@
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# Like pattern's tokenizer, contractions are split off and quotes become
+# separate tokens before the text is split into words, so "n't" ends up as
+# "n", "'", "t" and never reaches the negation rule.
+CONTRACTIONS = r"('d|'m|'s|'ll|'re|'ve|n't)"
+QUOTES = r"([“”‘’'\"])"
+NEGATIONS = ("no", "not", "never")
+IRONY = "(!)"
+EXCLAMATION_BOOST = 1.25
+NEGATION_FACTOR = -0.5
+
+# Documented parity with `TextBlob(text).sentiment.polarity`: the scorer
+# implements the lexicon lookup, intensifier, negation, exclamation, emoticon
+# and irony rules of the pattern analyzer, and headlines whose emoticons depend
+# on pattern's sentence splitting are tokenized by pattern itself, so scores
+# agree up to floating-point rounding. Checked on fuzzed headlines in
+# tests/test_lexicon_sentiment.py.
+POLARITY_TOLERANCE = 1e-9
+# Part of every cached lexicon polarity (see `sentimental_analysis.headline_key`);
+# bump it whenever the scores produced here change.
+LEXICON_VERSION = 2
+
+
+@lru_cache(maxsize=1)
+def compile_lexicon():
+    """
+    Compile TextBlob's pattern sentiment lexicon into NumPy arrays.
+
+    Returns:
+        dict: 'index' (pd.Index of words), and aligned 'polarity', 'intensity',
+              'modifier' (word is a known adverb) and 'ly' arrays, plus
+              'emoticons' (pd.Series of polarity by lower-cased emoticon) and
+              'emoticon_pieces' (regex matching tokens made of emoticon
+              characters).
+    """
+    from textblob._text import EMOTICONS, PUNCTUATION
+    from textblob.en import sentiment as pattern_sentiment
+
+    if dict.__len__(pattern_sentiment) == 0:
+        pattern_sentiment.load()
+    words = list(dict.keys(pattern_sentiment))
+    entries = [dict.__getitem__(pattern_sentiment, w) for w in words]
+    # Like the analyzer, match lower-cased tokens to the first mood listing
+    # them, skipping alphabetic tokens and punctuation marks.
+    emoticons = {}
+    for (_, polarity), faces in EMOTICONS.items():
+        for face in faces:
+            face = face.lower()
+            if not face.isalpha() and len(face) <= 5 and face not in PUNCTUATION:
+                emoticons.setdefault(face, polarity)
+    characters = set("".join(face for faces in EMOTICONS.values() for face in faces))
+    return {
+        "index": pd.Index(words),
+        "ly": np.array([w.endswith("ly") for w in words]),
+        "polarity": np.array([e[None][0] for e in entries], dtype=float),
+        "intensity": np.array([e[None][2] for e in entries], dtype=float),
+        "modifier": np.array(
+            [any(m in e for m in pattern_sentiment.modifiers) for e in entries]
+        ),
+        "emoticons": pd.Series(emoticons, dtype=float),
+        "emoticon_pieces": "[%s]+"
+        % re.escape("".join(sorted(characters | set(IRONY)))),
+    }
+
+
+def _retokenize_emoticons(tokens, doc, texts):
+    """
+    Tokenize headlines with emoticons split into several tokens again with
+    pattern's `find_tokens`.
+
+    The analyzer joins emoticons and "(!)" markers by applying its emoticon
+    and irony patterns to each sentence of the tokenized headline. That can
+    only change headlines with two adjacent tokens made of emoticon
+    characters, and the result depends on the sentence boundaries, so those
+    headlines are tokenized the reference way instead.
+    """
+    from textblob._text import find_tokens
+
+    piece = pd.Series(tokens).str.fullmatch(compile_lexicon()["emoticon_pieces"])
+    piece = piece.to_numpy(dtype=bool)
+    pairs = piece[:-1] & piece[1:] & (doc[:-1] == doc[1:])
+    affected = np.isin(doc, doc[:-1][pairs])
+    if not affected.any():
+        return tokens, doc
+    redone = pd.Series(
+        [" ".join(find_tokens(texts[d])).split() for d in np.unique(doc[affected])],
+        index=np.unique(doc[affected]),
+        dtype=object,
+    ).explode().dropna()
+    tokens = np.concatenate([tokens[~affected], redone.to_numpy(dtype=object)])
+    doc = np.concatenate([doc[~affected], redone.index.to_numpy(dtype=np.int64)])
+    order = np.argsort(doc, kind="stable")
+    return tokens[order], doc[order]
+
+
+def tokenize_headlines(texts):
+    """
+    Tokenize a column of headlines into one flat token array.
+
+    Contractions and quotes are split off with vectorized string operations.
+    Each distinct whitespace-separated chunk is then split once with
+    pattern's `find_tokens`, which separates leading and trailing
+    punctuation but keeps abbreviations ("U.S.") and inner punctuation
+    together. Headlines with emoticons split across tokens are tokenized
+    again by `find_tokens` as a whole. Tokens are lower-cased afterwards, as
+    in the pattern analyzer.
+
+    Args:
+        texts (iterable): Headlines to tokenize.
+
+    Returns:
+        tuple: (tokens, doc) where `doc[k]` is the position of the headline
+               that produced `tokens[k]`.
+    """
+    from textblob._text import find_tokens
+
+    texts = pd.Series(texts).astype(str).reset_index(drop=True)
+    chunks = (
+        texts.str.replace(CONTRACTIONS, r" \1", regex=True)
+        .str.replace(QUOTES, r" \1 ", regex=True)
+        .str.split()
+        .explode()
+        .dropna()
+    )
+    codes, unique = pd.factorize(chunks)
+    split = np.empty(len(unique), dtype=object)
+    split[:] = [" ".join(find_tokens(chunk)).split() for chunk in unique]
+    tokens = pd.Series(split[codes], index=chunks.index, dtype=object)
+    tokens = tokens.explode().dropna()
+    tokens, doc = _retokenize_emoticons(
+        tokens.to_numpy(dtype=object), tokens.index.to_numpy(dtype=np.int64), texts
+    )
+    return pd.Series(tokens, dtype=object).str.lower().to_numpy(dtype=object), doc
+
+
+def _last_event(events, doc_start):
+    """
+    Position of the latest event at or before each token of the same
+    headline, or -1.
+    """
+    positions = np.arange(len(events))
+    last = np.maximum.accumulate(np.where(events, positions, -1))
+    return np.where(last >= doc_start, last, -1)
+
+
+def _shift(values, first, fill):
+    """
+    The value at the previous token of the same headline, or `fill`.
+    """
+    shifted = np.empty_like(values)
+    shifted[0] = fill
+    shifted[1:] = values[:-1]
+    return np.where(first, fill, shifted)
+
+
+def score_polarity(texts):
+    """
+    Score a column of headlines at once with the compiled pattern lexicon.
+
+    The scorer reproduces the state machine of pattern's
+    `Sentiment.assessments` on flat token arrays. The pending modifier and
+    the pending negation at each token are the state left by the latest
+    token that sets or clears them, found with running maxima instead of a
+    loop. A known word starts a new assessment unless a modifier is
+    pending, in which case it joins the previous one ("very good"). A
+    negation right after an "-ly" adverb negates the adverb's assessment
+    and keeps the adverb pending ("really not good"). Emoticons and "(!)"
+    markers are assessments of their own. Per-headline means are taken
+    with `np.bincount`.
+
+    Args:
+        texts (iterable): Headlines to score.
+
+    Returns:
+        np.ndarray: Polarity in [-1, 1] per headline, within
+                    POLARITY_TOLERANCE of TextBlob's polarity.
+    """
+    texts = pd.Series(texts)
+    n_docs = len(texts)
+    tokens, doc = tokenize_headlines(texts)
+    if len(tokens) == 0:
+        return np.zeros(n_docs)
+
+    lexicon = compile_lexicon()
+    lex = lexicon["index"].get_indexer(tokens)
+    known = lex >= 0
+    safe = np.maximum(lex, 0)
+    modifier = known & lexicon["modifier"][safe]
+    ly_modifier = modifier & lexicon["ly"][safe]
+    is_negation = np.isin(tokens, NEGATIONS)
+    token_str = pd.Series(tokens)
+    length = token_str.str.len().to_numpy()
+    stripped_length = token_str.str.strip("'").str.len().to_numpy()
+    unknown = ~known
+    emoticon = token_str.map(lexicon["emoticons"]).to_numpy(dtype=float)
+    special = unknown & (~np.isnan(emoticon) | (tokens == IRONY))
+
+    positions = np.arange(len(tokens))
+    first = np.ones(len(tokens), dtype=bool)
+    first[1:] = doc[1:] != doc[:-1]
+    doc_start = np.maximum.accumulate(np.where(first, positions, 0))
+
+    # Pending modifier after each token: set or cleared by known words and
+    # cleared by unknown words longer than two characters. An unknown
+    # negation only clears it when it is not an "-ly" adverb.
+    long_negation = unknown & is_negation & (length > 2)
+    m_event = _last_event(known | (unknown & ~is_negation & (length > 2)), doc_start)
+    crossed = np.cumsum(long_negation)
+    m_word = np.maximum(m_event, 0)
+    keeps = (m_event >= 0) & modifier[m_word]
+    keeps &= ly_modifier[m_word] | (crossed == crossed[m_word])
+    m_after = np.where(keeps, m_event, -1)
+    m_before = _shift(m_after, first, -1)
+
+    # A negation after an "-ly" adverb negates the adverb's assessment.
+    consumed = unknown & is_negation & (m_before >= 0)
+    consumed &= ly_modifier[np.maximum(m_before, 0)]
+
+    # Pending negation after each token: set by negations unless consumed,
+    # cleared by known words and by unknown words of two or more characters.
+    n_event = _last_event(
+        known | is_negation | (unknown & (stripped_length > 1)), doc_start
+    )
+    n_word = np.maximum(n_event, 0)
+    n_after = (n_event >= 0) & is_negation[n_word] & ~consumed[n_word]
+    n_before = _shift(n_after, first, False)
+
+    # Assessments: emoticons, "(!)" and known words without a pending
+    # modifier start one, the other known words join the latest. A joining
+    # word is scaled by the intensity of the item before it, inverted when
+    # that word was negated.
+    starts = (known & (m_before < 0)) | special
+    if not starts.any():
+        return np.zeros(n_docs)
+    assessment = np.cumsum(starts) - 1
+    items = np.flatnonzero(known | special)
+    item_known = known[items]
+    polarity = np.where(
+        item_known, lexicon["polarity"][safe[items]], np.nan_to_num(emoticon[items])
+    )
+    intensity = np.where(item_known, lexicon["intensity"][safe[items]], 1.0)
+    negated_item = n_before[items] & item_known
+    intensity = np.where(negated_item, 1.0 / intensity, intensity)
+    joins = ~starts[items]
+    prev_intensity = np.ones(len(items))
+    prev_intensity[1:] = intensity[:-1]
+    polarity = np.where(joins, np.clip(polarity * prev_intensity, -1.0, 1.0), polarity)
+
+    # The last item of an assessment holds its polarity.
+    item_assessment = assessment[items]
+    is_last = np.ones(len(items), dtype=bool)
+    is_last[:-1] = item_assessment[1:] != item_assessment[:-1]
+    n_assessments = int(starts.sum())
+    scores = np.zeros(n_assessments)
+    scores[item_assessment[is_last]] = polarity[is_last]
+
+    # Negations and "!" apply to the latest assessment of their headline;
+    # a "!" before a word joining that assessment is overwritten.
+    last_item = _last_event(known | special, doc_start)
+    target = assessment[np.maximum(last_item, 0)]
+    negated = np.zeros(n_assessments, dtype=bool)
+    negated[item_assessment[negated_item]] = True
+    negated[target[consumed]] = True
+    last_position = np.zeros(n_assessments, dtype=np.int64)
+    last_position[item_assessment[is_last]] = items[is_last]
+    bangs = (tokens == "!") & (last_item >= 0)
+    bangs &= last_item == last_position[target]
+    boosts = np.bincount(target[bangs], minlength=n_assessments)
+
+    scores = np.clip(scores * EXCLAMATION_BOOST**boosts, -1.0, 1.0)
+    scores = np.where(negated, scores * NEGATION_FACTOR, scores)
+
+    assessment_doc = doc[starts]
+    totals = np.bincount(assessment_doc, weights=scores, minlength=n_docs)
+    counts = np.bincount(assessment_doc, minlength=n_docs)
+    return totals / np.maximum(counts, 1)
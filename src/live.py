@@ -0,0 +1,566 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+try:
+    from .correlation_analysis import _pearson_from_sums
+    from .feature_engineering import (
+        INDICATOR_COLUMNS,
+        _advance_indicators,
+        load_indicator_state,
+        new_indicator_state,
+        save_indicator_state,
+    )
+    from .sentimental_analysis import score_headlines
+except ImportError:
+    from correlation_analysis import _pearson_from_sums
+    from feature_engineering import (
+        INDICATOR_COLUMNS,
+        _advance_indicators,
+        load_indicator_state,
+        new_indicator_state,
+        save_indicator_state,
+    )
+    from sentimental_analysis import score_headlines
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Sub-folders of the drop directory. Writers should create files under a
+# dot-prefixed name and rename them into place; dot files are ignored.
+LIVE_HEADLINE_DIR = "headlines"
+LIVE_BAR_DIR = "bars"
+HEADLINE_SYMBOL_COLUMNS = ("stock", "symbol")
+RETURNS_INDEX = INDICATOR_COLUMNS.index("Daily_Returns")
+
+
+def _score_texts(texts, backend):
+    """
+    Worker-process scoring of one batch of headlines.
+    """
+    return score_headlines(texts, backend=backend).tolist()
+
+
+def parse_event(record, received):
+    """
+    Turn one JSON-lines record into a live event.
+
+    Headline records look like {"type": "headline", "date": ..., "stock": ...,
+    "headline": ...}; bar records like {"type": "bar", "date": ...,
+    "ticker": ..., "close": ...}.
+
+    Raises:
+        ValueError: If the record type or a required field is missing, or a
+                    bar's close is not a finite number.
+    """
+    kind = record.get("type")
+    try:
+        if kind == "headline":
+            symbol = next(record[col] for col in HEADLINE_SYMBOL_COLUMNS if col in record)
+            return {
+                "kind": "headline",
+                "ticker": str(symbol).upper(),
+                "date": pd.Timestamp(record["date"]).tz_localize(None),
+                "text": str(record["headline"]),
+                "received": received,
+            }
+        if kind == "bar":
+            close = float(record["close"])
+            # One NaN or inf close would poison the ticker's indicator state.
+            if not math.isfinite(close):
+                raise ValueError(f"Non-finite close in bar record: {record}")
+            return {
+                "kind": "bar",
+                "ticker": str(record["ticker"]).upper(),
+                "date": pd.Timestamp(record["date"]).tz_localize(None),
+                "close": close,
+                "received": received,
+            }
+    except (KeyError, StopIteration, TypeError) as e:
+        raise ValueError(f"Incomplete {kind} record: {record}") from e
+    raise ValueError(f"Unknown live record type '{kind}'")
+
+
+def read_drop_file(path, kind, received):
+    """
+    Read a headline or bar CSV dropped into the live directory as events.
+
+    Column names are matched case-insensitively. Headline files need 'date',
+    'headline' and 'stock' or 'symbol'. Bar files need 'date' and 'close',
+    as in the yfinance layout of the historical price files, and take the
+    ticker from a 'ticker' column or from the file name up to the first
+    underscore (`AAPL_historical_data.csv` -> AAPL).
+
+    Rows with a missing date, headline, symbol or close are skipped.
+
+    Raises:
+        ValueError: If required columns are missing, or a close is infinite.
+    """
+    df = pd.read_csv(path)
+    # Price files use the yfinance layout (Date, Open, ..., Close, Adj Close).
+    df.columns = df.columns.str.lower()
+    if "date" not in df.columns:
+        raise ValueError(f"Live file '{path}' has no date column")
+    # Wall-clock time, any UTC offset dropped, as in `load_analyst_ratings`.
+    dates = pd.to_datetime(df["date"].astype(str).str.slice(0, 19), errors="coerce")
+    if kind == "headline":
+        symbol = next((col for col in HEADLINE_SYMBOL_COLUMNS if col in df.columns), None)
+        if symbol is None or "headline" not in df.columns:
+            raise ValueError(f"Headline file '{path}' needs headline and stock/symbol")
+        keep = (dates.notna() & df["headline"].notna() & df[symbol].notna()).to_numpy()
+        rows = zip(
+            df.loc[keep, symbol].astype(str).str.upper(),
+            dates[keep],
+            df.loc[keep, "headline"].astype(str),
+        )
+        return [
+            {
+                "kind": kind,
+                "ticker": ticker,
+                "date": date,
+                "text": text,
+                "received": received,
+            }
+            for ticker, date, text in rows
+        ]
+    if "close" not in df.columns:
+        raise ValueError(f"Bar file '{path}' needs a close column")
+    if "ticker" in df.columns:
+        tickers = df["ticker"].astype(str).str.upper()
+    else:
+        ticker = os.path.basename(path).split("_")[0].split(".")[0].upper()
+        tickers = pd.Series(ticker, index=df.index)
+    keep = (dates.notna() & df["close"].notna()).to_numpy()
+    closes = df.loc[keep, "close"].astype(float)
+    if not np.isfinite(closes).all():
+        raise ValueError(f"Bar file '{path}' has non-finite closes")
+    rows = zip(tickers[keep], dates[keep], closes)
+    return [
+        {
+            "kind": kind,
+            "ticker": ticker,
+            "date": date,
+            "close": close,
+            "received": received,
+        }
+        for ticker, date, close in rows
+    ]
+
+
+def _pair_terms(x, y):
+    return np.array([1.0, x, y, x * x, y * y, x * y])
+
+
+class LiveEngine:
+    """
+    Incremental sentiment, indicator and correlation state fed by live events.
+
+    Events go through a bounded `asyncio.Queue`; `put` waits while the queue
+    is full, which applies backpressure to every source. The consumer takes
+    batches of up to `batch_size` events, waiting at most `batch_wait`
+    seconds to fill one. Headlines of a batch are scored in a worker process
+    pool, so the event loop stays responsive. Bars advance each ticker's
+    SMA/RSI/MACD state in O(1) per bar (see `feature_engineering`); bars
+    at or before a ticker's last bar are skipped.
+
+    For each ticker the daily mean sentiment and the daily return of the
+    same day form one pair. The running sums of those pairs give the
+    per-ticker Pearson correlation at any time. When a late headline
+    changes a day's mean, the old pair is subtracted and the new one added.
+    The latency of an event is the time from its arrival (file discovery,
+    line read) to the end of its batch.
+    """
+
+    def __init__(
+        self,
+        states=None,
+        backend="lexicon",
+        workers=2,
+        batch_size=256,
+        batch_wait=0.05,
+        queue_size=10_000,
+        latency_window=100_000,
+    ):
+        self.states = {str(t).upper(): s for t, s in (states or {}).items()}
+        self.backend = backend
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.latencies = deque(maxlen=latency_window)
+        self.latest = {}
+        self.counts = {"headline": 0, "bar": 0, "stale_bar": 0, "batches": 0}
+        self._sentiment = {}
+        self._returns = {}
+        self._paired = {}
+        self._sums = {}
+        self._pool = None
+
+    async def put(self, event):
+        """
+        Queue an event, waiting while the queue is full.
+        """
+        await self.queue.put(event)
+
+    async def _next_batch(self, done):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = [await asyncio.wait_for(self.queue.get(), timeout=0.1)]
+                break
+            except asyncio.TimeoutError:
+                if done.is_set() and self.queue.empty():
+                    return []
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        return batch
+
+    def _update_pair(self, ticker, day):
+        sentiment = self._sentiment.get(ticker, {}).get(day)
+        ret = self._returns.get(ticker, {}).get(day)
+        if sentiment is None or ret is None or np.isnan(ret):
+            return
+        x = sentiment[0] / sentiment[1]
+        paired = self._paired.setdefault(ticker, {})
+        sums = self._sums.setdefault(ticker, np.zeros(6))
+        if day in paired:
+            sums -= _pair_terms(paired[day], ret)
+        sums += _pair_terms(x, ret)
+        paired[day] = x
+
+    async def process(self, batch):
+        """
+        Score the headlines and apply the bars of one batch.
+        """
+        headlines = [event for event in batch if event["kind"] == "headline"]
+        bars = [event for event in batch if event["kind"] == "bar"]
+        if headlines:
+            texts = [event["text"] for event in headlines]
+            if self._pool is not None:
+                loop = asyncio.get_running_loop()
+                scores = await loop.run_in_executor(
+                    self._pool, _score_texts, texts, self.backend
+                )
+            else:
+                scores = _score_texts(texts, self.backend)
+            for event, score in zip(headlines, scores):
+                ticker, day = event["ticker"], event["date"].normalize()
+                totals = self._sentiment.setdefault(ticker, {}).setdefault(day, [0.0, 0])
+                totals[0] += score
+                totals[1] += 1
+                self._update_pair(ticker, day)
+
+        by_ticker = {}
+        for event in bars:
+            by_ticker.setdefault(event["ticker"], []).append(event)
+        for ticker, events in by_ticker.items():
+            state = self.states.setdefault(ticker, new_indicator_state())
+            events.sort(key=lambda event: event["date"])
+            fresh = []
+            previous = state["last_date"] and pd.Timestamp(state["last_date"])
+            for event in events:
+                if previous is not None and event["date"] <= previous:
+                    self.counts["stale_bar"] += 1
+                    continue
+                fresh.append(event)
+                previous = event["date"]
+            if not fresh:
+                continue
+            rows = _advance_indicators(state, [event["close"] for event in fresh])
+            state["last_date"] = fresh[-1]["date"].isoformat()
+            returns = self._returns.setdefault(ticker, {})
+            for event, row in zip(fresh, rows):
+                day = event["date"].normalize()
+                returns[day] = row[RETURNS_INDEX]
+                self._update_pair(ticker, day)
+            self.latest[ticker] = {
+                "date": fresh[-1]["date"],
+                "close": fresh[-1]["close"],
+                **dict(zip(INDICATOR_COLUMNS, rows[-1].tolist())),
+            }
+
+        now = time.perf_counter()
+        self.latencies.extend(now - event["received"] for event in batch)
+        self.counts["headline"] += len(headlines)
+        self.counts["bar"] += len(bars)
+        self.counts["batches"] += 1
+
+    async def start(self):
+        """
+        Start the scoring workers and load the scorer in each of them, so the
+        first events do not pay for it.
+        """
+        if self._pool is not None or not self.workers:
+            return
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._pool, _score_texts, ["warm up"], self.backend)
+                for _ in range(self.workers)
+            )
+        )
+
+    async def run(self, done):
+        """
+        Consume batches until `done` is set (no more events will be queued)
+        and the queue is drained.
+        """
+        await self.start()
+        try:
+            while True:
+                batch = await self._next_batch(done)
+                if not batch:
+                    return
+                await self.process(batch)
+                for _ in batch:
+                    self.queue.task_done()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def correlations(self, min_periods=3):
+        """
+        Running per-ticker sentiment/return correlations.
+
+        Returns:
+            pd.DataFrame: 'ticker', 'n', 'correlation' and 'p_value' rows.
+        """
+        tickers = sorted(self._sums)
+        sums = np.array([self._sums[t] for t in tickers]).reshape(-1, 6).T
+        r, p = _pearson_from_sums(*sums, min_periods)
+        return pd.DataFrame(
+            {
+                "ticker": tickers,
+                "n": np.rint(sums[0]).astype(int),
+                "correlation": r,
+                "p_value": p,
+            }
+        )
+
+    def report(self):
+        """
+        Event counts, queue depth and latency percentiles in milliseconds.
+        """
+        latencies = np.array(self.latencies) * 1000
+        stats = {**self.counts, "queue_depth": self.queue.qsize()}
+        if len(latencies):
+            stats.update(
+                latency_p50_ms=float(np.percentile(latencies, 50)),
+                latency_p99_ms=float(np.percentile(latencies, 99)),
+                latency_max_ms=float(latencies.max()),
+            )
+        return stats
+
+
+async def watch_drop_directory(engine, drop_dir, stop, poll_interval=0.5):
+    """
+    Queue the rows of every new CSV under `<drop_dir>/headlines` and
+    `<drop_dir>/bars` until `stop` is set. Files are read off the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    seen = set()
+    while True:
+        for kind, folder in (("headline", LIVE_HEADLINE_DIR), ("bar", LIVE_BAR_DIR)):
+            folder = os.path.join(drop_dir, folder)
+            if not os.path.isdir(folder):
+                continue
+            for name in sorted(os.listdir(folder)):
+                path = os.path.join(folder, name)
+                if name.startswith(".") or not name.endswith(".csv") or path in seen:
+                    continue
+                seen.add(path)
+                received = time.perf_counter()
+                try:
+                    events = await loop.run_in_executor(
+                        None, read_drop_file, path, kind, received
+                    )
+                except (OSError, ValueError) as e:
+                    logging.error(f"Skipping live file {path}: {e}")
+                    continue
+                for event in events:
+                    await engine.put(event)
+        if stop.is_set():
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _queue_lines(engine, lines):
+    async for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            await engine.put(parse_event(json.loads(line), time.perf_counter()))
+        except ValueError as e:
+            logging.error(f"Skipping live record: {e}")
+
+
+async def serve_json_lines(engine, host="127.0.0.1", port=8765, connections=None):
+    """
+    Accept JSON-lines events (see `parse_event`) on a local TCP socket.
+
+    Args:
+        engine (LiveEngine): Engine receiving the events.
+        host (str): Interface to listen on.
+        port (int): TCP port; 0 picks a free one.
+        connections (dict, optional): Filled with writer -> handler task for
+            every open connection, for `close_json_lines_server`.
+
+    Returns:
+        asyncio.Server: The listening server; stop it with
+                        `close_json_lines_server`.
+    """
+
+    async def handle(reader, writer):
+        if connections is not None:
+            connections[writer] = asyncio.current_task()
+        try:
+            await _queue_lines(engine, (line.decode("utf-8") async for line in reader))
+        finally:
+            writer.close()
+            if connections is not None:
+                connections.pop(writer, None)
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def close_json_lines_server(server, connections):
+    """
+    Stop accepting connections, then close the open ones and wait for their
+    handlers to queue the lines already received. Handlers are not
+    cancelled, so no CancelledError is logged on shutdown.
+    """
+    server.close()
+    handlers = list(connections.values())
+    for writer in list(connections):
+        writer.close()
+    await asyncio.gather(*handlers, return_exceptions=True)
+    await server.wait_closed()
+
+
+async def tail_json_lines(engine, path, stop, poll_interval=0.2):
+    """
+    Follow a local JSON-lines file like `tail -f` until `stop` is set.
+    """
+
+    async def lines(f):
+        while True:
+            line = f.readline()
+            if line.endswith(b"\n"):
+                yield line.decode("utf-8")
+                continue
+            if stop.is_set():
+                if line:
+                    yield line.decode("utf-8")
+                return
+            # Partial last line: rewind and wait for the writer to finish it.
+            f.seek(-len(line), os.SEEK_CUR)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    with open(path, "rb") as f:
+        await _queue_lines(engine, lines(f))
+
+
+async def run_live(
+    drop_dir=None,
+    tail=None,
+    port=None,
+    duration=None,
+    state_path=None,
+    report_interval=10.0,
+    **engine_options,
+):
+    """
+    Run the live mode until interrupted or for `duration` seconds.
+
+    Args:
+        drop_dir (str, optional): Drop directory with 'headlines' and 'bars'.
+        tail (str, optional): JSON-lines file to follow.
+        port (int, optional): Local TCP port accepting JSON lines.
+        duration (float, optional): Seconds to run; runs until SIGINT/SIGTERM
+                                    when omitted.
+        state_path (str, optional): Indicator state file (as written by
+            `add_technical_indicators(state_path=...)`) to resume from and to
+            save on exit.
+        report_interval (float): Seconds between progress log lines.
+        **engine_options: Passed to `LiveEngine`.
+
+    Returns:
+        tuple: (LiveEngine, final report dict).
+    """
+    states = load_indicator_state(state_path) if state_path else None
+    engine = LiveEngine(states=states, **engine_options)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    await engine.start()
+    if duration is not None:
+        loop.call_later(duration, stop.set)
+
+    sources = []
+    if drop_dir is not None:
+        sources.append(asyncio.create_task(watch_drop_directory(engine, drop_dir, stop)))
+    if tail is not None:
+        sources.append(asyncio.create_task(tail_json_lines(engine, tail, stop)))
+    connections = {}
+    server = (
+        await serve_json_lines(engine, port=port, connections=connections)
+        if port is not None
+        else None
+    )
+    sources_done = asyncio.Event()
+    consumer = asyncio.create_task(engine.run(sources_done))
+
+    async def log_progress():
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=report_interval)
+            except asyncio.TimeoutError:
+                logging.info(f"Live: {engine.report()}")
+
+    progress = asyncio.create_task(log_progress())
+    try:
+        await stop.wait()
+        await asyncio.gather(*sources)
+    finally:
+        if server is not None:
+            await close_json_lines_server(server, connections)
+        sources_done.set()
+        await consumer
+        await progress
+        if state_path:
+            save_indicator_state(engine.states, state_path)
+    report = engine.report()
+    logging.info(f"Live mode stopped: {report}")
+    return engine, report
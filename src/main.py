@@ -1,56 +1,417 @@
+import argparse
 import os
 import logging
 from data_loader import load_stock_data_from_folder, load_analyst_ratings
 from data_processing import merge_stock_and_ratings
-from eda import plot_stock_prices, analyst_ratings_summary
+from eda import analyst_ratings_summary, export_stock_charts
 from correlation_analysis import calculate_correlation
 from feature_engineering import add_technical_indicators
-from sentimental_analysis import add_sentiment_analysis
+from near_duplicates import (
+    CLUSTER_COLUMN,
+    assign_headline_clusters,
+    collapse_near_duplicates,
+)
+from output_writer import write_partitioned_parquet
+from pipeline import Stage, run_pipeline, select_stages
+from profiling import enable_profiling, write_profile_report
+from sentiment_rollup import refresh_sentiment_rollup
+from sentimental_analysis import SentimentCache, add_sentiment_analysis
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
 
-def main():
+def score_ratings(analyst_ratings, cache_file, compact=False, cluster_column=None):
+    """
+    Sentiment stage: score headlines through the persistent sentiment cache,
+    one per near-duplicate cluster when the ratings carry cluster ids.
+    """
+    sentiment_cache = SentimentCache(cache_file)
     try:
-        current_dir = os.getcwd()
-        yfinance_folder = os.path.join(current_dir, "./data/yfinance_data")
-        analyst_ratings_file = os.path.join(
-            current_dir, "./data/raw_analyst_ratings/raw_analyst_ratings.csv"
+        return add_sentiment_analysis(
+            analyst_ratings.copy(),
+            text_column="headline",
+            cache=sentiment_cache,
+            compact=compact,
+            cluster_column=cluster_column,
         )
+    finally:
+        sentiment_cache.close()
+
+
+def enrich_stock_data(stock_data, compact=False):
+    """
+    Indicator stage: add technical indicators without mutating the loaded data.
+    """
+    return add_technical_indicators(dict(stock_data), compact=compact)
+
+
+def rollup_sentiment(scored_ratings, path, collapse_duplicates=False):
+    """
+    Rollup stage: sync the persisted sentiment rollup with the scored ratings,
+    keeping one headline per ticker, day and cluster with
+    `collapse_duplicates`, as the merge does.
+    """
+    if collapse_duplicates:
+        scored_ratings = collapse_near_duplicates(scored_ratings)
+    return refresh_sentiment_rollup(scored_ratings, path)
+
+
+def export_charts(stock_data, analyst_ratings, output_dir):
+    """
+    EDA stage: write the per-ticker indicator charts and the ratings count per
+    stock chart to files, and return their paths.
+    """
+    paths = export_stock_charts(stock_data, output_dir)
+    summary = analyst_ratings_summary(
+        analyst_ratings, symbol_column="stock", output_dir=output_dir
+    )
+    if not summary.empty:
+        paths.append(os.path.join(output_dir, "ratings_per_stock.png"))
+    return paths
+
+
+def correlate_sentiment(stock_data, rollup):
+    """
+    Correlation stage: daily sentiment from the rollup against daily returns.
+    """
+    return calculate_correlation(None, rollup=rollup, stock_data=stock_data)
 
-        logging.info("Starting data loading...")
-        stock_data = load_stock_data_from_folder(yfinance_folder)
-        analyst_ratings = load_analyst_ratings(analyst_ratings_file)
 
-        logging.info("Performing sentiment analysis on analyst ratings...")
-        analyst_ratings_sentiment = add_sentiment_analysis(
-            analyst_ratings, text_column="headline"
+def save_processed_data(merged_data, output_dir):
+    """
+    Output stage: write the merged rows as Parquet partitioned by stock and
+    year, rewriting only the partitions whose contents changed.
+    """
+    return write_partitioned_parquet(merged_data, os.path.join(output_dir, "merged"))
+
+
+def build_stages(data_dir, output_dir, compact=False, dedup=False):
+    """
+    Declare the pipeline stages and their dependencies.
+
+    With `compact`, every data stage uses the compact dtype policy
+    (see `compact.compact_frame`). With `dedup`, a 'clusters' stage assigns
+    near-duplicate cluster ids to the ratings, sentiment scores one headline
+    per cluster and the merge and rollup keep one headline per ticker, day and
+    cluster.
+    """
+    yfinance_folder = os.path.join(data_dir, "yfinance_data")
+    analyst_ratings_file = os.path.join(
+        data_dir, "raw_analyst_ratings", "raw_analyst_ratings.csv"
+    )
+    sentiment_cache_file = os.path.join(data_dir, "cache", "sentiment.sqlite")
+    rollup_dir = os.path.join(data_dir, "rollup")
+    ratings_stage = "clusters" if dedup else "load_ratings"
+    stages = [
+        Stage(
+            "load_stock",
+            load_stock_data_from_folder,
+            params={"folder_path": yfinance_folder, "compact": compact},
+            sources=[yfinance_folder],
+        ),
+        Stage(
+            "load_ratings",
+            load_analyst_ratings,
+            params={"filepath": analyst_ratings_file, "compact": compact},
+            sources=[analyst_ratings_file],
+        ),
+        Stage(
+            "sentiment",
+            score_ratings,
+            inputs=[ratings_stage],
+            params={
+                "cache_file": sentiment_cache_file,
+                "compact": compact,
+                "cluster_column": CLUSTER_COLUMN if dedup else None,
+            },
+        ),
+        Stage(
+            "indicators",
+            enrich_stock_data,
+            inputs=["load_stock"],
+            params={"compact": compact},
+        ),
+        Stage(
+            "eda",
+            export_charts,
+            inputs=["indicators", "load_ratings"],
+            params={"output_dir": os.path.join(output_dir, "charts")},
+        ),
+        Stage(
+            "merge",
+            merge_stock_and_ratings,
+            inputs=["indicators", "sentiment"],
+            params={"compact": compact, "collapse_duplicates": dedup},
+        ),
+        Stage(
+            "rollup",
+            rollup_sentiment,
+            inputs=["sentiment"],
+            params={"path": rollup_dir, "collapse_duplicates": dedup},
+            # The rollup persists itself and refreshes incrementally.
+            checkpoint=False,
+        ),
+        Stage("correlation", correlate_sentiment, inputs=["indicators", "rollup"]),
+        Stage(
+            "save",
+            save_processed_data,
+            inputs=["merge"],
+            params={"output_dir": output_dir},
+            checkpoint=False,
+        ),
+    ]
+    if dedup:
+        stages.insert(
+            2, Stage("clusters", assign_headline_clusters, inputs=["load_ratings"])
         )
+    return stages
+
+
+# Subcommand -> pipeline stages it runs (with everything they depend on).
+# Checkpointed upstream stages are loaded instead of recomputed.
+COMMANDS = {
+    "run": None,
+    "load": ["load_stock", "load_ratings"],
+    "sentiment": ["sentiment"],
+    "indicators": ["indicators"],
+    "merge": ["merge"],
+    "correlate": ["correlation"],
+    # `save` writes the merged output, so it needs the indicators, sentiment
+    # and merge stages too. Without their checkpoints, `report` recomputes
+    # nearly the whole pipeline; run `merge` (or `run`) first to avoid that.
+    "report": ["eda", "save"],
+}
+COMMAND_HELP = {
+    "run": "Run the full pipeline (default).",
+    "load": "Load stock prices and analyst ratings.",
+    "sentiment": "Score headline sentiment.",
+    "indicators": "Add technical indicators to the stock data.",
+    "merge": "Merge stock data with scored ratings.",
+    "correlate": "Correlate daily sentiment from the rollup with daily returns.",
+    "report": "Export charts and write the partitioned output. Needs the "
+    "indicators, sentiment and merge stages, which are recomputed unless "
+    "checkpointed by an earlier run.",
+    "live": "Watch data/live for new headlines and bars and update sentiment, "
+    "indicators and correlations incrementally.",
+    "serve": "Serve per-ticker indicators, daily sentiment and correlations "
+    "over a local HTTP or Unix-socket API.",
+}
+
+
+def _add_options(parser, defaults=True):
+    """
+    Options accepted before and after the subcommand. The subcommand copies
+    suppress their defaults, so they do not reset options given before it.
+    """
+
+    def default(value):
+        return value if defaults else argparse.SUPPRESS
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=default(False),
+        help="Record per-stage wall/CPU time, peak RSS, rows and bytes read, "
+        "and capture cProfile dumps of the sentiment and merge stages.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=default("profiles"),
+        help="Directory for the profiling report and cProfile dumps.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        default=default(False),
+        help="Use compact dtypes (categorical symbols and publishers, float32 "
+        "prices, indicators and polarity, downcast volume, Arrow strings) and "
+        "log each stage's memory footprint before and after.",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        default=default(False),
+        help="Cluster near-duplicate headlines (MinHash LSH), score one "
+        "headline per cluster and collapse duplicates per ticker and day "
+        "before the merge.",
+    )
 
-        # Exploratory Data Analysis
-        plot_stock_prices(stock_data)
-        analyst_ratings_summary(analyst_ratings_sentiment)
 
-        logging.info("Enriching stock data with technical indicators...")
-        enriched_data = add_technical_indicators(stock_data)
+def _add_live_options(parser):
+    parser.add_argument(
+        "--drop-dir",
+        default=None,
+        help="Drop directory with 'headlines' and 'bars' CSV sub-folders "
+        "(default: data/live).",
+    )
+    parser.add_argument("--tail", help="Also follow this JSON-lines event file.")
+    parser.add_argument(
+        "--port", type=int, help="Also accept JSON-lines events on this local TCP port."
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="Stop after this many seconds (default: run until interrupted).",
+    )
+    parser.add_argument("--workers", type=int, default=2, help="Scoring processes.")
+    parser.add_argument(
+        "--batch-size", type=int, default=256, help="Maximum events per batch."
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=10_000,
+        help="Queued events before sources are paused (backpressure).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("lexicon", "textblob"),
+        default="lexicon",
+        help="Sentiment scorer.",
+    )
 
-        logging.info("Merging stock data and analyst ratings...")
-        merged_data = merge_stock_and_ratings(enriched_data, analyst_ratings_sentiment)
 
-        logging.info("Performing correlation analysis...")
-        calculate_correlation(merged_data)
+def _add_serve_options(parser):
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind.")
+    parser.add_argument("--port", type=int, default=8050, help="TCP port.")
+    parser.add_argument(
+        "--socket", help="Listen on this Unix socket path instead of a TCP port."
+    )
+    parser.add_argument(
+        "--hot-tickers",
+        help="Comma-separated tickers to prewarm (default: the 10 tickers "
+        "with the most headlines).",
+    )
+    parser.add_argument(
+        "--cache-mb", type=float, default=256, help="Result cache size in MB."
+    )
 
-        # Save processed data
-        output_dir = "processed_data"
-        os.makedirs(output_dir, exist_ok=True)
-        for stock, df in merged_data.items():
-            df.to_csv(f"{output_dir}/{stock}_processed.csv", index=False)
 
-        logging.info("Pipeline completed successfully. Processed data saved.")
+def run_serve_mode(args, data_dir, output_dir):
+    """
+    Serve subcommand: refresh the price store and sentiment rollup, prewarm
+    the hot tickers and serve features until interrupted.
+    """
+    from feature_server import FeatureService, create_feature_server
+    from price_store import build_price_store
+
+    stages = select_stages(
+        build_stages(data_dir, output_dir, compact=args.compact, dedup=args.dedup),
+        ["indicators", "rollup"],
+    )
+    results = run_pipeline(stages, artifact_dir=os.path.join(data_dir, "artifacts"))
+    store = build_price_store(
+        results["indicators"], os.path.join(data_dir, "price_store")
+    )
+    service = FeatureService(
+        store, results["rollup"], cache_bytes=int(args.cache_mb * 2**20)
+    )
+    if args.hot_tickers:
+        hot = [t.strip() for t in args.hot_tickers.split(",") if t.strip()]
+    else:
+        hot = results["rollup"].totals("ticker").index[:10].tolist()
+    service.prewarm(hot)
+
+    server = create_feature_server(
+        service, host=args.host, port=args.port, unix_socket=args.socket
+    )
+    logging.info(
+        f"Serving features on {args.socket or f'http://{args.host}:{args.port}'}"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logging.info(f"Feature server metrics: {service.metrics()}")
+
+
+def run_live_mode(args, data_dir):
+    """
+    Live subcommand: run the asyncio live mode and log its final report.
+    """
+    import asyncio
+    from live import run_live
+
+    drop_dir = args.drop_dir or os.path.join(data_dir, "live")
+    os.makedirs(drop_dir, exist_ok=True)
+    engine, _ = asyncio.run(
+        run_live(
+            drop_dir=drop_dir,
+            tail=args.tail,
+            port=args.port,
+            duration=args.duration,
+            state_path=os.path.join(data_dir, "cache", "live_indicator_state.json"),
+            backend=args.backend,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            queue_size=args.queue_size,
+        )
+    )
+    correlations = engine.correlations().dropna(subset=["correlation"])
+    if not correlations.empty:
+        logging.info(f"Running correlations:\n{correlations.to_string(index=False)}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the news sentiment pipeline.")
+    _add_options(parser)
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subcommands = {}
+    for command, help_text in COMMAND_HELP.items():
+        subcommands[command] = subparsers.add_parser(
+            command, help=help_text, description=help_text
+        )
+        _add_options(subcommands[command], defaults=False)
+    _add_live_options(subcommands["live"])
+    _add_serve_options(subcommands["serve"])
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args.command = "run"
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        enable_profiling(
+            capture=("add_sentiment_analysis", "merge_stock_and_ratings"),
+            profile_dir=args.profile_dir,
+        )
+    try:
+        current_dir = os.getcwd()
+        data_dir = os.path.join(current_dir, "data")
+        output_dir = os.path.join(current_dir, "processed_data")
+        if args.command == "live":
+            run_live_mode(args, data_dir)
+            return
+        if args.command == "serve":
+            run_serve_mode(args, data_dir, output_dir)
+            return
+
+        stages = build_stages(
+            data_dir, output_dir, compact=args.compact, dedup=args.dedup
+        )
+        if COMMANDS[args.command] is not None:
+            stages = select_stages(stages, COMMANDS[args.command])
+        results = run_pipeline(stages, artifact_dir=os.path.join(data_dir, "artifacts"))
+        if "correlation" in results:
+            logging.info(f"Pearson correlation: {results['correlation']:.4f}")
+
+        if "save" in results:
+            logging.info("Pipeline completed successfully. Processed data saved.")
+        else:
+            logging.info(f"Command '{args.command}' completed successfully.")
     except Exception as e:
         logging.error(f"Pipeline execution failed: {e}")
+    finally:
+        if args.profile:
+            write_profile_report(os.path.join(args.profile_dir, "report.json"))
+            write_profile_report(os.path.join(args.profile_dir, "report.csv"))
+            logging.info(f"Profiling report written to {args.profile_dir}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+import logging
+import numpy as np
+import pandas as pd
+
+try:
+    from .profiling import instrument
+except ImportError:
+    from profiling import instrument
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+CLUSTER_COLUMN = "cluster_id"
+DUPLICATES_COLUMN = "duplicates"
+_MIX = np.uint64(0xBF58476D1CE4E5B9)
+_BAND_MIX = np.uint64(0x100000001B3)
+
+
+def normalize_for_shingles(texts):
+    """
+    Lower-case headlines and reduce them to ASCII letters and digits separated
+    by single spaces, so punctuation, casing and spacing edits do not count.
+    """
+    return (
+        pd.Series(texts, dtype=object)
+        .astype(str)
+        .str.lower()
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def _shingle_hashes(texts, shingle_size):
+    """
+    32-bit hashes of the character shingles of every text.
+
+    The texts are concatenated into one byte buffer and the shingle hashes
+    are computed for all positions at once, so there is no per-shingle
+    Python code.
+
+    Returns:
+        tuple: (hashes, starts) where the shingles of text i are
+               `hashes[starts[i]:starts[i + 1]]`; every text has at least one.
+    """
+    texts = normalize_for_shingles(texts).str.pad(shingle_size, side="right")
+    lengths = texts.str.len().to_numpy(dtype=np.int64)
+    buffer = np.frombuffer("".join(texts.tolist()).encode("ascii"), dtype=np.uint8)
+    counts = lengths - shingle_size + 1
+    starts = np.concatenate([[0], np.cumsum(counts)])
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    positions = np.arange(starts[-1]) + np.repeat(offsets - starts[:-1], counts)
+
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    for q in range(shingle_size):
+        hashes = hashes * np.uint64(257) + buffer[positions + q]
+    hashes ^= hashes >> np.uint64(31)
+    hashes *= _MIX
+    hashes ^= hashes >> np.uint64(29)
+    return hashes & np.uint64(0xFFFFFFFF), starts
+
+
+def minhash_signatures(texts, num_perm=64, shingle_size=5, seed=1, chunksize=50_000):
+    """
+    MinHash signatures of the character shingles of each text.
+
+    Each of the `num_perm` hash functions is a multiply-shift hash of the
+    shingle hashes; a signature entry is the minimum over the text's shingles,
+    taken with `np.minimum.reduceat`. The fraction of equal entries of two
+    signatures estimates the Jaccard similarity of their shingle sets.
+
+    Args:
+        texts (iterable): Headlines.
+        num_perm (int): Hash functions (signature length).
+        shingle_size (int): Characters per shingle.
+        seed (int): Seed of the hash functions; signatures are only
+                    comparable under the same seed.
+        chunksize (int): Texts hashed per batch, bounding the temporary memory.
+
+    Returns:
+        np.ndarray: uint32 array of shape (len(texts), num_perm).
+    """
+    texts = pd.Series(texts, dtype=object).reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for start in range(0, len(texts), chunksize):
+        hashes, starts = _shingle_hashes(texts.iloc[start : start + chunksize], shingle_size)
+        for i in range(num_perm):
+            permuted = (a[i] * hashes + b[i]) >> np.uint64(32)
+            signatures[start : start + len(starts) - 1, i] = np.minimum.reduceat(
+                permuted, starts[:-1]
+            )
+    return signatures
+
+
+def _band_keys(signatures, bands):
+    """
+    One uint64 bucket key per text and band, shape (n, bands).
+    """
+    rows = signatures.shape[1] // bands
+    keys = np.zeros((len(signatures), bands), dtype=np.uint64)
+    for r in range(rows):
+        keys = keys * _BAND_MIX ^ signatures[:, r::rows].astype(np.uint64)
+    return keys
+
+
+def _candidate_pairs(keys):
+    """
+    Link every text to the first text of each LSH bucket it falls into.
+    """
+    left, right = [], []
+    for band in keys.T:
+        order = np.argsort(band, kind="stable")
+        ordered = band[order]
+        new_bucket = np.concatenate([[True], ordered[1:] != ordered[:-1]])
+        leaders = order[np.flatnonzero(new_bucket)][np.cumsum(new_bucket) - 1]
+        linked = order != leaders
+        left.append(order[linked])
+        right.append(leaders[linked])
+    left, right = np.concatenate(left), np.concatenate(right)
+    pairs = np.unique(np.stack([left, right], axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+@instrument("cluster_near_duplicates")
+def cluster_near_duplicates(
+    texts, threshold=0.7, num_perm=64, bands=16, shingle_size=5, seed=1
+):
+    """
+    Cluster near-duplicate headlines with MinHash and locality-sensitive hashing.
+
+    Signatures are split into `bands` bands. Texts whose signatures agree on
+    a whole band share a bucket and become candidate pairs, so the work is
+    linear in the number of texts plus candidate pairs rather than quadratic.
+    A candidate pair is kept when its estimated Jaccard similarity (the share
+    of equal signature entries) reaches `threshold`. Clusters are the
+    connected components of the kept pairs.
+
+    Args:
+        texts (iterable): Headlines.
+        threshold (float): Minimum estimated Jaccard similarity of shingles.
+        num_perm (int): Signature length; must be a multiple of `bands`.
+        bands (int): LSH bands. More bands find pairs of lower similarity
+                     at the cost of more candidates.
+        shingle_size (int): Characters per shingle.
+        seed (int): Seed of the MinHash functions.
+
+    Returns:
+        np.ndarray: int64 cluster id of each text. Ids are dense and numbered
+                    in order of each cluster's first text.
+
+    Raises:
+        ValueError: If `num_perm` is not a multiple of `bands`.
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+    signatures = minhash_signatures(
+        texts, num_perm=num_perm, shingle_size=shingle_size, seed=seed
+    )
+    n = len(signatures)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    left, right = _candidate_pairs(_band_keys(signatures, bands))
+    similar = np.empty(len(left), dtype=bool)
+    for start in range(0, len(left), 100_000):
+        part = slice(start, start + 100_000)
+        agreement = (signatures[left[part]] == signatures[right[part]]).mean(axis=1)
+        similar[part] = agreement >= threshold
+    left, right = left[similar], right[similar]
+
+    graph = coo_matrix((np.ones(len(left), dtype=np.int8), (left, right)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    _, first = np.unique(labels, return_index=True)
+    dense = np.empty(len(first), dtype=np.int64)
+    dense[np.argsort(first)] = np.arange(len(first))
+    return dense[labels]
+
+
+def assign_headline_clusters(
+    ratings_df, text_column="headline", cluster_column=CLUSTER_COLUMN, **kwargs
+):
+    """
+    Add a near-duplicate cluster id column to the ratings.
+
+    Headlines of one syndicated story share an id, so downstream stages can
+    process one representative per cluster (see `cluster_representatives`).
+
+    Args:
+        ratings_df (pd.DataFrame): Ratings with a headline column.
+        text_column (str): Headline column.
+        cluster_column (str): Name of the new column.
+        **kwargs: Passed to `cluster_near_duplicates`.
+
+    Returns:
+        pd.DataFrame: A copy of the ratings with the cluster id column.
+
+    Raises:
+        ValueError: If the headline column is missing.
+    """
+    if text_column not in ratings_df.columns:
+        raise ValueError(f"Column '{text_column}' not found in the ratings data.")
+    clusters = cluster_near_duplicates(ratings_df[text_column].tolist(), **kwargs)
+    n_clusters = len(np.unique(clusters))
+    logging.info(
+        f"Clustered {len(clusters)} headlines into {n_clusters} clusters "
+        f"({len(clusters) - n_clusters} near-duplicates)"
+    )
+    return ratings_df.assign(**{cluster_column: clusters})
+
+
+def cluster_representatives(df, cluster_column=CLUSTER_COLUMN):
+    """
+    Boolean mask of the first row of every cluster present in `df`.
+    """
+    return ~df[cluster_column].duplicated().to_numpy()
+
+
+def collapse_near_duplicates(
+    df,
+    symbol_column="stock",
+    cluster_column=CLUSTER_COLUMN,
+    day=None,
+    count_column=DUPLICATES_COLUMN,
+):
+    """
+    Keep one headline per ticker, day and near-duplicate cluster.
+
+    Args:
+        df (pd.DataFrame): Ratings with a cluster id column.
+        symbol_column (str): Ticker column, compared case-insensitively.
+        cluster_column (str): Cluster id column.
+        day (pd.Series, optional): Day of each row; defaults to the calendar
+                                   day of 'date'.
+        count_column (str): New column with the number of rows each kept
+                            row stands for.
+
+    Returns:
+        pd.DataFrame: The first row of every (ticker, day, cluster) group.
+    """
+    if day is None:
+        day = pd.to_datetime(df["date"]).dt.normalize()
+    keys = pd.DataFrame(
+        {
+            "symbol": df[symbol_column].astype(str).str.upper().to_numpy(),
+            "day": np.asarray(day),
+            "cluster": df[cluster_column].to_numpy(),
+        }
+    )
+    sizes = keys.groupby(["symbol", "day", "cluster"], sort=False, dropna=False)[
+        "cluster"
+    ].transform("size")
+    first = ~keys.duplicated().to_numpy()
+    return df[first].assign(**{count_column: sizes.to_numpy()[first]})
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+try:
+    from .profiling import instrument
+except ImportError:
+    from profiling import instrument
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+PARTITION_MANIFEST = "_manifest.json"
+PARTITION_FILE = "part.parquet"
+
+
+def partition_digest(df):
+    """
+    Content digest of a partition: column names, dtypes and every row value.
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _write_partition(df, path, compression):
+    """
+    Write one partition file through a temporary file and an atomic rename.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Dot-prefixed, so dataset readers skip it while it is being written.
+    tmp_path = os.path.join(
+        os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp"
+    )
+    try:
+        pq.write_table(
+            pa.Table.from_pandas(df, preserve_index=False),
+            tmp_path,
+            compression=compression,
+        )
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def _load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, PARTITION_MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, PARTITION_MANIFEST)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+@instrument("write_partitioned_parquet")
+def write_partitioned_parquet(
+    df,
+    output_dir,
+    ticker_column="stock_name",
+    date_column="date",
+    compression="zstd",
+    workers=4,
+):
+    """
+    Write a merged dataset as Parquet partitioned by ticker and year.
+
+    Partitions follow the Hive layout
+    `<output_dir>/<ticker_column>=<ticker>/year=<year>/part.parquet`, so
+    `pd.read_parquet(output_dir)` reads the dataset back with both partition
+    columns. Files are written concurrently by a thread pool; pyarrow
+    releases the GIL while encoding and compressing. Each file is written
+    under a temporary name and renamed into place, so readers never see a
+    partial file. A manifest of content digests is kept in the output
+    directory. Partitions whose digest is unchanged are not rewritten, and
+    partitions that no longer exist are removed.
+
+    Args:
+        df (pd.DataFrame): Merged data with ticker and date columns.
+        output_dir (str): Dataset root directory.
+        ticker_column (str): Column holding the ticker.
+        date_column (str): Datetime column the year is taken from.
+        compression (str): Parquet codec ('zstd', 'snappy', 'gzip', ...).
+        workers (int): Writer threads.
+
+    Returns:
+        dict: Counts of 'written', 'unchanged' and 'removed' partitions.
+
+    Raises:
+        ValueError: If the ticker or date column is missing.
+    """
+    missing = [col for col in (ticker_column, date_column) if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns in the DataFrame: {missing}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = _load_manifest(output_dir)
+    new_manifest = {}
+    tasks = []
+    years = pd.to_datetime(df[date_column]).dt.year
+    grouped = df.drop(columns=ticker_column).groupby(
+        [df[ticker_column].astype(str), years.rename("year")], sort=True, observed=True
+    )
+    for (ticker, year), part in grouped:
+        key = f"{ticker_column}={ticker}/year={int(year)}"
+        path = os.path.join(output_dir, key, PARTITION_FILE)
+        digest = partition_digest(part)
+        new_manifest[key] = digest
+        if manifest.get(key) != digest or not os.path.exists(path):
+            tasks.append((part, path))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_write_partition, part, path, compression) for part, path in tasks
+        ]
+        for future in futures:
+            future.result()
+
+    removed = 0
+    for key in set(manifest) - set(new_manifest):
+        shutil.rmtree(os.path.join(output_dir, key), ignore_errors=True)
+        parent = os.path.dirname(os.path.join(output_dir, key))
+        if os.path.isdir(parent) and not os.listdir(parent):
+            os.rmdir(parent)
+        removed += 1
+    _save_manifest(output_dir, new_manifest)
+
+    stats = {
+        "written": len(tasks),
+        "unchanged": len(new_manifest) - len(tasks),
+        "removed": removed,
+    }
+    logging.info(f"Partitioned Parquet output in {output_dir}: {stats}")
+    return stats
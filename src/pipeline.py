@@ -0,0 +1,334 @@
+import dis
+import hashlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import shutil
+import sys
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import pandas as pd
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# A pipeline stage. `func` is called with the outputs of `inputs` (stage
+# names, in order) followed by `params` as keyword arguments. `sources` lists
+# files or folders read directly by the stage; their size and mtime are part
+# of the fingerprint. Stages with `checkpoint=False` always run. A checkpointed
+# output that is a list of file paths (charts, reports) is only reused while
+# all the files exist.
+Stage = namedtuple(
+    "Stage",
+    ["name", "func", "inputs", "params", "sources", "checkpoint"],
+    defaults=((), {}, (), True),
+)
+
+
+def _source_signature(path):
+    """
+    (path, size, mtime) of a file, or of every file below a folder.
+    """
+    if os.path.isdir(path):
+        entries = []
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                entries.extend(_source_signature(os.path.join(root, name)))
+        return entries
+    if not os.path.exists(path):
+        return [(path, None, None)]
+    stat = os.stat(path)
+    return [(path, stat.st_size, stat.st_mtime_ns)]
+
+
+def _source_of(obj):
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return getattr(obj, "__qualname__", repr(obj))
+
+
+def _code_objects(code):
+    yield code
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            yield from _code_objects(const)
+
+
+def _code_signature(func):
+    """
+    Source of a stage function and of the local code it uses.
+
+    Functions, classes and modules referenced by the function are followed
+    transitively as long as they are defined in the folder of the stage's
+    module, including modules imported inside a function body. Third-party
+    and standard library code is not followed.
+
+    Returns:
+        dict: Qualified name -> source.
+    """
+    func = inspect.unwrap(func)
+    try:
+        root = os.path.dirname(os.path.abspath(inspect.getsourcefile(func)))
+    except TypeError:
+        return {getattr(func, "__qualname__", repr(func)): _source_of(func)}
+
+    def is_local(path):
+        return path is not None and os.path.abspath(path).startswith(root + os.sep)
+
+    def local_file(obj):
+        try:
+            return is_local(inspect.getsourcefile(obj))
+        except TypeError:
+            return False
+
+    sources = {}
+    pending = [func]
+    while pending:
+        obj = inspect.unwrap(pending.pop())
+        if inspect.ismodule(obj):
+            key = obj.__name__
+        else:
+            key = f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', '')}"
+        if key in sources:
+            continue
+        sources[key] = _source_of(obj)
+
+        if inspect.ismodule(obj):
+            pending.extend(
+                value
+                for value in vars(obj).values()
+                if (inspect.isfunction(value) or inspect.isclass(value))
+                and getattr(value, "__module__", None) == obj.__name__
+            )
+            functions = []
+        elif inspect.isclass(obj):
+            # Plain, static and class methods.
+            members = (getattr(v, "__func__", v) for v in vars(obj).values())
+            functions = [v for v in members if inspect.isfunction(v)]
+        elif inspect.isfunction(obj):
+            functions = [obj]
+        else:
+            functions = []
+        for function in functions:
+            namespace = function.__globals__
+            for code in _code_objects(function.__code__):
+                for name in code.co_names:
+                    value = namespace.get(name)
+                    if (
+                        inspect.ismodule(value)
+                        or inspect.isfunction(value)
+                        or inspect.isclass(value)
+                    ) and local_file(value):
+                        pending.append(value)
+                for instruction in dis.get_instructions(code):
+                    if instruction.opname != "IMPORT_NAME":
+                        continue
+                    name = instruction.argval
+                    module = sys.modules.get(name)
+                    if module is not None:
+                        if local_file(module):
+                            pending.append(module)
+                        continue
+                    # Not imported yet: read the file without importing it.
+                    # A dotted name would import its parent package.
+                    try:
+                        spec = importlib.util.find_spec(name.partition(".")[0])
+                    except (ImportError, ValueError):
+                        spec = None
+                    if spec is None or not is_local(spec.origin) or name in sources:
+                        continue
+                    with open(spec.origin, encoding="utf-8") as f:
+                        sources[name] = f.read()
+    return sources
+
+
+def _files_exist(value):
+    """
+    False if `value` is a list of file paths and any of them is missing.
+    """
+    if isinstance(value, list) and value and all(isinstance(v, str) for v in value):
+        return all(os.path.exists(path) for path in value)
+    return True
+
+
+def stage_fingerprint(stage, input_fingerprints):
+    """
+    Fingerprint of a stage from its code, parameters, sources and inputs.
+
+    The code covers the stage function and the local functions, classes and
+    modules it calls (see `_code_signature`), so editing a helper such as
+    `add_technical_indicators` invalidates the stages that use it.
+
+    Args:
+        stage (Stage): The stage.
+        input_fingerprints (list): Fingerprints of the stages in `stage.inputs`.
+
+    Returns:
+        str: Hex digest that changes whenever anything the stage reads changes.
+    """
+    payload = json.dumps(
+        {
+            "name": stage.name,
+            "func": _code_signature(stage.func),
+            "params": stage.params,
+            "sources": [_source_signature(path) for path in stage.sources],
+            "inputs": list(input_fingerprints),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def save_artifact(value, path):
+    """
+    Atomically write a stage output to the `path` directory.
+
+    DataFrames and dicts of DataFrames are stored as Parquet; other values
+    as JSON.
+    """
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    if isinstance(value, pd.DataFrame):
+        kind = "frame"
+        value.to_parquet(os.path.join(tmp_path, "frame.parquet"))
+    elif isinstance(value, dict) and all(
+        isinstance(v, pd.DataFrame) for v in value.values()
+    ):
+        kind = "frames"
+        for i, frame in enumerate(value.values()):
+            frame.to_parquet(os.path.join(tmp_path, f"{i}.parquet"))
+    else:
+        kind = "json"
+        with open(os.path.join(tmp_path, "value.json"), "w") as f:
+            json.dump(value, f)
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump({"kind": kind, "keys": list(value) if kind == "frames" else None}, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path):
+    """
+    Read a stage output written by `save_artifact`.
+    """
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta["kind"] == "frame":
+        return pd.read_parquet(os.path.join(path, "frame.parquet"))
+    if meta["kind"] == "frames":
+        return {
+            key: pd.read_parquet(os.path.join(path, f"{i}.parquet"))
+            for i, key in enumerate(meta["keys"])
+        }
+    with open(os.path.join(path, "value.json")) as f:
+        return json.load(f)
+
+
+def select_stages(stages, targets):
+    """
+    The target stages and every stage they depend on, in declaration order.
+
+    Args:
+        stages (list): Stage tuples.
+        targets (iterable): Names of the stages to run.
+
+    Returns:
+        list: The selected stages.
+
+    Raises:
+        ValueError: If a target or dependency is unknown.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    needed = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        if name not in by_name:
+            raise ValueError(f"Unknown stage '{name}'")
+        needed.add(name)
+        pending.extend(by_name[name].inputs)
+    return [stage for stage in stages if stage.name in needed]
+
+
+def run_pipeline(stages, artifact_dir, max_workers=4):
+    """
+    Run stages as a dependency graph with checkpointed outputs.
+
+    Each stage starts as soon as its inputs are available, so independent
+    stages run concurrently in a thread pool. Each checkpointed output is
+    stored under `artifact_dir/<stage>/<fingerprint>`. A stage whose
+    fingerprint already has an artifact is skipped and its output is loaded.
+    When a stage fails, the outputs of the stages that finished before it
+    remain on disk for the next run.
+
+    Args:
+        stages (list): Stage tuples.
+        artifact_dir (str): Directory for checkpointed outputs.
+        max_workers (int): Maximum number of stages running at once.
+
+    Returns:
+        dict: Stage name -> output.
+
+    Raises:
+        ValueError: If a stage depends on an unknown stage or the graph has a cycle.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = [name for name in stage.inputs if name not in by_name]
+        if unknown:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {unknown}")
+
+    results, fingerprints = {}, {}
+    pending = dict(by_name)
+    running = {}
+
+    def execute(stage, fingerprint):
+        path = os.path.join(artifact_dir, stage.name, fingerprint)
+        if stage.checkpoint and os.path.exists(os.path.join(path, "meta.json")):
+            value = load_artifact(path)
+            if _files_exist(value):
+                logging.info(f"Stage '{stage.name}' is up to date, loading checkpoint.")
+                return value
+            logging.info(f"Stage '{stage.name}' output files are missing, rerunning.")
+        logging.info(f"Running stage '{stage.name}'...")
+        value = stage.func(*(results[name] for name in stage.inputs), **stage.params)
+        if stage.checkpoint:
+            stage_dir = os.path.join(artifact_dir, stage.name)
+            os.makedirs(stage_dir, exist_ok=True)
+            save_artifact(value, path)
+            for old in os.listdir(stage_dir):
+                if old != fingerprint:
+                    shutil.rmtree(os.path.join(stage_dir, old), ignore_errors=True)
+        return value
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if all(dep in results for dep in stage.inputs):
+                    fingerprints[name] = stage_fingerprint(
+                        stage, [fingerprints[dep] for dep in stage.inputs]
+                    )
+                    running[pool.submit(execute, stage, fingerprints[name])] = name
+                    del pending[name]
+            if not running:
+                raise ValueError(f"Pipeline has a dependency cycle: {list(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    logging.error(f"Stage '{name}' failed.")
+                    raise
+    return results
@@ -0,0 +1,267 @@
+import json
+import os
+import shutil
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+
+PRICE_STORE_META = "meta.json"
+PRICE_STORE_DATES = "dates.npy"
+
+
+def _field_file(path, i):
+    return os.path.join(path, f"field_{i}.npy")
+
+
+def build_price_store(stock_data, path):
+    """
+    Write stock frames to an on-disk price store.
+
+    Every numeric column becomes one `.npy` array of shape tickers x dates on
+    the union of all trading dates, NaN where a ticker has no bar. Arrays are
+    filled ticker by ticker through write-mode memory maps, so the full panel
+    is never held in memory. The store is written to a temporary directory
+    and renamed into place.
+
+    Args:
+        stock_data (dict or str): Dictionary of stock DataFrames with a 'date'
+                                  column (e.g. after `add_technical_indicators`),
+                                  or a yfinance folder read with
+                                  `load_stock_data_from_folder`.
+        path (str): Store directory; an existing store is replaced.
+
+    Returns:
+        PriceStore: The new store.
+    """
+    if isinstance(stock_data, str):
+        try:
+            from .data_loader import load_stock_data_from_folder
+        except ImportError:
+            from data_loader import load_stock_data_from_folder
+        stock_data = load_stock_data_from_folder(stock_data)
+
+    frames = {
+        ticker: df.drop_duplicates("date", keep="last")
+        for ticker, df in stock_data.items()
+        if "date" in df.columns
+    }
+    tickers = list(frames)
+    fields, dtypes = [], {}
+    for df in frames.values():
+        for col in df.columns:
+            if col == "date" or not pd.api.types.is_numeric_dtype(df[col].dtype):
+                continue
+            dtype = df[col].to_numpy().dtype
+            if col not in dtypes:
+                fields.append(col)
+                dtypes[col] = dtype
+            else:
+                dtypes[col] = np.result_type(dtypes[col], dtype)
+    dtypes = {field: str(dtype) for field, dtype in dtypes.items()}
+    all_dates = [pd.to_datetime(df["date"]).to_numpy() for df in frames.values()]
+    dates = pd.DatetimeIndex(
+        np.unique(np.concatenate(all_dates))
+        if all_dates
+        else np.array([], dtype="datetime64[ns]")
+    )
+
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, PRICE_STORE_DATES), dates.to_numpy())
+    rows = {
+        ticker: dates.get_indexer(pd.to_datetime(df["date"]))
+        for ticker, df in frames.items()
+    }
+    for i, field in enumerate(fields):
+        array = np.lib.format.open_memmap(
+            _field_file(tmp_path, i),
+            mode="w+",
+            dtype=np.float64,
+            shape=(len(tickers), len(dates)),
+        )
+        array[:] = np.nan
+        for j, ticker in enumerate(tickers):
+            if field in frames[ticker].columns:
+                array[j, rows[ticker]] = frames[ticker][field].to_numpy(dtype=np.float64)
+        array.flush()
+        del array
+    with open(os.path.join(tmp_path, PRICE_STORE_META), "w") as f:
+        json.dump({"tickers": tickers, "fields": fields, "dtypes": dtypes}, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return PriceStore(path)
+
+
+class PriceStore(Mapping):
+    """
+    Read-only, memory-mapped price panel written by `build_price_store`.
+
+    Each field is a tickers x dates array opened with `np.load(mmap_mode='r')`,
+    so the operating system shares its pages between every process that opens
+    the store. A store behaves like the `stock_data` dict: `store[ticker]`
+    returns that ticker's bars as a DataFrame, so functions taking
+    `stock_data` accept a store too. `select` narrows it to a ticker set and
+    date range without reading any data. Pickling a store only transfers its
+    path and selection, so it can be handed to worker processes cheaply.
+
+    A ticker's date range is one contiguous row segment, so `column` and the
+    columns of `store[ticker]` are views of the mapping. They are only copied
+    when the ticker has gaps on the shared date axis or a field was stored
+    from integers. `panel` is a view when the selected tickers are adjacent
+    in the store.
+    """
+
+    def __init__(self, path, tickers=None, start=None, end=None):
+        self.path = path
+        with open(os.path.join(path, PRICE_STORE_META)) as f:
+            meta = json.load(f)
+        self.fields = meta["fields"]
+        self._dtypes = meta["dtypes"]
+        self._all_tickers = meta["tickers"]
+        self._positions = {ticker: j for j, ticker in enumerate(self._all_tickers)}
+        self._all_dates = pd.DatetimeIndex(
+            np.load(os.path.join(path, PRICE_STORE_DATES))
+        )
+        self._arrays = {}
+        self._selection = (tickers, start, end)
+
+        if tickers is None:
+            self._columns = np.arange(len(self._all_tickers))
+        else:
+            unknown = [ticker for ticker in tickers if ticker not in self._positions]
+            if unknown:
+                raise KeyError(f"Tickers not in price store: {unknown}")
+            self._columns = np.array(
+                [self._positions[ticker] for ticker in tickers], dtype=int
+            )
+        lo = 0 if start is None else self._all_dates.searchsorted(pd.Timestamp(start))
+        hi = (
+            len(self._all_dates)
+            if end is None
+            else self._all_dates.searchsorted(pd.Timestamp(end), side="right")
+        )
+        self._rows = slice(int(lo), int(hi))
+        self.tickers = [self._all_tickers[j] for j in self._columns]
+        self.dates = self._all_dates[self._rows]
+
+    def __getstate__(self):
+        return {"path": self.path, "selection": self._selection}
+
+    def __setstate__(self, state):
+        tickers, start, end = state["selection"]
+        self.__init__(state["path"], tickers=tickers, start=start, end=end)
+
+    def __repr__(self):
+        return (
+            f"PriceStore({self.path!r}, {len(self.tickers)} tickers, "
+            f"{len(self.dates)} dates, fields={self.fields})"
+        )
+
+    def select(self, tickers=None, start=None, end=None):
+        """
+        Narrow the store to a ticker set and an inclusive date range.
+
+        Args:
+            tickers (list, optional): Tickers to keep, in order; defaults to
+                                      the current selection.
+            start, end (str or Timestamp, optional): Date bounds; default to
+                                                     the current selection.
+
+        Returns:
+            PriceStore: A store sharing the same files.
+        """
+        current_tickers, current_start, current_end = self._selection
+        if tickers is None:
+            tickers = current_tickers
+        if start is None:
+            start = current_start
+        elif current_start is not None:
+            start = max(pd.Timestamp(start), pd.Timestamp(current_start))
+        if end is None:
+            end = current_end
+        elif current_end is not None:
+            end = min(pd.Timestamp(end), pd.Timestamp(current_end))
+        return PriceStore(self.path, tickers=tickers, start=start, end=end)
+
+    def _array(self, field):
+        if field not in self._arrays:
+            if field not in self.fields:
+                raise KeyError(f"Field '{field}' not in price store: {self.fields}")
+            self._arrays[field] = np.load(
+                _field_file(self.path, self.fields.index(field)), mmap_mode="r"
+            )
+        return self._arrays[field]
+
+    def column(self, ticker, field):
+        """
+        One field of one ticker over the selected dates, as a read-only view.
+        """
+        if ticker not in self.tickers:
+            raise KeyError(ticker)
+        return self._array(field)[self._positions[ticker], self._rows]
+
+    def panel(self, field):
+        """
+        One field for the selected tickers x dates, NaN where a ticker has no bar.
+        """
+        array = self._array(field)
+        columns = self._columns
+        if len(columns) and np.array_equal(
+            columns, np.arange(columns[0], columns[0] + len(columns))
+        ):
+            return array[columns[0] : columns[0] + len(columns), self._rows]
+        return array[columns, self._rows]
+
+    def lookup(self, field, tickers, dates):
+        """
+        Values of `field` for (ticker, date) pairs, NaN where there is no bar.
+
+        Tickers are matched case-insensitively and dates on their calendar day.
+
+        Args:
+            field (str): Stored field.
+            tickers (array-like): Ticker of each pair.
+            dates (array-like): Date of each pair.
+
+        Returns:
+            np.ndarray: float64 values aligned with the pairs.
+        """
+        upper = {}
+        for ticker in self.tickers:
+            upper.setdefault(ticker.upper(), self._positions[ticker])
+        cols = (
+            pd.Series(tickers).astype(str).str.upper().map(upper)
+            .fillna(-1).to_numpy(dtype=int)
+        )
+        rows = self._all_dates.normalize().get_indexer(
+            pd.to_datetime(pd.Series(dates)).dt.normalize()
+        )
+        lo, hi = self._rows.start, self._rows.stop
+        ok = (cols >= 0) & (rows >= lo) & (rows < hi)
+        values = np.full(len(cols), np.nan)
+        values[ok] = self._array(field)[cols[ok], rows[ok]]
+        return values
+
+    def __getitem__(self, ticker):
+        if ticker not in self._positions or ticker not in self.tickers:
+            raise KeyError(ticker)
+        columns = {field: self.column(ticker, field) for field in self.fields}
+        bars = np.zeros(len(self.dates), dtype=bool)
+        for values in columns.values():
+            bars |= ~np.isnan(values)
+        dates = self.dates
+        if not bars.all():
+            dates = dates[bars]
+            columns = {field: values[bars] for field, values in columns.items()}
+        for field, values in columns.items():
+            dtype = np.dtype(self._dtypes[field])
+            if dtype.kind in "iub" and not np.isnan(values).any():
+                columns[field] = values.astype(dtype)
+        return pd.DataFrame({"date": dates, **columns}, copy=False)
+
+    def __iter__(self):
+        return iter(self.tickers)
+
+    def __len__(self):
+        return len(self.tickers)
@@ -0,0 +1,179 @@
+import cProfile
+import csv
+import functools
+import json
+import logging
+import os
+import resource
+import threading
+import time
+import pandas as pd
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+REPORT_FIELDS = [
+    "stage",
+    "wall_s",
+    "cpu_s",
+    "process_peak_rss_mb",
+    "peak_rss_growth_mb",
+    "rows_in",
+    "rows_out",
+    "bytes_read",
+]
+
+_state = {"enabled": False, "capture": set(), "profile_dir": None}
+_records = []
+_lock = threading.Lock()
+
+
+def enable_profiling(capture=(), profile_dir="profiles"):
+    """
+    Turn on stage instrumentation for the rest of the process.
+
+    Args:
+        capture (iterable): Stage names that additionally get a cProfile dump
+                            (`<profile_dir>/<stage>.prof`).
+        profile_dir (str): Directory for cProfile dumps.
+    """
+    _state.update(enabled=True, capture=set(capture), profile_dir=profile_dir)
+    _records.clear()
+
+
+def disable_profiling():
+    _state["enabled"] = False
+
+
+def profiling_records():
+    """
+    Return a copy of the stage records collected so far.
+    """
+    with _lock:
+        return list(_records)
+
+
+def _count_rows(value):
+    """
+    Rows in a DataFrame, or in all DataFrames of a dict; None for anything else.
+    """
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, dict) and value and all(
+        isinstance(v, pd.DataFrame) for v in value.values()
+    ):
+        return sum(len(v) for v in value.values())
+    return None
+
+
+def _bytes_read():
+    """
+    Bytes read by this process so far (Linux /proc/self/io), or None.
+    """
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def instrument(stage):
+    """
+    Decorator recording wall time, CPU time, peak RSS, rows in/out and bytes
+    read for every call of a pipeline function while profiling is enabled.
+
+    Rows in are counted from the first argument, rows out from the return
+    value (DataFrames or dicts of DataFrames). CPU time and bytes read are
+    process-wide, so they include concurrently running stages. The peak RSS
+    is the process-lifetime peak (`process_peak_rss_mb`); `peak_rss_growth_mb`
+    is how far the call raised it, which is 0 for a stage that stayed below
+    an earlier peak. When profiling is disabled the wrapped function is
+    called directly.
+
+    Args:
+        stage (str): Stage name used in the report.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state["enabled"]:
+                return func(*args, **kwargs)
+
+            profiler = None
+            if stage in _state["capture"]:
+                profiler = cProfile.Profile()
+            bytes_before = _bytes_read()
+            peak_before = _peak_rss_mb()
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            try:
+                if profiler is not None:
+                    result = profiler.runcall(func, *args, **kwargs)
+                else:
+                    result = func(*args, **kwargs)
+            finally:
+                wall = time.perf_counter() - wall_start
+                cpu = time.process_time() - cpu_start
+                bytes_after = _bytes_read()
+                peak_after = _peak_rss_mb()
+                if profiler is not None:
+                    os.makedirs(_state["profile_dir"], exist_ok=True)
+                    profiler.dump_stats(
+                        os.path.join(_state["profile_dir"], f"{stage}.prof")
+                    )
+            record = {
+                "stage": stage,
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+                "process_peak_rss_mb": round(peak_after, 1),
+                "peak_rss_growth_mb": round(peak_after - peak_before, 1),
+                "rows_in": _count_rows(args[0]) if args else None,
+                "rows_out": _count_rows(result),
+                "bytes_read": (
+                    bytes_after - bytes_before
+                    if bytes_before is not None and bytes_after is not None
+                    else None
+                ),
+            }
+            with _lock:
+                _records.append(record)
+            logging.info(f"Profiled {stage}: {record}")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def write_profile_report(path):
+    """
+    Write the collected stage records as JSON or CSV (chosen by extension).
+
+    Args:
+        path (str): Output file ending in '.json' or '.csv'.
+
+    Returns:
+        list: The records written.
+    """
+    records = profiling_records()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, "w") as f:
+            json.dump(records, f, indent=2)
+    return records
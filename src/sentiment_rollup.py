@@ -0,0 +1,382 @@
+import json
+import logging
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_processing import _next_session_day
+except ImportError:
+    from data_processing import _next_session_day
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+ROLLUP_KEYS = ["ticker", "trading_date", "publisher"]
+ROLLUP_STATS = ["count", "sum", "sumsq", "min", "max"]
+ROLLUP_FILE = "rollup.parquet"
+ROLLUP_LEDGER = "ledger.parquet"
+ROLLUP_META = "meta.json"
+# Bumped when the on-disk layout changes; older rollups are rebuilt.
+ROLLUP_VERSION = 2
+# Columns identifying a headline row for incremental refreshes.
+HEADLINE_IDENTITY = ("date", "headline", "publisher")
+LEDGER_COLUMNS = ["digest", *ROLLUP_KEYS, "polarity"]
+
+
+def combine_rollup_stats(table, keys):
+    """
+    Combine partial aggregates that share `keys`: counts and sums add up,
+    minima and maxima take the extreme.
+    """
+    return (
+        table.groupby(keys, sort=True, observed=True)
+        .agg(
+            count=("count", "sum"),
+            sum=("sum", "sum"),
+            sumsq=("sumsq", "sum"),
+            min=("min", "min"),
+            max=("max", "max"),
+        )
+        .reset_index()
+    )
+
+
+def rollup_moments(table):
+    """
+    Add the 'mean' and sample 'std' of the polarity to a table of aggregates.
+    """
+    count = table["count"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = table["sum"].to_numpy() / count
+        var = (table["sumsq"].to_numpy() - table["sum"].to_numpy() * mean) / (count - 1)
+    return table.assign(
+        mean=np.where(count > 0, mean, np.nan),
+        std=np.where(count > 1, np.sqrt(np.maximum(var, 0.0)), np.nan),
+    )
+
+
+def _cells(df):
+    return pd.MultiIndex.from_frame(df[ROLLUP_KEYS])
+
+
+class SentimentRollup:
+    """
+    Materialized sentiment aggregates per (ticker, trading_date, publisher).
+
+    Each cell holds the count, sum, sum of squares, minimum and maximum of
+    the headline polarity, so daily means and standard deviations for any
+    grouping of tickers or publishers are derived from the cells alone in
+    O(days x tickers x publishers), without reading headlines again. `update`
+    merges new headlines into the cells. A ledger keeps the digest, cell and
+    polarity of every ingested headline row, so a refresh with overlapping
+    data counts each row once, a rescored row replaces its old polarity and
+    rows missing from a full snapshot can be retracted.
+
+    The trading date is the publication day ('exact'), or with 'next_session'
+    the day after for headlines published at or after `market_close`, as in
+    `merge_stock_and_ratings`.
+    """
+
+    def __init__(
+        self,
+        table=None,
+        ledger=None,
+        symbol_column="stock",
+        sentiment_col="Sentiment_Polarity",
+        align="exact",
+        market_close="16:00",
+    ):
+        if align not in ("exact", "next_session"):
+            raise ValueError(f"Unknown align mode '{align}'")
+        if table is None:
+            table = pd.DataFrame(
+                {
+                    "ticker": pd.Series(dtype=object),
+                    "trading_date": pd.Series(dtype="datetime64[ns]"),
+                    "publisher": pd.Series(dtype=object),
+                    "count": pd.Series(dtype=np.int64),
+                    **{stat: pd.Series(dtype=float) for stat in ROLLUP_STATS[1:]},
+                }
+            )
+        if ledger is None:
+            ledger = pd.DataFrame(
+                {
+                    "digest": pd.Series(dtype=np.uint64),
+                    **{key: table[key].iloc[:0] for key in ROLLUP_KEYS},
+                    "polarity": pd.Series(dtype=float),
+                }
+            )
+        self.table = table
+        self.ledger = ledger
+        self.symbol_column = symbol_column
+        self.sentiment_col = sentiment_col
+        self.align = align
+        self.market_close = market_close
+
+    @property
+    def settings(self):
+        return {
+            "symbol_column": self.symbol_column,
+            "sentiment_col": self.sentiment_col,
+            "align": self.align,
+            "market_close": self.market_close,
+        }
+
+    def __len__(self):
+        return len(self.table)
+
+    def __repr__(self):
+        return (
+            f"SentimentRollup({len(self.table)} cells, "
+            f"{int(self.table['count'].sum())} headlines, align={self.align!r})"
+        )
+
+    @classmethod
+    def build(cls, scored_df, **settings):
+        """
+        Build a rollup from scored headlines.
+
+        Args:
+            scored_df (pd.DataFrame): Ratings with 'date', the symbol column,
+                                      'publisher' and the polarity column.
+            **settings: `symbol_column`, `sentiment_col`, `align`, `market_close`.
+
+        Returns:
+            SentimentRollup: The new rollup.
+        """
+        rollup = cls(**settings)
+        rollup.update(scored_df)
+        return rollup
+
+    def _digests(self, scored_df):
+        columns = [col for col in HEADLINE_IDENTITY if col in scored_df.columns]
+        identity = pd.DataFrame(
+            {
+                col: (
+                    pd.to_datetime(scored_df[col]).to_numpy()
+                    if col == "date"
+                    else scored_df[col].astype(str).to_numpy()
+                )
+                for col in columns
+            }
+        )
+        symbols = scored_df[self.symbol_column].astype(str).str.upper()
+        identity["_symbol"] = symbols.to_numpy()
+        return pd.util.hash_pandas_object(identity, index=False).to_numpy()
+
+    def _ledger_rows(self, scored_df):
+        """
+        Ledger rows (digest, cell keys, polarity) of scored headlines, one per
+        distinct headline row. Rows without a symbol or date are dropped.
+        """
+        published = pd.to_datetime(scored_df["date"])
+        valid = scored_df[self.symbol_column].notna() & published.notna()
+        scored_df, published = scored_df[valid.to_numpy()], published[valid]
+        symbols = scored_df[self.symbol_column].astype(str).str.upper()
+        if self.align == "exact":
+            day = published.dt.normalize()
+        else:
+            day = _next_session_day(published, self.market_close)
+        publisher = (
+            scored_df["publisher"].astype(str).to_numpy()
+            if "publisher" in scored_df.columns
+            else np.full(len(scored_df), "")
+        )
+        rows = pd.DataFrame(
+            {
+                "digest": self._digests(scored_df),
+                "ticker": symbols.to_numpy(),
+                "trading_date": day.to_numpy().astype("datetime64[ns]"),
+                "publisher": publisher,
+                "polarity": scored_df[self.sentiment_col].to_numpy(dtype=float),
+            }
+        )
+        return rows[~rows["digest"].duplicated().to_numpy()]
+
+    @staticmethod
+    def _aggregate(rows):
+        x = rows["polarity"]
+        return (
+            rows.assign(x=x, x2=x * x)
+            .groupby(ROLLUP_KEYS, sort=True)
+            .agg(
+                count=("x", "count"),
+                sum=("x", "sum"),
+                sumsq=("x2", "sum"),
+                min=("x", "min"),
+                max=("x", "max"),
+            )
+            .reset_index()
+        )
+
+    def update(self, scored_df, prune=False):
+        """
+        Merge scored headlines into the aggregates.
+
+        Rows already ingested with the same polarity (same date, headline,
+        publisher and symbol) are skipped. A row ingested with another
+        polarity, e.g. after a scorer change, is retracted and merged again
+        with the new one. With `prune`, `scored_df` is the complete set of
+        headlines and ingested rows missing from it are retracted too.
+
+        New rows only are aggregated and combined with the existing cells.
+        Cells that lose rows are recomputed from their ledger rows, so the
+        minimum and maximum stay exact.
+
+        Args:
+            scored_df (pd.DataFrame): Scored ratings, see `build`.
+            prune (bool): Retract ingested rows missing from `scored_df`.
+
+        Returns:
+            int: Number of headline rows added, rescored or removed.
+
+        Raises:
+            ValueError: If a required column is missing.
+        """
+        missing = [
+            col
+            for col in ("date", self.symbol_column, self.sentiment_col)
+            if col not in scored_df.columns
+        ]
+        if missing:
+            raise ValueError(f"Missing columns in the DataFrame: {missing}")
+        incoming = self._ledger_rows(scored_df)
+        stored = pd.Series(
+            self.ledger["polarity"].to_numpy(), index=self.ledger["digest"].to_numpy()
+        )
+        known = np.isin(incoming["digest"].to_numpy(), stored.index.to_numpy())
+        previous = stored.reindex(incoming["digest"].to_numpy()).to_numpy()
+        current = incoming["polarity"].to_numpy()
+        unchanged = known & (
+            (previous == current) | (np.isnan(previous) & np.isnan(current))
+        )
+        added = incoming[~unchanged]
+
+        digests = self.ledger["digest"].to_numpy()
+        keep = ~np.isin(digests, added["digest"].to_numpy())
+        if prune:
+            keep &= np.isin(digests, incoming["digest"].to_numpy())
+        retracted = self.ledger[~keep]
+
+        if len(added) or len(retracted):
+            self.ledger = pd.concat([self.ledger[keep], added], ignore_index=True)
+            if len(retracted) == 0:
+                partial = self._aggregate(added)
+                self.table = combine_rollup_stats(
+                    pd.concat([self.table, partial], ignore_index=True), ROLLUP_KEYS
+                )
+            else:
+                affected = _cells(pd.concat([retracted, added]))
+                stale = _cells(self.table).isin(affected)
+                refreshed = _cells(self.ledger).isin(affected)
+                self.table = combine_rollup_stats(
+                    pd.concat(
+                        [self.table[~stale], self._aggregate(self.ledger[refreshed])],
+                        ignore_index=True,
+                    ),
+                    ROLLUP_KEYS,
+                )
+        rescored = int((known & ~unchanged).sum())
+        logging.info(
+            f"Sentiment rollup: merged {len(added) - rescored} new and {rescored} "
+            f"rescored headlines, removed {len(retracted) - rescored}, "
+            f"{len(self.table)} cells"
+        )
+        return len(added) + len(retracted) - rescored
+
+    def daily(self, by=None):
+        """
+        Daily aggregates with 'mean' and 'std', overall or per ticker/publisher.
+
+        Args:
+            by (str, optional): 'ticker', 'publisher' or None for all headlines.
+
+        Returns:
+            pd.DataFrame: Rows of (`by`,) 'trading_date' with the rollup stats.
+        """
+        keys = ["trading_date"] if by is None else [by, "trading_date"]
+        return rollup_moments(combine_rollup_stats(self.table, keys))
+
+    def totals(self, by="publisher"):
+        """
+        Headline counts per ticker or publisher, largest first.
+        """
+        return self.table.groupby(by)["count"].sum().sort_values(ascending=False)
+
+    def save(self, path):
+        """
+        Persist the rollup to a directory through a temporary copy and a rename.
+        """
+        tmp_path = path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        self.table.to_parquet(os.path.join(tmp_path, ROLLUP_FILE), index=False)
+        self.ledger.to_parquet(os.path.join(tmp_path, ROLLUP_LEDGER), index=False)
+        with open(os.path.join(tmp_path, ROLLUP_META), "w") as f:
+            json.dump({"version": ROLLUP_VERSION, **self.settings}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a rollup saved with `save`.
+
+        Raises:
+            FileNotFoundError: If the directory holds no rollup.
+            ValueError: If the rollup was saved in an older layout.
+        """
+        meta_file = os.path.join(path, ROLLUP_META)
+        if not os.path.exists(meta_file):
+            raise FileNotFoundError(f"No sentiment rollup in '{path}'")
+        with open(meta_file) as f:
+            settings = json.load(f)
+        version = settings.pop("version", 1)
+        if version != ROLLUP_VERSION:
+            raise ValueError(
+                f"Sentiment rollup in '{path}' has version {version}, "
+                f"expected {ROLLUP_VERSION}"
+            )
+        table = pd.read_parquet(os.path.join(path, ROLLUP_FILE))
+        ledger = pd.read_parquet(os.path.join(path, ROLLUP_LEDGER))
+        for frame in (table, ledger):
+            frame["trading_date"] = frame["trading_date"].astype("datetime64[ns]")
+        return cls(table=table, ledger=ledger, **settings)
+
+
+def refresh_sentiment_rollup(scored_df, path, snapshot=True, **settings):
+    """
+    Sync the rollup persisted at `path` with scored headlines and save it.
+
+    New rows are merged and rescored rows replace their old polarity. With
+    `snapshot`, `scored_df` is the complete set of headlines (as in the
+    pipeline) and rows that disappeared from it are removed. The rollup is
+    created when missing, and rebuilt from `scored_df` when it was built
+    with other settings or saved in an older layout.
+
+    Args:
+        scored_df (pd.DataFrame): Scored ratings.
+        path (str): Rollup directory.
+        snapshot (bool): Remove ingested rows missing from `scored_df`.
+        **settings: See `SentimentRollup`.
+
+    Returns:
+        SentimentRollup: The refreshed rollup.
+    """
+    rollup = SentimentRollup(**settings)
+    if os.path.exists(os.path.join(path, ROLLUP_META)):
+        try:
+            stored = SentimentRollup.load(path)
+        except ValueError as e:
+            logging.info(f"{e}, rebuilding")
+            stored = None
+        if stored is not None and stored.settings == rollup.settings:
+            rollup = stored
+        elif stored is not None:
+            logging.info(f"Sentiment rollup settings changed, rebuilding {path}")
+    rollup.update(scored_df, prune=snapshot)
+    rollup.save(path)
+    return rollup
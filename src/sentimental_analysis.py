@@ -1,22 +1,225 @@
-from textblob import TextBlob
+import hashlib
+import os
+import sqlite3
+import threading
+import pandas as pd
 
+try:
+    from .compact import compact_stage
+    from .lexicon_sentiment import LEXICON_VERSION, score_polarity
+    from .near_duplicates import cluster_representatives
+    from .profiling import instrument
+except ImportError:
+    from compact import compact_stage
+    from lexicon_sentiment import LEXICON_VERSION, score_polarity
+    from near_duplicates import cluster_representatives
+    from profiling import instrument
 
-def add_sentiment_analysis(analyst_ratings_df, text_column="headline"):
+SENTIMENT_BACKENDS = ("textblob", "lexicon")
+# Version of each scorer's output, part of every cache key: bumping one makes
+# the polarities cached by the previous implementation miss.
+SCORER_VERSIONS = {"textblob": 1, "lexicon": LEXICON_VERSION}
+
+
+def normalize_headline(text):
+    """
+    Normalize a headline for caching: string conversion and collapsed whitespace.
+
+    Whitespace does not affect TextBlob tokenization, so normalized and raw
+    headlines always receive the same polarity.
+    """
+    return " ".join(str(text).split())
+
+
+def headline_key(text, scorer="textblob"):
+    """
+    Content-addressed cache key of a normalized headline for a given scorer
+    and its version in `SCORER_VERSIONS`.
+    """
+    version = SCORER_VERSIONS.get(scorer, 0)
+    return hashlib.sha1(f"{scorer}@{version}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """
+    Persistent polarity cache stored in a local SQLite file.
+
+    Entries are keyed by `headline_key`, so identical headlines share one
+    score across runs and across every function that uses the cache.
+    """
+
+    _BATCH = 500
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS polarity (key TEXT PRIMARY KEY, value REAL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """
+        Look up a batch of keys.
+
+        Args:
+            keys (list): Cache keys.
+
+        Returns:
+            dict: Mapping of the keys found in the cache to their polarity.
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), self._BATCH):
+                batch = keys[start : start + self._BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM polarity WHERE key IN ({placeholders})",
+                    batch,
+                )
+                found.update(rows)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """
+        Store a mapping of cache keys to polarity scores.
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO polarity (key, value) VALUES (?, ?)",
+                list(items.items()),
+            )
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Hit/miss counts (over distinct headlines) since the cache was opened.
+
+        Returns:
+            dict: 'hits', 'misses' and 'hit_rate'.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+def score_headlines(texts, cache=None, backend="textblob"):
+    """
+    Compute polarity for a sequence of headlines.
+
+    Headlines are normalized and de-duplicated first, so each distinct
+    headline is scored at most once. With a cache, hits are fetched in bulk
+    and only the misses are scored and written back.
+
+    Args:
+        texts (iterable): Headlines to score.
+        cache (SentimentCache, optional): Persistent polarity cache.
+        backend (str): 'textblob' scores one TextBlob per headline; 'lexicon'
+                       scores all misses at once with
+                       `lexicon_sentiment.score_polarity`.
+
+    Returns:
+        pd.Series: Polarity scores aligned with `texts`.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend not in SENTIMENT_BACKENDS:
+        raise ValueError(
+            f"Unknown sentiment backend '{backend}', expected one of {SENTIMENT_BACKENDS}"
+        )
+    texts = pd.Series(texts)
+    normalized = texts.map(normalize_headline)
+    unique = normalized.unique().tolist()
+    keys = [headline_key(text, scorer=backend) for text in unique]
+
+    scores = cache.get_many(keys) if cache is not None else {}
+    pending = [(key, text) for key, text in zip(keys, unique) if key not in scores]
+    if backend == "lexicon":
+        polarity = score_polarity([text for _, text in pending])
+        missing = {key: float(p) for (key, _), p in zip(pending, polarity)}
+    else:
+        from textblob import TextBlob
+
+        missing = {key: TextBlob(text).sentiment.polarity for key, text in pending}
+    if cache is not None and missing:
+        cache.put_many(missing)
+    scores.update(missing)
+
+    by_text = {text: scores[key] for key, text in zip(keys, unique)}
+    return normalized.map(by_text).astype(float)
+
+
+@instrument("add_sentiment_analysis")
+def add_sentiment_analysis(
+    analyst_ratings_df,
+    text_column="headline",
+    cache=None,
+    backend="textblob",
+    compact=False,
+    cluster_column=None,
+):
     """
     Perform sentiment analysis on the comments in analyst ratings.
 
     Args:
         analyst_ratings_df (pd.DataFrame): DataFrame containing analyst ratings.
         text_column (str): Column name containing textual comments.
+        cache (SentimentCache, optional): Persistent polarity cache shared
+                                          with `eda.analyze_sentiment`.
+        backend (str): Scoring backend, 'textblob' or the vectorized 'lexicon'.
+        compact (bool): Return the frame with the compact dtypes, polarity
+                        as float32 (see `compact.compact_frame`).
+        cluster_column (str, optional): Near-duplicate cluster id column (see
+                        `near_duplicates.assign_headline_clusters`). Only the
+                        first headline of each cluster is scored and its
+                        polarity is copied to the rest of the cluster.
 
     Returns:
         pd.DataFrame: Updated DataFrame with sentiment polarity scores.
     """
     if text_column in analyst_ratings_df.columns:
-        analyst_ratings_df["Sentiment_Polarity"] = analyst_ratings_df[
-            text_column
-        ].apply(lambda x: TextBlob(str(x)).sentiment.polarity)
+        if cluster_column is not None and cluster_column in analyst_ratings_df.columns:
+            clusters = analyst_ratings_df[cluster_column]
+            representatives = cluster_representatives(
+                analyst_ratings_df, cluster_column
+            )
+            scores = score_headlines(
+                analyst_ratings_df.loc[representatives, text_column],
+                cache=cache,
+                backend=backend,
+            )
+            polarity = clusters.map(
+                pd.Series(scores.to_numpy(), index=clusters[representatives].to_numpy())
+            ).to_numpy(dtype=float)
+            print(
+                f"Scored {int(representatives.sum())} cluster representatives "
+                f"for {len(analyst_ratings_df)} headlines."
+            )
+        else:
+            polarity = score_headlines(
+                analyst_ratings_df[text_column], cache=cache, backend=backend
+            ).to_numpy()
+        analyst_ratings_df["Sentiment_Polarity"] = polarity
         print("Sentiment analysis added successfully.")
+        if cache is not None:
+            print(f"Sentiment cache stats: {cache.stats()}")
     else:
         print(f"Column '{text_column}' not found in the analyst ratings data.")
+    if compact:
+        analyst_ratings_df = compact_stage("add_sentiment_analysis", analyst_ratings_df)
     return analyst_ratings_df
@@ -0,0 +1,35 @@
+import json
+import logging
+from benchmarks import run_benchmarks
+from benchmarks.synthetic_data import generate_analyst_ratings, generate_stock_folder
+from src.data_loader import load_analyst_ratings, load_stock_data_from_folder
+
+
+def test_synthetic_data_is_deterministic_and_loadable(tmp_path):
+    for run in ("a", "b"):
+        tickers = generate_stock_folder(str(tmp_path / run / "stocks"), 3, 60, seed=7)
+        generate_analyst_ratings(
+            str(tmp_path / run / "ratings.csv"), 200, tickers, 60, seed=7
+        )
+    assert (tmp_path / "a" / "ratings.csv").read_bytes() == (
+        tmp_path / "b" / "ratings.csv"
+    ).read_bytes()
+
+    stock_data = load_stock_data_from_folder(str(tmp_path / "a" / "stocks"), use_cache=False)
+    ratings = load_analyst_ratings(str(tmp_path / "a" / "ratings.csv"))
+    assert sorted(stock_data) == tickers == ["AAA", "AAB", "AAC"]
+    assert all(len(df) == 60 for df in stock_data.values())
+    assert len(ratings) == 200 and set(ratings["stock"]) <= set(tickers)
+
+
+def test_run_benchmarks_writes_results(tmp_path):
+    output = tmp_path / "bench.json"
+    root_level = logging.getLogger().level
+    report = run_benchmarks.main(
+        ["--sizes", "2x80x100", "--no-memory", "--output", str(output)]
+    )
+    assert logging.getLogger().level == root_level
+    assert json.loads(output.read_text()) == report
+    benchmarks = [r["benchmark"] for r in report["results"]]
+    assert "merge_stock_and_ratings" in benchmarks
+    assert all(r["wall_s"] >= 0 for r in report["results"])
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic_data import generate_analyst_ratings, generate_stock_folder
+from src.compact import compact_frame, memory_mb, symbol_dtype
+from src.data_loader import load_analyst_ratings, load_stock_data_from_folder
+from src.data_processing import merge_stock_and_ratings
+from src.sentimental_analysis import add_sentiment_analysis
+
+
+def test_compact_frame_dtypes():
+    df = pd.DataFrame(
+        {
+            "headline": ["a", "b", "a"],
+            "publisher": ["P", "Q", "P"],
+            "stock": ["AAA", "BBB", None],
+            "symbol": ["AAA", "BBB", "CCC"],
+            "close": [1.5, 2.5, 3.5],
+            "volume": np.array([10, 20, 30], dtype=np.int64),
+        }
+    )
+    compact = compact_frame(df)
+    assert compact["stock"].dtype == compact["symbol"].dtype
+    assert list(compact["symbol"].cat.categories) == ["AAA", "BBB", "CCC"]
+    assert compact["stock"].isna().tolist() == [False, False, True]
+    assert isinstance(compact["publisher"].dtype, pd.CategoricalDtype)
+    assert compact["headline"].dtype == "string[pyarrow]"
+    assert compact["close"].dtype == np.float32
+    assert compact["volume"].dtype == np.uint8
+    assert df["close"].dtype == np.float64
+
+
+def test_compact_pipeline_matches_full_precision(tmp_path):
+    tickers = generate_stock_folder(str(tmp_path / "stocks"), 4, 120, seed=3)
+    generate_analyst_ratings(str(tmp_path / "ratings.csv"), 3000, tickers, 120, seed=3)
+
+    results = {}
+    for compact in (False, True):
+        stock_data = load_stock_data_from_folder(
+            str(tmp_path / "stocks"), use_cache=False, compact=compact
+        )
+        ratings = load_analyst_ratings(str(tmp_path / "ratings.csv"), compact=compact)
+        scored = add_sentiment_analysis(ratings, backend="lexicon", compact=compact)
+        results[compact] = (
+            memory_mb(stock_data) + memory_mb(scored),
+            merge_stock_and_ratings(stock_data, scored, compact=compact),
+        )
+
+    (full_mb, full), (compact_mb, compact) = results[False], results[True]
+    assert compact_mb < 0.8 * full_mb
+    assert compact["stock_name"].dtype == symbol_dtype(tickers)
+    assert compact["Sentiment_Polarity"].dtype == np.float32
+    assert memory_mb(compact) < memory_mb(full)
+    assert len(compact) == len(full)
+    np.testing.assert_allclose(
+        compact["close"].to_numpy(dtype=float), full["close"], rtol=1e-6
+    )
+    np.testing.assert_allclose(
+        compact["Sentiment_Polarity"].to_numpy(dtype=float),
+        full["Sentiment_Polarity"],
+        atol=1e-6,
+    )
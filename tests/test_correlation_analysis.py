@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+import pandas as pd
+from scipy.stats import pearsonr
+from src.correlation_analysis import (
+    CORRELATION_MATRIX_COLUMNS,
+    calculate_correlation,
+    calculate_correlation_matrix,
+)
+
+
+@pytest.fixture
+def merged_data():
+    """Fixture to return merged sentiment/returns rows for two tickers"""
+    rng = np.random.default_rng(2)
+    dates = pd.date_range(start="2020-01-01", periods=40, freq="B")
+    frames = []
+    for ticker in ["AAA", "BBB"]:
+        sentiment = rng.normal(0, 0.3, len(dates))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": dates,
+                    "stock_name": ticker,
+                    "Sentiment_Polarity": sentiment,
+                    "Daily_Returns": 0.01 * sentiment + rng.normal(0, 0.01, len(dates)),
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_calculate_correlation_does_not_plot_by_default(merged_data, monkeypatch):
+    import matplotlib.pyplot as plt
+
+    monkeypatch.setattr(plt, "show", lambda: pytest.fail("plot shown"))
+    assert -1.0 <= calculate_correlation(merged_data) <= 1.0
+
+
+def test_calculate_correlation_matrix(merged_data):
+    result = calculate_correlation_matrix(merged_data, max_lag=2, window=10)
+
+    for ticker, group in merged_data.groupby("stock_name"):
+        x = group["Sentiment_Polarity"].to_numpy()
+        y = group["Daily_Returns"].to_numpy()
+
+        row = result[(result["kind"] == "ticker") & (result["ticker"] == ticker)]
+        r, p = pearsonr(x, y)
+        assert np.isclose(row["correlation"].iloc[0], r)
+        assert np.isclose(row["p_value"].iloc[0], p)
+
+        lagged = result[(result["lag"] == 2) & (result["ticker"] == ticker)]
+        assert np.isclose(lagged["correlation"].iloc[0], pearsonr(x[:-2], y[2:])[0])
+
+        rolling = result[(result["kind"] == "rolling") & (result["ticker"] == ticker)]
+        expected = pd.Series(x).rolling(10).corr(pd.Series(y)).dropna()
+        assert np.allclose(rolling["correlation"], expected)
+
+
+def test_calculate_correlation_matrix_without_shared_tickers(merged_data):
+    stock_data = {
+        "ZZZ": pd.DataFrame(
+            {"date": pd.bdate_range("2020-01-01", periods=5), "Daily_Returns": 0.0}
+        )
+    }
+    result = calculate_correlation_matrix(merged_data, stock_data=stock_data)
+    assert result.empty
+    assert list(result.columns) == CORRELATION_MATRIX_COLUMNS
+
+
+def test_calculate_correlation_matrix_keeps_precision_far_from_zero():
+    rng = np.random.default_rng(9)
+    n = 5000
+    x = rng.normal(0, 1e-3, n)
+    y = 0.5 * x + rng.normal(0, 1e-3, n)
+    df = pd.DataFrame(
+        {
+            "date": pd.bdate_range("2000-01-03", periods=n),
+            "stock_name": "AAA",
+            "Sentiment_Polarity": 1e6 + x,
+            "Daily_Returns": 1e4 + y,
+        }
+    )
+    result = calculate_correlation_matrix(df, window=50)
+
+    row = result[result["kind"] == "ticker"]
+    assert np.isclose(row["correlation"].iloc[0], pearsonr(x, y)[0], atol=1e-6)
+    rolling = result[result["kind"] == "rolling"]["correlation"].to_numpy()
+    expected = pd.Series(x).rolling(50).corr(pd.Series(y)).dropna().to_numpy()
+    np.testing.assert_allclose(rolling, expected, atol=1e-6)
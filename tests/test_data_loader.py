@@ -1,7 +1,11 @@
+import os
 import pytest
 import pandas as pd
 from src.data_loader import (
+    iter_analyst_ratings,
+    load_analyst_ratings,
     load_stock_data_from_folder,
+    write_analyst_ratings_parquet,
 )
 
 
@@ -21,3 +25,151 @@ def test_load_stock_data_from_folder(sample_stock_data):
     assert df.shape == (5, 2), "Dataframe should have 5 rows and 2 columns"
     assert "date" in df.columns, "Dataframe should contain 'date' column"
     assert "close" in df.columns, "Dataframe should contain 'close' column"
+
+
+def _write_price_csv(path, closes):
+    pd.DataFrame(
+        {
+            "Date": pd.date_range(start="2020-01-01", periods=len(closes), freq="D")
+            .strftime("%Y-%m-%d")
+            .tolist()[::-1],
+            "Open": closes[::-1],
+            "High": closes[::-1],
+            "Low": closes[::-1],
+            "Close": closes[::-1],
+            "Volume": [1000] * len(closes),
+        }
+    ).to_csv(path, index=False)
+
+
+def test_load_stock_data_from_folder_cache(tmp_path):
+    from src import data_loader
+
+    _write_price_csv(tmp_path / "AAA_historical_data.csv", [1.0, 2.0, 3.0])
+    _write_price_csv(tmp_path / "BBB_historical_data.csv", [4.0, 5.0])
+
+    cold = load_stock_data_from_folder(str(tmp_path))
+    assert data_loader.last_cache_stats == {"hits": 0, "misses": 2}
+    assert cold["AAA"]["date"].is_monotonic_increasing
+
+    warm = load_stock_data_from_folder(str(tmp_path))
+    assert data_loader.last_cache_stats == {"hits": 2, "misses": 0}
+    for name in cold:
+        pd.testing.assert_frame_equal(cold[name], warm[name])
+
+    _write_price_csv(tmp_path / "BBB_historical_data.csv", [4.0, 5.0, 6.0])
+    refreshed = load_stock_data_from_folder(str(tmp_path))
+    assert data_loader.last_cache_stats == {"hits": 1, "misses": 1}
+    assert len(refreshed["BBB"]) == 3
+
+
+def test_load_stock_data_from_folder_reparses_corrupt_cache(tmp_path):
+    from src import data_loader
+
+    _write_price_csv(tmp_path / "AAA_historical_data.csv", [1.0, 2.0, 3.0])
+    cold = load_stock_data_from_folder(str(tmp_path))
+    cache_file = tmp_path / data_loader.STOCK_CACHE_DIRNAME / "AAA.parquet"
+    cache_file.write_bytes(cache_file.read_bytes()[:20])
+
+    for _ in range(2):
+        reloaded = load_stock_data_from_folder(str(tmp_path))
+        pd.testing.assert_frame_equal(reloaded["AAA"], cold["AAA"])
+    # The second load reads the rewritten cache file.
+    assert data_loader.last_cache_stats == {"hits": 1, "misses": 0}
+    assert not any(name.endswith(".tmp") for name in os.listdir(cache_file.parent))
+
+
+def test_load_stock_data_from_folder_parallel_matches_serial(tmp_path):
+    _write_price_csv(tmp_path / "AAA_historical_data.csv", [1.0, 2.0, 3.0])
+    _write_price_csv(tmp_path / "BBB_historical_data.csv", [4.0, 5.0])
+    pd.DataFrame({"Date": ["2020-01-01"], "Close": [1.0]}).to_csv(
+        tmp_path / "BAD_historical_data.csv", index=False
+    )
+
+    serial = load_stock_data_from_folder(str(tmp_path), use_cache=False)
+    parallel = load_stock_data_from_folder(str(tmp_path), use_cache=False, workers=2)
+
+    assert list(serial) == list(parallel) == ["AAA", "BBB"]
+    for name in serial:
+        pd.testing.assert_frame_equal(serial[name], parallel[name])
+    assert parallel["AAA"]["volume"].dtype == "int64"
+
+
+def test_load_stock_data_tolerates_blank_volume_and_timestamps(tmp_path):
+    from src import data_loader
+
+    (tmp_path / "AAA_historical_data.csv").write_text(
+        "Date,Open,High,Low,Close,Volume\n"
+        "2020-01-02,1,1,1,1.0,1000.0\n"
+        "2020-01-03 00:00:00-05:00,1,1,1,2.0,\n"
+        "2020-01-06,1,1,1,3.0,1200\n"
+        "not a date,1,1,1,4.0,1300\n"
+    )
+    _write_price_csv(tmp_path / "BBB_historical_data.csv", [4.0, 5.0])
+    stock_data = load_stock_data_from_folder(str(tmp_path))
+    aaa = stock_data["AAA"]
+    assert aaa["date"].tolist() == list(
+        pd.to_datetime(["2020-01-02", "2020-01-03", "2020-01-06"])
+    )
+    assert aaa["close"].tolist() == [1.0, 2.0, 3.0]
+    assert aaa["volume"].isna().tolist() == [False, True, False]
+    assert stock_data["BBB"]["volume"].dtype == "int64"
+
+    # Entries cached by an older parser version are parsed again.
+    cache_dir = tmp_path / data_loader.STOCK_CACHE_DIRNAME
+    manifest = data_loader._load_cache_manifest(str(cache_dir))
+    for entry in manifest.values():
+        entry.pop("schema")
+    data_loader._save_cache_manifest(str(cache_dir), manifest)
+    load_stock_data_from_folder(str(tmp_path))
+    assert data_loader.last_cache_stats == {"hits": 0, "misses": 2}
+
+
+@pytest.fixture
+def ratings_csv(tmp_path):
+    """Fixture writing a small raw analyst ratings file with duplicates"""
+    rows = [
+        ("Stocks rally", "Benzinga", "2020-06-05 10:30:54-04:00", "AAPL"),
+        ("Stocks rally", "Benzinga", "2020-06-05 10:30:54-04:00", "AAPL"),
+        ("Shares slide", "Reuters", "2020-06-04 09:00:00-04:00", "TSLA"),
+        (None, "Reuters", "2020-06-04 09:00:00-04:00", "TSLA"),
+        ("Stocks rally", "Benzinga", "2020-06-05 10:30:54-04:00", "AAPL"),
+        ("Stocks rally", "Benzinga", "2020-06-06 10:30:54-04:00", "AAPL"),
+    ]
+    path = tmp_path / "raw_analyst_ratings.csv"
+    pd.DataFrame(rows, columns=["headline", "publisher", "date", "symbol"]).to_csv(
+        path, index=False
+    )
+    return path
+
+
+def test_iter_analyst_ratings_matches_full_load(ratings_csv, tmp_path):
+    expected = load_analyst_ratings(str(ratings_csv))
+    streamed = pd.concat(list(iter_analyst_ratings(str(ratings_csv), chunksize=2)))
+
+    assert len(streamed) == len(expected) == 3
+    assert streamed["date"].tolist() == expected["date"].tolist()
+    assert streamed["headline"].tolist() == expected["headline"].tolist()
+
+    rows = write_analyst_ratings_parquet(
+        str(ratings_csv), str(tmp_path / "ratings.parquet"), chunksize=2
+    )
+    assert rows == 3
+    assert len(pd.read_parquet(tmp_path / "ratings.parquet")) == 3
+
+
+def test_iter_analyst_ratings_dedupes_across_chunks_with_mixed_dtypes(tmp_path):
+    # Chunk 1 infers an integer 'rating' column, chunk 2 a float one.
+    path = tmp_path / "ratings.csv"
+    path.write_text(
+        "headline,publisher,date,symbol,rating\n"
+        "Up,A,2020-06-05 10:00:00,AAPL,1\n"
+        "Down,A,2020-06-05 11:00:00,AAPL,2\n"
+        "Up,A,2020-06-05 10:00:00,AAPL,1\n"
+        "Flat,A,2020-06-05 12:00:00,AAPL,\n"
+    )
+    streamed = pd.concat(list(iter_analyst_ratings(str(path), chunksize=2)))
+    assert streamed["headline"].tolist() == ["Up", "Down", "Flat"]
+
+    raw = pd.concat(list(iter_analyst_ratings(str(path), chunksize=2, dedup=False)))
+    assert raw["headline"].tolist() == ["Up", "Down", "Up", "Flat"]
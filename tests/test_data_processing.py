@@ -0,0 +1,63 @@
+import pytest
+import pandas as pd
+from src.data_processing import merge_stock_and_ratings
+
+
+@pytest.fixture
+def sample_stock_data():
+    """Fixture to return stock data for two tickers over three sessions"""
+    dates = pd.to_datetime(["2020-06-04", "2020-06-05", "2020-06-08"])
+    return {
+        name: pd.DataFrame({"date": dates, "close": [1.0, 2.0, 3.0]})
+        for name in ["AAPL", "tsla"]
+    }
+
+
+@pytest.fixture
+def sample_ratings():
+    """Fixture to return headlines, including after-hours and weekend news"""
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(
+                [
+                    "2020-06-05 10:00",
+                    "2020-06-05 17:00",
+                    "2020-06-06 09:00",
+                    "2020-06-04 08:00",
+                    "2020-06-05 00:00",
+                ]
+            ),
+            "headline": ["a", "b", "c", "d", "e"],
+            "stock": ["aapl", "AAPL", "TSLA", "TSLA", "MSFT"],
+            "Sentiment_Polarity": [0.1, 0.2, 0.3, 0.4, 0.5],
+        }
+    )
+
+
+def test_merge_stock_and_ratings_exact(sample_stock_data, sample_ratings):
+    merged = merge_stock_and_ratings(sample_stock_data, sample_ratings)
+
+    assert merged["headline"].tolist() == ["a", "b", "d"]
+    assert merged["stock_name"].tolist() == ["AAPL", "AAPL", "tsla"]
+    assert merged["close"].tolist() == [2.0, 2.0, 1.0]
+    assert merged.columns[-1] == "stock_name"
+
+
+def test_merge_stock_and_ratings_next_session(sample_stock_data, sample_ratings):
+    merged = merge_stock_and_ratings(
+        sample_stock_data, sample_ratings, align="next_session"
+    )
+
+    by_headline = merged.set_index("headline")["date"].dt.strftime("%Y-%m-%d")
+    assert by_headline.to_dict() == {
+        "a": "2020-06-05",
+        "b": "2020-06-08",
+        "c": "2020-06-08",
+        "d": "2020-06-04",
+    }
+    published = merged.set_index("headline")["published_at"]
+    assert published["b"] == pd.Timestamp("2020-06-05 17:00")
+    assert published["c"] == pd.Timestamp("2020-06-06 09:00")
+    assert "published_at" not in merge_stock_and_ratings(
+        sample_stock_data, sample_ratings
+    ).columns
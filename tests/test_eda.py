@@ -1,7 +1,21 @@
+import os
 import pytest
 from src.eda import (
+    analyst_ratings_summary,
+    analyze_article_per_publisher,
+    analyze_sentiment,
+    analyze_text_length_and_frequency,
+    assign_topics,
+    compute_headline_stats,
+    export_stock_charts,
+    lttb_downsample,
+    plot_publication_times,
     plot_stock_prices,
+    plot_with_indicators,
+    stream_topic_modeling,
+    top_topic_terms,
 )
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -32,3 +46,161 @@ def test_plot_stock_prices(sample_stock_data):
     # Check that plt.show() is called during the function (testing the plot)
     with pytest.raises(Exception):
         plt.close()  # Avoid error if plt.show() raises exception.
+
+
+def test_lttb_downsample_keeps_shape():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[500] = 10.0
+
+    keep = lttb_downsample(x, y, 50)
+
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert 500 in keep
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_export_stock_charts(sample_stock_data, tmp_path):
+    stock_data = {"AAA": sample_stock_data, "BBB": sample_stock_data}
+    open_figures = plt.get_fignums()
+
+    paths = export_stock_charts(stock_data, str(tmp_path), fmt="svg", workers=2)
+
+    assert sorted(paths) == [str(tmp_path / "AAA.svg"), str(tmp_path / "BBB.svg")]
+    assert all((tmp_path / name).stat().st_size > 0 for name in ["AAA.svg", "BBB.svg"])
+    assert plt.get_fignums() == open_figures
+
+
+def test_plot_helpers_save_headless(sample_stock_data, tmp_path, monkeypatch):
+    monkeypatch.setattr(plt, "show", lambda: pytest.fail("plt.show() called"))
+    open_figures = plt.get_fignums()
+    ratings = pd.DataFrame(
+        {
+            "headline": ["Up big", "Down bad", "Flat day"],
+            "publisher": ["A", "B", "A"],
+            "stock": ["X", "Y", "X"],
+            "date": pd.to_datetime(
+                ["2020-06-01 09:30", "2020-06-01 16:00", "2020-06-02 08:00"]
+            ),
+        }
+    )
+    indicators = sample_stock_data.assign(
+        SMA_20=1.0, SMA_50=1.0, RSI=50.0, MACD=0.0, MACD_signal=0.0
+    )
+    out = str(tmp_path)
+
+    paths = plot_stock_prices({"AAA": sample_stock_data}, output_dir=out)
+    paths += plot_with_indicators(indicators, "AAA", output_dir=out)
+    summary = analyst_ratings_summary(ratings, symbol_column="stock", output_dir=out)
+    paths += [
+        analyze_text_length_and_frequency(ratings, output_dir=out),
+        analyze_article_per_publisher(ratings, output_dir=out),
+        analyze_sentiment(ratings, backend="lexicon", output_dir=out),
+        plot_publication_times(compute_headline_stats(ratings), output_dir=out),
+    ]
+
+    assert summary["Ratings Count"].tolist() == [2, 1]
+    names = sorted(os.path.basename(path) for path in paths)
+    assert names == [
+        "AAA_close.png",
+        "AAA_macd.png",
+        "AAA_rsi.png",
+        "AAA_sma.png",
+        "articles_per_publisher.png",
+        "headline_lengths.png",
+        "publication_times.png",
+        "sentiment_distribution.png",
+    ]
+    assert (tmp_path / "ratings_per_stock.png").stat().st_size > 0
+    assert all(os.path.getsize(path) > 0 for path in paths)
+    assert plt.get_fignums() == open_figures
+
+
+def test_sentiment_pie_colors_follow_categories(tmp_path, monkeypatch):
+    import matplotlib.axes
+
+    calls = []
+    pie = matplotlib.axes.Axes.pie
+
+    def record(self, x, **kwargs):
+        calls.append((list(kwargs["labels"]), kwargs["colors"]))
+        return pie(self, x, **kwargs)
+
+    monkeypatch.setattr(matplotlib.axes.Axes, "pie", record)
+    ratings = pd.DataFrame(
+        {"headline": ["Up", "Down", "Up"], "sentiment": [0.5, -0.5, np.nan]}
+    )
+    stats = compute_headline_stats(ratings)
+    analyze_sentiment(ratings, stats=stats, output_dir=str(tmp_path))
+    # No neutral headlines and one unscored one, which is not a category.
+    assert calls == [(["negative", "positive"], ["salmon", "lightgreen"])]
+
+
+def test_stream_topic_modeling_resumes_and_assigns(tmp_path):
+    headlines = [
+        "apple earnings beat estimates",
+        "oil prices fall on supply glut",
+        "apple iphone sales surge",
+        "crude oil output cut by opec",
+    ] * 10
+    chunks = [headlines[i : i + 8] for i in range(0, len(headlines), 8)]
+    model_path = str(tmp_path / "topics.joblib")
+
+    lda, terms = stream_topic_modeling(
+        chunks, n_topics=2, n_features=2**10, workers=2, model_path=model_path
+    )
+    assert lda.components_.shape == (2, 2**10)
+    assert "apple" in terms.values()
+    assert all(len(words) == 10 for words in top_topic_terms(lda, terms))
+
+    resumed, _ = stream_topic_modeling(chunks[:1], model_path=model_path)
+    assert resumed.n_batch_iter_ == lda.n_batch_iter_ + 1
+
+    topics = assign_topics(["apple earnings", "oil supply"], model_path)
+    assert topics.shape == (2,)
+
+
+def test_compute_headline_stats_single_pass_and_chunked():
+    df = pd.DataFrame(
+        {
+            "headline": ["Up big", "Down", "Flat day", "Up big", None],
+            "publisher": ["A", "B", "A", "A", "B"],
+            "stock": ["X", "Y", "X", "Z", "X"],
+            "date": pd.to_datetime(
+                [
+                    "2020-06-01 09:30",  # Monday
+                    "2020-06-01 16:00",
+                    "2020-06-02 09:45",
+                    "2020-06-06 12:00",  # Saturday
+                    "2020-06-07 23:59",
+                ]
+            ),
+            "sentiment": [0.5, -0.2, 0.0, 0.5, np.nan],
+        }
+    )
+    stats = compute_headline_stats(df)
+
+    assert stats.n_rows == 5
+    lengths = df["headline"].str.len().fillna(0).astype(int)
+    assert stats.length_counts.sum() == 5
+    assert all(stats.length_counts[n] == (lengths == n).sum() for n in lengths)
+    assert stats.publisher_counts.to_dict() == {"A": 3, "B": 2}
+    assert stats.symbol_counts.to_dict() == {"X": 3, "Y": 1, "Z": 1}
+    assert stats.hour_counts[9] == 2 and stats.hour_counts[16] == 1
+    assert stats.weekday_counts.tolist() == [2, 1, 0, 0, 0, 1, 1]
+    assert stats.sentiment_counts.to_dict() == {
+        "positive": 2, "neutral": 1, "negative": 1,
+    }
+    assert stats.sentiment_missing == 1
+
+    chunked = compute_headline_stats([df.iloc[:2], df.iloc[2:]])
+    np.testing.assert_array_equal(chunked.length_counts, stats.length_counts)
+    pd.testing.assert_series_equal(chunked.publisher_counts, stats.publisher_counts)
+    pd.testing.assert_series_equal(chunked.sentiment_counts, stats.sentiment_counts)
+    np.testing.assert_array_equal(chunked.weekday_counts, stats.weekday_counts)
+
+    scored = compute_headline_stats(
+        df.drop(columns="sentiment"), score_sentiment=True
+    )
+    assert scored.sentiment_counts.sum() + scored.sentiment_missing == 5
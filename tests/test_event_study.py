@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.event_study import (
+    aggregate_abnormal_returns,
+    compute_abnormal_returns,
+    run_event_study,
+    window_column,
+)
+from src.price_store import build_price_store
+
+
+@pytest.fixture
+def stock_data():
+    """Three tickers driven by a common market factor, one with a gap"""
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range("2020-01-01", periods=260)
+    market = rng.normal(0, 0.01, len(dates))
+    data = {}
+    for ticker, beta in [("AAA", 0.5), ("BBB", 1.0), ("CCC", 1.5)]:
+        returns = beta * market + rng.normal(0, 0.005, len(dates))
+        frame = pd.DataFrame(
+            {"date": dates, "close": 100 * np.exp(np.cumsum(returns))}
+        )
+        data[ticker] = frame.drop(index=150) if ticker == "CCC" else frame
+    return data
+
+
+@pytest.fixture
+def events():
+    rng = np.random.default_rng(8)
+    n = 60
+    return pd.DataFrame(
+        {
+            "date": pd.Timestamp("2020-01-01")
+            + pd.to_timedelta(rng.integers(0, 370 * 24, n), unit="h"),
+            "stock_name": rng.choice(["aaa", "BBB", "CCC", "ZZZ"], n),
+            "publisher": rng.choice(["Benzinga", "Reuters"], n),
+            "Sentiment_Polarity": rng.choice([-0.5, 0.0, 0.4], n),
+        }
+    )
+
+
+def _own_returns(stock_data):
+    """Each ticker's returns over its own bars, indexed by date"""
+    return {
+        t: df.set_index("date")["close"] / df.set_index("date")["close"].shift(1) - 1
+        for t, df in stock_data.items()
+    }
+
+
+def _reference_cars(events, stock_data, window, estimation, min_estimation):
+    """Per-event market-model CAR with an explicit loop and np.polyfit"""
+    own = _own_returns(stock_data)
+    market = pd.concat(own, axis=1).mean(axis=1)
+    cars = []
+    for _, event in events.iterrows():
+        ticker = event["stock_name"].upper()
+        if ticker not in own:
+            cars.append(np.nan)
+            continue
+        returns = own[ticker]
+        t0 = returns.index.searchsorted(event["date"].normalize())
+        if t0 >= len(returns):
+            cars.append(np.nan)
+            continue
+        m_all = market.reindex(returns.index)
+        est = slice(max(t0 + estimation[0], 0), max(t0 + estimation[1] + 1, 0))
+        r, m = returns.iloc[est], m_all.iloc[est]
+        valid = r.notna() & m.notna()
+        if valid.sum() < min_estimation:
+            cars.append(np.nan)
+            continue
+        beta, alpha = np.polyfit(m[valid], r[valid], 1)
+        win = slice(max(t0 + window[0], 0), t0 + window[1] + 1)
+        abnormal = returns.iloc[win] - (alpha + beta * m_all.iloc[win])
+        cars.append(abnormal.sum() if abnormal.notna().any() else np.nan)
+    return np.array(cars)
+
+
+def test_market_model_matches_per_event_loop(events, stock_data):
+    cars = compute_abnormal_returns(
+        events,
+        stock_data,
+        windows=[(-5, 5), (0, 1)],
+        estimation_window=(-60, -6),
+        min_estimation=20,
+    )
+    assert cars.index.equals(events.index)
+    expected = _reference_cars(events, stock_data, (-5, 5), (-60, -6), 20)
+    np.testing.assert_allclose(cars[window_column((-5, 5))], expected, atol=1e-10)
+    # Unknown tickers and events before the estimation history have no CAR.
+    assert cars.loc[events["stock_name"] == "ZZZ", "CAR[-5,+5]"].isna().all()
+    assert cars["CAR[-5,+5]"].notna().sum() > 20
+
+
+def test_mean_and_market_adjusted_models(events, stock_data):
+    mean = compute_abnormal_returns(events, stock_data, windows=[(0, 0)], model="mean")
+    adjusted = compute_abnormal_returns(
+        events, stock_data, windows=[(0, 0)], model="market_adjusted"
+    )
+    wide = pd.concat(
+        {t: df.set_index("date")["close"] for t, df in stock_data.items()}, axis=1
+    )
+    returns = wide / wide.shift(1) - 1
+    event = mean.dropna(subset=["CAR[+0,+0]"]).index[0]
+    ticker = events.loc[event, "stock_name"].upper()
+    t0 = wide.index.get_loc(mean.loc[event, "event_day"])
+    history = returns[ticker].iloc[t0 - 120 : t0 - 10]
+    assert mean.loc[event, "CAR[+0,+0]"] == pytest.approx(
+        returns[ticker].iloc[t0] - history.mean()
+    )
+    assert adjusted.loc[event, "CAR[+0,+0]"] == pytest.approx(
+        returns[ticker].iloc[t0] - returns.iloc[t0].mean()
+    )
+
+
+def test_price_store_gives_same_cars(events, stock_data, tmp_path):
+    store = build_price_store(stock_data, str(tmp_path / "store"))
+    from_dict = compute_abnormal_returns(events, stock_data)
+    from_store = compute_abnormal_returns(events, store)
+    pd.testing.assert_frame_equal(from_dict, from_store)
+
+
+def test_aggregates_by_bucket_publisher_and_ticker(events, stock_data):
+    results = run_event_study(events, stock_data, windows=[(-1, 1)])
+    cars = results["events"]
+    by_bucket = results["sentiment_bucket"]
+    assert set(by_bucket["sentiment_bucket"]) <= {"negative", "neutral", "positive"}
+    assert by_bucket["n"].sum() == cars["CAR[-1,+1]"].notna().sum()
+    positive = cars.loc[cars["sentiment_bucket"] == "positive", "CAR[-1,+1]"].dropna()
+    row = by_bucket.set_index("sentiment_bucket").loc["positive"]
+    assert row["mean_car"] == pytest.approx(positive.mean())
+    assert row["t_stat"] == pytest.approx(
+        positive.mean() / (positive.std() / np.sqrt(len(positive)))
+    )
+    assert set(results["publisher"]["publisher"]) <= {"Benzinga", "Reuters"}
+    assert "ZZZ" not in set(results["stock_name"]["stock_name"])
+    assert aggregate_abnormal_returns(cars, "publisher").equals(results["publisher"])
+
+
+def test_rejects_overlapping_estimation_window(events, stock_data):
+    with pytest.raises(ValueError):
+        compute_abnormal_returns(
+            events, stock_data, windows=[(-5, 5)], estimation_window=(-30, -3)
+        )
+    with pytest.raises(ValueError):
+        compute_abnormal_returns(events, stock_data, model="fama_french")
+
+
+def test_gapped_ticker_windows_count_its_own_sessions(stock_data):
+    stock_data = dict(stock_data)
+    gapped = stock_data["CCC"]
+    stock_data["CCC"] = gapped.drop(index=range(100, 110))
+    own = _own_returns(stock_data)["CCC"]
+    # Published during the gap: day 0 is the first bar after it.
+    events = pd.DataFrame(
+        {"date": [gapped["date"][105] + pd.Timedelta(hours=10)], "stock_name": ["CCC"]}
+    )
+    cars = compute_abnormal_returns(
+        events, stock_data, windows=[(0, 0), (-3, 3)], model="mean"
+    )
+    t0 = own.index.get_loc(gapped["date"][110])
+    assert cars["event_day"].iloc[0] == gapped["date"][110]
+    history = own.iloc[max(t0 - 120, 0) : t0 - 10]
+    # The return across the gap is kept, and the windows span CCC's sessions.
+    assert cars["CAR[+0,+0]"].iloc[0] == pytest.approx(
+        own.iloc[t0] - history.mean()
+    )
+    assert cars["CAR[-3,+3]"].iloc[0] == pytest.approx(
+        (own.iloc[t0 - 3 : t0 + 4] - history.mean()).sum()
+    )
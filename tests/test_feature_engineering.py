@@ -1,8 +1,12 @@
 import pytest
 from src.feature_engineering import (
+    INDICATOR_COLUMNS,
     add_technical_indicators,
+    load_indicator_state,
 )
+import numpy as np
 import pandas as pd
+import talib
 
 
 @pytest.fixture
@@ -26,3 +30,56 @@ def test_add_sma(sample_stock_data):
     # Check if SMA columns are numeric
     assert df["SMA_20"].dtype == float, "SMA_20 column should be float"
     assert df["SMA_50"].dtype == float, "SMA_50 column should be float"
+
+
+@pytest.fixture
+def long_stock_data():
+    """Fixture to return 120 business days of random-walk closes"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "date": pd.date_range(start="2020-01-01", periods=120, freq="B"),
+            "close": 100 + np.cumsum(rng.normal(0, 1, 120)),
+        }
+    )
+
+
+def test_incremental_indicators_match_full_recompute(long_stock_data, tmp_path):
+    full = add_technical_indicators(
+        {"AAA": long_stock_data.copy()}, state_path=str(tmp_path / "full.json")
+    )["AAA"]
+
+    state_path = str(tmp_path / "incremental.json")
+    first = add_technical_indicators(
+        {"AAA": long_stock_data.iloc[:100].copy()}, state_path=state_path
+    )["AAA"]
+    appended = pd.concat([first, long_stock_data.iloc[100:]])
+    incremental = add_technical_indicators(
+        {"AAA": appended}, state_path=state_path
+    )["AAA"]
+
+    pd.testing.assert_frame_equal(full, incremental, check_exact=True)
+
+    # The incremental mode agrees with the TA-Lib path, warm-up NaNs included.
+    expected = add_technical_indicators({"AAA": long_stock_data.copy()})["AAA"]
+    pd.testing.assert_frame_equal(
+        full[INDICATOR_COLUMNS], expected[INDICATOR_COLUMNS], check_exact=False
+    )
+    close = long_stock_data["close"].to_numpy()
+    macd, _, _ = talib.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
+    assert full["MACD"].isna().sum() == np.isnan(macd).sum() == 33
+
+
+def test_incremental_indicators_skip_failing_tickers(long_stock_data, tmp_path):
+    state_path = str(tmp_path / "state.json")
+    add_technical_indicators({"AAA": long_stock_data.copy()}, state_path=state_path)
+    saved = load_indicator_state(state_path)["AAA"]
+
+    broken = long_stock_data.assign(close="n/a")
+    result = add_technical_indicators(
+        {"AAA": broken, "BBB": long_stock_data.copy()}, state_path=state_path
+    )
+    assert result["AAA"] is broken
+    states = load_indicator_state(state_path)
+    assert states["AAA"] == saved
+    assert "BBB" in states
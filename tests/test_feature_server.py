@@ -0,0 +1,188 @@
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from src.feature_server import (
+    FeatureService,
+    LRUCache,
+    create_feature_server,
+    decode_frame,
+    encode_frame,
+    fetch_features,
+)
+from src.price_store import build_price_store
+from src.sentiment_rollup import SentimentRollup
+
+
+@pytest.fixture
+def service(tmp_path):
+    rng = np.random.default_rng(25)
+    dates = pd.bdate_range("2021-01-01", periods=60)
+    stock_data = {}
+    for ticker in ("AAA", "BBB"):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        stock_data[ticker] = pd.DataFrame(
+            {
+                "date": dates,
+                "close": close,
+                "Daily_Returns": pd.Series(close).pct_change(),
+            }
+        )
+    store = build_price_store(stock_data, str(tmp_path / "store"))
+    n = 400
+    scored = pd.DataFrame(
+        {
+            "date": dates.to_numpy()[rng.integers(0, len(dates), n)]
+            + pd.to_timedelta(rng.integers(9, 15, n), unit="h"),
+            "headline": [f"headline {i}" for i in range(n)],
+            "publisher": rng.choice(["p1", "p2"], n),
+            "stock": rng.choice(["AAA", "bbb"], n),
+            "Sentiment_Polarity": rng.normal(0, 0.3, n),
+        }
+    )
+    rollup = SentimentRollup.build(scored)
+    return FeatureService(store, rollup), stock_data, rollup
+
+
+@pytest.fixture
+def server(service):
+    server = create_feature_server(service[0], port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _frame(n):
+    return pd.DataFrame({"x": np.arange(n, dtype=np.float64)})
+
+
+def test_lru_cache_evicts_least_recently_used_by_size():
+    size = int(_frame(100).memory_usage(deep=True).sum())
+    cache = LRUCache(max_bytes=2 * size)
+    cache.put("a", _frame(100))
+    cache.put("b", _frame(100))
+    assert cache.get("a") is not None
+    cache.put("c", _frame(100))
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    cache.put("huge", _frame(1000))
+    assert "huge" not in cache
+
+    stats_ = cache.stats()
+    assert stats_["evictions"] == 1
+    assert (stats_["hits"], stats_["misses"]) == (1, 1)
+    assert stats_["bytes"] == 2 * size <= stats_["max_bytes"]
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "json"])
+def test_encode_decode_round_trip(fmt):
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2021-01-01", periods=3),
+            "close": [1.0, np.nan, 3.5],
+            "count": [1, 2, 3],
+        }
+    )
+    content_type, body = encode_frame(df, fmt)
+    decoded = decode_frame(body, content_type)
+    pd.testing.assert_frame_equal(decoded, df, check_dtype=False)
+    with pytest.raises(ValueError):
+        encode_frame(df, "xml")
+
+
+def test_features_match_artifacts_and_are_cached(service):
+    service, stock_data, rollup = service
+    indicators = service.features("indicators", "aaa", "2021-02-01", "2021-02-28")
+    expected = stock_data["AAA"]
+    expected = expected[expected["date"].between("2021-02-01", "2021-02-28")]
+    np.testing.assert_allclose(indicators["close"], expected["close"])
+    cached = service.features("indicators", "AAA", "2021-02-01", "2021-02-28")
+    assert cached is indicators
+
+    daily = rollup.daily("ticker")
+    daily = daily[daily["ticker"] == "BBB"]
+    sentiment = service.features("sentiment", "BBB")
+    np.testing.assert_allclose(sentiment["mean"], daily["mean"])
+
+    correlation = service.features("correlation", "BBB")
+    returns = stock_data["BBB"].set_index("date")["Daily_Returns"]
+    paired = pd.DataFrame(
+        {
+            "s": daily["mean"].to_numpy(),
+            "r": returns.reindex(daily["trading_date"]).to_numpy(),
+        }
+    ).dropna()
+    r, p = stats.pearsonr(paired["s"], paired["r"])
+    assert correlation["n"].iloc[0] == len(paired)
+    assert correlation["correlation"].iloc[0] == pytest.approx(r)
+    assert correlation["p_value"].iloc[0] == pytest.approx(p)
+
+    with pytest.raises(KeyError):
+        service.features("indicators", "ZZZ")
+    with pytest.raises(ValueError):
+        service.features("volume", "AAA")
+
+
+def test_prewarm_fills_cache_and_skips_unknown_tickers(service):
+    service = service[0]
+    assert service.prewarm(["AAA", "ZZZ"]) == 1
+    assert ("sentiment", "AAA", None, None) in service.cache
+    assert len(service.cache) == 3
+
+
+def test_http_serves_features_errors_and_metrics(service, server):
+    service, stock_data, _ = service
+    for fmt in ("arrow", "json"):
+        df = fetch_features(server, "indicators", "AAA", end="2021-01-29", fmt=fmt)
+        assert df["date"].max() == pd.Timestamp("2021-01-29")
+        np.testing.assert_allclose(df["close"], stock_data["AAA"]["close"][: len(df)])
+
+    with urllib.request.urlopen(f"{server}/tickers") as response:
+        assert json.loads(response.read()) == ["AAA", "BBB"]
+    for path, status in [
+        ("/indicators/ZZZ", 404),
+        ("/nothing", 404),
+        ("/indicators/AAA?format=xml", 400),
+        ("/sentiment/AAA?start=not-a-date", 400),
+    ]:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{server}{path}")
+        assert error.value.code == status
+
+    with urllib.request.urlopen(f"{server}/metrics") as response:
+        metrics = json.loads(response.read())
+    assert metrics["latency"]["indicators"]["requests"] == 4
+    latency = metrics["latency"]["indicators"]
+    assert 0 < latency["p50_ms"] <= latency["p99_ms"]
+    assert metrics["cache"]["hits"] >= 1
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets only")
+def test_unix_socket_server(service, tmp_path):
+    import http.client
+
+    path = str(tmp_path / "features.sock")
+    server = create_feature_server(service[0], unix_socket=path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection("localhost")
+        connection.sock = socket.socket(socket.AF_UNIX)
+        connection.sock.connect(path)
+        connection.request("GET", "/sentiment/AAA?format=arrow")
+        response = connection.getresponse()
+        df = decode_frame(response.read(), response.getheader("Content-Type"))
+        assert response.status == 200
+        pd.testing.assert_frame_equal(
+            df, service[0].features("sentiment", "AAA").reset_index(drop=True)
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic_data import generate_analyst_ratings, ticker_symbols
+from src.data_loader import (
+    HeadlineIndex,
+    load_analyst_ratings,
+    query_headlines,
+)
+
+
+def _scan(df, symbols, start, end, publishers=None):
+    mask = df["stock"].str.upper().isin([s.upper() for s in symbols])
+    mask &= (df["date"] >= start) & (df["date"] < pd.Timestamp(end) + pd.Timedelta(days=1))
+    if publishers is not None:
+        mask &= df["publisher"].isin(publishers)
+    return df[mask].sort_values("date", kind="stable")
+
+
+def test_query_matches_boolean_scan(tmp_path):
+    path = str(tmp_path / "ratings.csv")
+    generate_analyst_ratings(path, 2000, ticker_symbols(8), 60, seed=11)
+    ratings, index = load_analyst_ratings(path, with_index=True)
+    assert (tmp_path / "ratings.csv.index.npz").exists()
+
+    for symbols, start, end, publishers in [
+        (["aab"], "2015-01-05", "2015-01-20", None),
+        (["AAA", "AAC"], "2015-02-01", "2015-02-01", None),
+        (["AAD"], "2015-01-01", "2015-03-31", ["Reuters", "Zacks"]),
+        (["ZZZ"], "2015-01-01", "2015-03-31", None),
+    ]:
+        result = query_headlines(ratings, index, symbols, start, end, publishers)
+        expected = _scan(ratings, symbols, start, end, publishers)
+        assert sorted(result.index) == sorted(expected.index)
+        assert result["date"].is_monotonic_increasing
+
+    reuters = query_headlines(ratings, index, publishers="Reuters")
+    assert len(reuters) == (ratings["publisher"] == "Reuters").sum()
+    assert index.counts().sum() == len(ratings)
+
+
+def test_index_is_persisted_and_rebuilt_when_stale(tmp_path):
+    path = str(tmp_path / "ratings.csv")
+    generate_analyst_ratings(path, 300, ticker_symbols(3), 20, seed=1)
+    _, index = load_analyst_ratings(path, with_index=True)
+    saved = HeadlineIndex.load(path + ".index.npz")
+    np.testing.assert_array_equal(
+        saved.lookup("AAA", start="2015-01-02"), index.lookup("AAA", start="2015-01-02")
+    )
+
+    generate_analyst_ratings(path, 500, ticker_symbols(3), 20, seed=2)
+    ratings, rebuilt = load_analyst_ratings(path, with_index=True)
+    assert rebuilt.n_rows == len(ratings) == 500
@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+import pandas as pd
+import talib
+from src.feature_engineering import INDICATOR_COLUMNS, add_technical_indicators
+from src.indicator_engine import (
+    add_technical_indicators_panel,
+    build_panel,
+)
+
+
+@pytest.fixture
+def multi_stock_data():
+    """Fixture to return three tickers listed on different dates"""
+    rng = np.random.default_rng(1)
+    dates = pd.date_range(start="2020-01-01", periods=150, freq="B")
+    data = {}
+    for ticker, start in [("AAA", 0), ("BBB", 30), ("CCC", 90)]:
+        n = len(dates) - start
+        data[ticker] = pd.DataFrame(
+            {
+                "date": dates[start:][::-1],
+                "close": (50 + np.cumsum(rng.normal(0, 1, n)))[::-1],
+            }
+        )
+    return data
+
+
+def test_build_panel_aligns_tickers(multi_stock_data):
+    dates, tickers, panel = build_panel(multi_stock_data)
+
+    assert tickers == ["AAA", "BBB", "CCC"]
+    assert panel.shape == (150, 3)
+    assert np.isnan(panel[:90, 2]).all() and not np.isnan(panel[90:, 2]).any()
+
+
+def test_panel_engine_matches_per_ticker_indicators(multi_stock_data):
+    panel_result = add_technical_indicators_panel(
+        {k: v.copy() for k, v in multi_stock_data.items()}
+    )
+    expected = add_technical_indicators(
+        {k: v.copy() for k, v in multi_stock_data.items()}
+    )
+
+    assert list(panel_result) == list(expected)
+    for ticker in expected:
+        got = panel_result[ticker][INDICATOR_COLUMNS].to_numpy()
+        want = expected[ticker][INDICATOR_COLUMNS].to_numpy()
+        assert np.allclose(got, want, equal_nan=True)
+
+
+def test_panel_engine_skips_missing_bars_like_talib(multi_stock_data):
+    # Drop bars of AAA inside its history; BBB and CCC still trade on those
+    # dates, so AAA has NaN rows in the middle of its panel column.
+    aaa = multi_stock_data["AAA"].sort_values("date").reset_index(drop=True)
+    gapped = dict(multi_stock_data, AAA=aaa.drop(index=[40, 41, 42, 100]))
+    result = add_technical_indicators_panel(gapped)["AAA"]
+
+    close = result["close"].to_numpy(dtype=float)
+    macd, signal, hist = talib.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
+    expected = {
+        "SMA_20": talib.SMA(close, timeperiod=20),
+        "SMA_50": talib.SMA(close, timeperiod=50),
+        "RSI": talib.RSI(close, timeperiod=14),
+        "MACD": macd,
+        "Signal": signal,
+        "Hist": hist,
+        "Daily_Returns": pd.Series(close).pct_change().to_numpy(),
+    }
+    for column, want in expected.items():
+        np.testing.assert_allclose(
+            result[column].to_numpy(), want, equal_nan=True, err_msg=column
+        )
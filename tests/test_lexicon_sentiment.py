@@ -0,0 +1,142 @@
+import pytest
+import numpy as np
+import pandas as pd
+from textblob import TextBlob
+from src.lexicon_sentiment import POLARITY_TOLERANCE, compile_lexicon, score_polarity
+from src.sentimental_analysis import add_sentiment_analysis
+
+
+@pytest.fixture
+def headline_sample():
+    """Fixture to return a sample of financial news headlines"""
+    return [
+        'Stocks That Hit 52-Week Highs On Friday',
+        'Apple shares are trading higher after strong iPhone sales!',
+        'Tesla stock falls sharply as deliveries disappoint',
+        'Analyst says Netflix is not a good buy right now',
+        'Microsoft reports record quarterly revenue, beats estimates',
+        "Amazon's new warehouse plan draws criticism",
+        'Goldman Sachs downgrades Nvidia to Neutral',
+        'Why Is Boeing Stock Trading Lower Today?',
+        'Very bad week for airline stocks',
+        'Meta posts surprisingly good earnings!!',
+        'Market not very happy with Fed decision',
+        'Google faces new antitrust lawsuit',
+        'Investors are never satisfied with guidance',
+        'Best performing tech stocks of the year',
+        'Worst day for the Dow since March',
+        'Intel announces layoffs amid weak demand',
+        'AMD unveils new chips, shares jump 5%',
+        "Benzinga's Top Upgrades, Downgrades For June 5, 2020",
+        'Earnings Scheduled For May 22, 2020',
+        'This is an extremely important update for shareholders',
+        'Company posts huge loss; CEO resigns',
+        "Barron's Picks And Pans: Apple, Tesla, Disney And More",
+        "Stocks Moving In Friday's Pre-Market Session",
+        'Oil prices rise on hopes of demand recovery',
+        'Bank earnings were really not that great',
+        'A simply awful quarter for retailers',
+        'Strong buy rating reiterated at Morgan Stanley',
+        'Shares of XYZ are lower after the company reported a smaller-than-expected profit',
+        'Positive outlook lifts small caps',
+        'Negative sentiment weighs on emerging markets',
+        "Uber doesn't expect profitability this year",
+        "It isn't a great time to buy bonds",
+        'New high for gold as dollar weakens',
+        'Crypto crash wipes out billions',
+        'Fantastic results from the pharma giant',
+        'Mixed signals from the jobs report',
+        'Housing market remains hot despite rising rates',
+        'Analysts cut price target on Ford',
+        'Walmart beats expectations; raises full-year outlook',
+        'Stock market is up today!',
+        'A major crash is predicted next week.',
+        'Stocks are steady, no big changes.',
+        'Earnings really not good',
+        'Outlook simply not bad for chipmakers',
+        'Guidance is really not very good',
+        'Margins truly never great!',
+        'Not really a good quarter',
+        'Absolutely not happy with U.S. regulators',
+        'Great quarter for Apple :)',
+        'Another record loss (!) for the airline',
+        'Top 8) picks: very strong buys',
+    ]
+
+
+def test_score_polarity_matches_textblob(headline_sample):
+    expected = np.array([TextBlob(h).sentiment.polarity for h in headline_sample])
+    scores = score_polarity(headline_sample)
+
+    assert scores.shape == expected.shape
+    assert np.abs(scores - expected).max() <= POLARITY_TOLERANCE
+
+
+def test_score_polarity_matches_textblob_on_fuzzed_headlines():
+    rng = np.random.default_rng(5)
+    lexicon = compile_lexicon()
+    words = [w for w in lexicon["index"] if " " not in w]
+    adverbs = [w for w, m in zip(words, lexicon["modifier"]) if m]
+    extra = [
+        "not",
+        "no",
+        "never",
+        "a",
+        "is",
+        "U.S.",
+        "isn't",
+        "Apple's",
+        "5%",
+        "...",
+        "(",
+        ")",
+        '"',
+        "!",
+        "?",
+        ",",
+        ":",
+        ";",
+        "8",
+        "-",
+        "(!)",
+        "<3",
+    ]
+    pools = [words, adverbs, extra]
+    headlines = []
+    for _ in range(2000):
+        tokens = [rng.choice(pools[k]) for k in rng.choice(3, rng.integers(1, 10))]
+        tokens = [t.capitalize() if rng.random() < 0.15 else t for t in tokens]
+        headlines.append(" ".join(tokens) + rng.choice(["", "!", ".", "!!", " :("]))
+
+    expected = np.array([TextBlob(h).sentiment.polarity for h in headlines])
+    assert np.abs(score_polarity(headlines) - expected).max() <= POLARITY_TOLERANCE
+
+
+@pytest.mark.parametrize(
+    "headline",
+    [
+        "> :o) XD *, :-. c",
+        ":P ! : >:[ =-D ](!",
+        ";-] : >;] ,;°",
+        "}xs> :o) o, { D",
+    ],
+)
+def test_score_polarity_matches_textblob_on_punctuation_and_emoticons(headline):
+    expected = TextBlob(headline).sentiment.polarity
+    assert abs(score_polarity([headline])[0] - expected) <= POLARITY_TOLERANCE
+
+
+def test_score_polarity_without_known_words():
+    assert score_polarity(["Stocks rally"]).tolist() == [0.0]
+    assert score_polarity(["Stocks rally", "good"]).tolist() == [0.0, 0.7]
+
+
+def test_add_sentiment_analysis_lexicon_backend(headline_sample):
+    df = pd.DataFrame({"headline": headline_sample + [""]})
+    df = add_sentiment_analysis(df, backend="lexicon")
+
+    assert df["Sentiment_Polarity"].dtype == float
+    assert df["Sentiment_Polarity"].iloc[-1] == 0.0
+
+    with pytest.raises(ValueError):
+        add_sentiment_analysis(df, backend="vader")
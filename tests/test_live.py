@@ -0,0 +1,256 @@
+import asyncio
+import json
+import logging
+import socket
+import numpy as np
+import pandas as pd
+import pytest
+from src.correlation_analysis import calculate_correlation_matrix
+from src.feature_engineering import INDICATOR_COLUMNS, add_technical_indicators
+from src.live import (
+    LiveEngine,
+    parse_event,
+    read_drop_file,
+    run_live,
+    serve_json_lines,
+)
+from src.sentimental_analysis import score_headlines
+
+WORDS = ["great", "terrible", "good", "bad", "strong", "weak", "record", "loss"]
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(21)
+    dates = pd.bdate_range("2020-01-01", periods=70)
+    return {
+        ticker: pd.DataFrame(
+            {
+                "date": dates,
+                "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))),
+            }
+        )
+        for ticker in ("AAA", "BBB")
+    }
+
+
+@pytest.fixture
+def headlines(bars):
+    rng = np.random.default_rng(22)
+    n = 300
+    return pd.DataFrame(
+        {
+            "date": bars["AAA"]["date"].to_numpy()[rng.integers(0, 70, n)]
+            + pd.to_timedelta(rng.integers(9, 16, n), unit="h"),
+            "headline": [" ".join(rng.choice(WORDS, 3)) + " quarter" for _ in range(n)],
+            "stock": rng.choice(["AAA", "bbb"], n),
+        }
+    )
+
+
+def _events(bars, headlines):
+    events = [
+        {"kind": "bar", "ticker": t, "date": d, "close": c, "received": 0.0}
+        for t, df in bars.items()
+        for d, c in zip(df["date"], df["close"])
+    ]
+    events += [
+        {"kind": "headline", "ticker": s.upper(), "date": d, "text": h, "received": 0.0}
+        for d, h, s in zip(headlines["date"], headlines["headline"], headlines["stock"])
+    ]
+    return events
+
+
+def test_engine_matches_batch_indicators_and_correlations(bars, headlines):
+    async def feed():
+        engine = LiveEngine(workers=0, batch_size=50)
+        events = _events(bars, headlines)
+        bar_events = [event for event in events if event["kind"] == "bar"]
+        headline_events = [event for event in events if event["kind"] == "headline"]
+        # Bars arrive in order, headlines out of order before and after them.
+        mixed = headline_events[::-2] + bar_events + headline_events[-2::-2]
+        for start in range(0, len(mixed), 37):
+            await engine.process(mixed[start : start + 37])
+        return engine
+
+    engine = asyncio.run(feed())
+    batch = add_technical_indicators({t: df.copy() for t, df in bars.items()})
+    for ticker in bars:
+        expected = batch[ticker].iloc[-1]
+        latest = engine.latest[ticker]
+        for col in INDICATOR_COLUMNS:
+            assert latest[col] == pytest.approx(expected[col])
+
+    scored = headlines.assign(
+        Sentiment_Polarity=score_headlines(headlines["headline"], backend="lexicon"),
+        stock_name=headlines["stock"].str.upper(),
+    )
+    matrix = calculate_correlation_matrix(
+        scored, stock_data={t: batch[t] for t in bars}
+    )
+    running = engine.correlations().set_index("ticker")
+    for _, row in matrix.iterrows():
+        assert running.loc[row["ticker"], "n"] == row["n"]
+        assert running.loc[row["ticker"], "correlation"] == pytest.approx(
+            row["correlation"]
+        )
+    assert engine.counts["stale_bar"] == 0
+
+
+def test_stale_bars_are_skipped(bars):
+    async def feed():
+        engine = LiveEngine(workers=0)
+        empty = pd.DataFrame(columns=["date", "headline", "stock"])
+        events = _events({"AAA": bars["AAA"]}, empty)
+        await engine.process(events[40:])
+        await engine.process(events[:45])
+        return engine
+
+    engine = asyncio.run(feed())
+    assert engine.counts["stale_bar"] == 45
+    assert engine.latest["AAA"]["date"] == bars["AAA"]["date"].iloc[-1]
+
+
+def test_bounded_queue_applies_backpressure():
+    async def fill():
+        engine = LiveEngine(workers=0, queue_size=2)
+        await engine.put({"kind": "bar"})
+        await engine.put({"kind": "bar"})
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(engine.put({"kind": "bar"}), timeout=0.05)
+        return engine.queue.qsize()
+
+    assert asyncio.run(fill()) == 2
+
+
+def test_parse_event():
+    record = {
+        "type": "headline",
+        "date": "2020-01-02 10:00:00-04:00",
+        "symbol": "aapl",
+        "headline": "Apple beats",
+    }
+    event = parse_event(record, 1.0)
+    assert event["ticker"] == "AAPL"
+    assert event["date"] == pd.Timestamp("2020-01-02 10:00")
+    with pytest.raises(ValueError):
+        parse_event({"type": "bar", "date": "2020-01-02"}, 1.0)
+    with pytest.raises(ValueError):
+        parse_event({"type": "quote"}, 1.0)
+    for close in ("nan", "inf", float("-inf"), None):
+        with pytest.raises(ValueError):
+            parse_event(
+                {"type": "bar", "ticker": "A", "date": "2020-01-02", "close": close}, 1.0
+            )
+
+
+def test_read_drop_file_rejects_non_finite_closes(tmp_path):
+    path = tmp_path / "AAA_bars.csv"
+    path.write_text("date,close\n2020-01-02,1.5\n2020-01-03,\n2020-01-06,inf\n")
+    with pytest.raises(ValueError):
+        read_drop_file(str(path), "bar", 1.0)
+    path.write_text("date,close\n2020-01-02,1.5\n2020-01-03,\n")
+    events = read_drop_file(str(path), "bar", 1.0)
+    assert [(e["ticker"], e["close"]) for e in events] == [("AAA", 1.5)]
+
+
+def test_read_drop_file_accepts_yfinance_layout(tmp_path):
+    path = tmp_path / "AAPL_historical_data.csv"
+    path.write_text(
+        "Date,Open,High,Low,Close,Adj Close,Volume\n"
+        "2020-01-02,1.0,2.0,0.5,1.5,1.4,100\n"
+        "2020-01-03,1.5,2.5,1.0,2.0,1.9,200\n"
+    )
+    events = read_drop_file(str(path), "bar", 1.0)
+    assert [(e["ticker"], e["date"], e["close"]) for e in events] == [
+        ("AAPL", pd.Timestamp("2020-01-02"), 1.5),
+        ("AAPL", pd.Timestamp("2020-01-03"), 2.0),
+    ]
+
+
+def test_run_live_from_drop_directory_and_tail_file(bars, headlines, tmp_path):
+    drop = tmp_path / "live"
+    (drop / "bars").mkdir(parents=True)
+    (drop / "headlines").mkdir()
+    bars["AAA"].to_csv(drop / "bars" / "AAA_historical_data.csv", index=False)
+    headlines.to_csv(drop / "headlines" / "batch.csv", index=False)
+    (drop / "headlines" / ".partial.csv").write_text("not,a,valid,file\n")
+    tail = tmp_path / "events.jsonl"
+    with open(tail, "w") as f:
+        for date, close in zip(bars["BBB"]["date"], bars["BBB"]["close"]):
+            record = {"type": "bar", "ticker": "BBB", "date": str(date), "close": close}
+            f.write(json.dumps(record) + "\n")
+    state_path = str(tmp_path / "state.json")
+
+    engine, report = asyncio.run(
+        run_live(
+            drop_dir=str(drop),
+            tail=str(tail),
+            duration=1.0,
+            state_path=state_path,
+            workers=1,
+            batch_size=64,
+            report_interval=0.2,
+        )
+    )
+    assert report["headline"] == len(headlines)
+    assert report["bar"] == 2 * len(bars["AAA"])
+    assert report["queue_depth"] == 0
+    assert report["latency_p99_ms"] >= report["latency_p50_ms"] > 0
+    assert set(engine.correlations()["ticker"]) == {"AAA", "BBB"}
+    with open(state_path) as f:
+        assert set(json.load(f)) == {"AAA", "BBB"}
+
+
+def test_socket_source_queues_json_lines():
+    async def exchange():
+        engine = LiveEngine(workers=0)
+        server = await serve_json_lines(engine, port=0)
+        port = server.sockets[0].getsockname()[1]
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        for record in [
+            {"type": "bar", "ticker": "aaa", "date": "2020-01-02", "close": 1},
+            {"type": "nonsense"},
+            {"type": "headline", "date": "2020-01-02", "stock": "AAA", "headline": "good"},
+        ]:
+            writer.write((json.dumps(record) + "\n").encode("utf-8"))
+        await writer.drain()
+        writer.close()
+        while engine.queue.qsize() < 2:
+            await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        return [engine.queue.get_nowait()["kind"] for _ in range(engine.queue.qsize())]
+
+    assert asyncio.run(exchange()) == ["bar", "headline"]
+
+
+def test_run_live_port_closes_open_connections_on_shutdown(caplog):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    async def scenario():
+        live = asyncio.create_task(
+            run_live(port=port, duration=1.0, workers=0, report_interval=10.0)
+        )
+        for _ in range(100):
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                break
+            except OSError:
+                await asyncio.sleep(0.02)
+        record = {"type": "bar", "ticker": "aaa", "date": "2020-01-02", "close": 1}
+        writer.write((json.dumps(record) + "\n").encode("utf-8"))
+        await writer.drain()
+        # The client keeps its connection open until the server closes it.
+        _, report = await live
+        closed = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        return report, closed
+
+    with caplog.at_level(logging.ERROR):
+        report, closed = asyncio.run(scenario())
+    assert report["bar"] == 1
+    assert closed == b""
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing import merge_stock_and_ratings, merge_stock_and_rollup
+from src.near_duplicates import (
+    assign_headline_clusters,
+    cluster_near_duplicates,
+    collapse_near_duplicates,
+    minhash_signatures,
+)
+from src.sentiment_rollup import SentimentRollup
+from src.sentimental_analysis import add_sentiment_analysis
+
+
+@pytest.fixture
+def ratings():
+    """Two syndicated stories with wording edits, plus unrelated headlines"""
+    headlines = [
+        "Apple shares rise after strong quarterly earnings report",
+        "Apple Shares Rise After Strong Quarterly Earnings Report!",
+        "Apple shares rise after a strong quarterly earnings report",
+        "Tesla recalls 10,000 vehicles over faulty brake sensors",
+        "UPDATE: Tesla recalls 10,000 vehicles over faulty brake sensors",
+        "Oil prices slip as inventories build",
+        "Fed holds rates steady, signals patience",
+    ]
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(
+                [
+                    "2020-01-02 09:00",
+                    "2020-01-02 10:00",
+                    "2020-01-03 09:00",
+                    "2020-01-02 11:00",
+                    "2020-01-02 12:00",
+                    "2020-01-02 13:00",
+                    "2020-01-02 14:00",
+                ]
+            ),
+            "headline": headlines,
+            "publisher": ["A", "B", "C", "A", "B", "A", "C"],
+            "stock": ["AAPL", "aapl", "AAPL", "TSLA", "TSLA", "XOM", "SPY"],
+        }
+    )
+
+
+def test_signatures_estimate_jaccard_similarity():
+    signatures = minhash_signatures(
+        ["the quick brown fox jumps", "The quick, brown fox jumps!", "lorem ipsum"],
+        num_perm=128,
+    )
+    assert signatures.shape == (3, 128) and signatures.dtype == np.uint32
+    assert (signatures[0] == signatures[1]).all()
+    assert (signatures[0] == signatures[2]).mean() < 0.2
+    # Signatures are deterministic across calls for the same seed.
+    assert (minhash_signatures(["lorem ipsum"], num_perm=128) == signatures[2]).all()
+
+
+def test_clusters_group_near_duplicates(ratings):
+    clusters = cluster_near_duplicates(ratings["headline"])
+    assert clusters.tolist() == [0, 0, 0, 1, 1, 2, 3]
+    assert cluster_near_duplicates([]).size == 0
+    with pytest.raises(ValueError):
+        cluster_near_duplicates(ratings["headline"], num_perm=64, bands=10)
+
+
+def test_clustering_scales_to_many_headlines():
+    rng = np.random.default_rng(0)
+    words = np.array([f"word{i}" for i in range(5000)])
+    stories = [" ".join(rng.choice(words, 12)) for _ in range(2000)]
+    copies = stories + [story + " - wire" for story in stories]
+    clusters = cluster_near_duplicates(copies)
+    assert (clusters[:2000] == clusters[2000:]).mean() > 0.99
+    assert len(np.unique(clusters)) < 2050
+
+
+def test_sentiment_scores_one_representative_per_cluster(ratings):
+    clustered = assign_headline_clusters(ratings)
+    scored = add_sentiment_analysis(
+        clustered.copy(), backend="lexicon", cluster_column="cluster_id"
+    )
+    full = add_sentiment_analysis(ratings.copy(), backend="lexicon")
+    first = scored.groupby("cluster_id")["Sentiment_Polarity"].transform("first")
+    assert (scored["Sentiment_Polarity"] == first).all()
+    representatives = ~clustered["cluster_id"].duplicated()
+    np.testing.assert_allclose(
+        scored.loc[representatives, "Sentiment_Polarity"],
+        full.loc[representatives, "Sentiment_Polarity"],
+    )
+
+
+def test_collapse_per_ticker_day_and_cluster(ratings):
+    clustered = assign_headline_clusters(ratings)
+    collapsed = collapse_near_duplicates(clustered)
+    # The Jan 3 Apple copy is on another day, so it is kept.
+    assert collapsed.index.tolist() == [0, 2, 3, 5, 6]
+    assert collapsed["duplicates"].tolist() == [2, 1, 2, 1, 1]
+
+    stock_data = {
+        ticker: pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2020-01-02", "2020-01-03"]),
+                "close": [1.0, 2.0],
+            }
+        )
+        for ticker in ("AAPL", "TSLA")
+    }
+    merged = merge_stock_and_ratings(stock_data, clustered, collapse_duplicates=True)
+    assert len(merged) == 3
+    assert merged["duplicates"].sum() == 5
+    # The rollup fed the collapsed ratings counts the headlines the merge keeps.
+    rollup = SentimentRollup.build(
+        collapse_near_duplicates(clustered.assign(Sentiment_Polarity=0.5))
+    )
+    daily = merge_stock_and_rollup(stock_data, rollup)
+    assert daily["Headline_Count"].sum() == len(merged)
+    with pytest.raises(ValueError):
+        merge_stock_and_ratings(stock_data, ratings, collapse_duplicates=True)
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import pandas as pd
+from src.output_writer import write_partitioned_parquet
+
+
+def _merged():
+    rng = np.random.default_rng(0)
+    frames = []
+    for ticker in ["AAA", "BBB"]:
+        dates = pd.bdate_range("2019-12-20", periods=20)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": dates,
+                    "close": rng.normal(100, 1, len(dates)),
+                    "headline": [f"{ticker} news {i}" for i in range(len(dates))],
+                    "stock_name": ticker,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_partitioned_writer_round_trip_and_incremental(tmp_path):
+    output_dir = str(tmp_path / "merged")
+    merged = _merged()
+
+    assert write_partitioned_parquet(merged, output_dir) == {
+        "written": 4, "unchanged": 0, "removed": 0,
+    }
+    assert os.path.exists(os.path.join(output_dir, "stock_name=AAA", "year=2020", "part.parquet"))
+    back = pd.read_parquet(output_dir).sort_values(["stock_name", "date"])
+    pd.testing.assert_frame_equal(
+        back[merged.columns].astype({"stock_name": str}).reset_index(drop=True),
+        merged,
+        check_dtype=False,
+    )
+
+    assert write_partitioned_parquet(merged, output_dir)["written"] == 0
+
+    changed = merged.copy()
+    changed.loc[changed.index[-1], "close"] += 1.0  # BBB, 2020
+    stats = write_partitioned_parquet(changed[changed["stock_name"] == "BBB"], output_dir)
+    assert stats == {"written": 1, "unchanged": 1, "removed": 2}
+    assert sorted(os.listdir(output_dir)) == ["_manifest.json", "stock_name=BBB"]
@@ -0,0 +1,107 @@
+import importlib
+import os
+import pytest
+import pandas as pd
+from src.pipeline import Stage, run_pipeline, select_stages, stage_fingerprint
+
+
+@pytest.fixture
+def calls():
+    """Fixture recording which stage functions actually ran"""
+    return []
+
+
+def _stages(calls, scale=1, fail=False):
+    def load():
+        calls.append("load")
+        return pd.DataFrame({"x": [1.0, 2.0, 3.0]})
+
+    def double(df):
+        calls.append("double")
+        return {"a": df * 2}
+
+    def total(df, scale):
+        calls.append("total")
+        if fail:
+            raise RuntimeError("boom")
+        return float(df["x"].sum()) * scale
+
+    return [
+        Stage("load", load),
+        Stage("double", double, inputs=["load"]),
+        Stage("total", total, inputs=["load"], params={"scale": scale}),
+    ]
+
+
+def test_run_pipeline_skips_unchanged_stages(calls, tmp_path):
+    results = run_pipeline(_stages(calls), str(tmp_path))
+    assert results["total"] == 6.0
+    assert results["double"]["a"]["x"].tolist() == [2.0, 4.0, 6.0]
+    assert sorted(calls) == ["double", "load", "total"]
+
+    calls.clear()
+    results = run_pipeline(_stages(calls), str(tmp_path))
+    assert calls == []
+    assert results["total"] == 6.0
+
+    run_pipeline(_stages(calls, scale=2), str(tmp_path))
+    assert calls == ["total"]
+
+
+def test_run_pipeline_keeps_checkpoints_after_failure(calls, tmp_path):
+    with pytest.raises(RuntimeError):
+        run_pipeline(_stages(calls, fail=True), str(tmp_path))
+
+    calls.clear()
+    run_pipeline(_stages(calls), str(tmp_path))
+    assert calls == ["total"]
+
+
+def test_select_stages_runs_only_the_target_and_its_inputs(calls, tmp_path):
+    stages = select_stages(_stages(calls), ["total"])
+    assert [stage.name for stage in stages] == ["load", "total"]
+    results = run_pipeline(stages, str(tmp_path))
+    assert sorted(results) == ["load", "total"]
+    assert sorted(calls) == ["load", "total"]
+
+    with pytest.raises(ValueError):
+        select_stages(_stages(calls), ["missing"])
+
+
+def test_fingerprint_follows_local_helpers(tmp_path, monkeypatch):
+    (tmp_path / "fp_helpers.py").write_text("def scale(x):\n    return x * 2\n")
+    (tmp_path / "fp_stages.py").write_text(
+        "from fp_helpers import scale\n\n\n"
+        "def stage(x):\n    return scale(x)\n\n\n"
+        "def lazy(x):\n    import fp_lazy\n\n    return fp_lazy.run(x)\n"
+    )
+    (tmp_path / "fp_lazy.py").write_text("def run(x):\n    return x\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    helpers = importlib.import_module("fp_helpers")
+    stages = importlib.import_module("fp_stages")
+    before = stage_fingerprint(Stage("s", stages.stage), [])
+    lazy_before = stage_fingerprint(Stage("s", stages.lazy), [])
+    assert stage_fingerprint(Stage("s", stages.stage), []) == before
+
+    (tmp_path / "fp_helpers.py").write_text("def scale(x):\n    return x * 2 + 1\n")
+    (tmp_path / "fp_lazy.py").write_text("def run(x):\n    return -x\n")
+    importlib.reload(helpers)
+    assert stage_fingerprint(Stage("s", stages.stage), []) != before
+    assert stage_fingerprint(Stage("s", stages.lazy), []) != lazy_before
+
+
+def test_missing_output_files_rerun_stage(calls, tmp_path):
+    chart = tmp_path / "chart.png"
+
+    def export():
+        calls.append("export")
+        chart.write_text("png")
+        return [str(chart)]
+
+    stages = [Stage("export", export)]
+    run_pipeline(stages, str(tmp_path / "artifacts"))
+    run_pipeline(stages, str(tmp_path / "artifacts"))
+    assert calls == ["export"]
+    os.remove(chart)
+    run_pipeline(stages, str(tmp_path / "artifacts"))
+    assert calls == ["export", "export"] and chart.exists()
@@ -0,0 +1,87 @@
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from src.correlation_analysis import calculate_correlation, calculate_correlation_matrix
+from src.data_processing import merge_stock_and_ratings
+from src.eda import export_stock_charts
+from src.indicator_engine import add_technical_indicators_panel
+from src.price_store import build_price_store
+
+
+@pytest.fixture
+def stock_data():
+    """Two tickers on partly overlapping trading days, one with a gap"""
+    rng = np.random.default_rng(4)
+    data = {}
+    for ticker, dates in [
+        ("AAA", pd.bdate_range("2020-01-01", periods=80)),
+        ("BBB", pd.bdate_range("2020-01-15", periods=60).delete(20)),
+    ]:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        data[ticker] = pd.DataFrame(
+            {
+                "date": dates,
+                "close": close,
+                "volume": rng.integers(1, 1000, len(dates)),
+            }
+        )
+    return add_technical_indicators_panel(data)
+
+
+@pytest.fixture
+def ratings():
+    rng = np.random.default_rng(5)
+    n = 200
+    return pd.DataFrame(
+        {
+            "date": pd.Timestamp("2020-01-01")
+            + pd.to_timedelta(rng.integers(0, 110 * 24, n), unit="h"),
+            "headline": [f"headline {i}" for i in range(n)],
+            "stock": rng.choice(["aaa", "BBB", "CCC"], n),
+            "Sentiment_Polarity": rng.normal(0, 0.3, n),
+        }
+    )
+
+
+def test_store_round_trip_and_views(stock_data, tmp_path):
+    store = build_price_store(stock_data, str(tmp_path / "store"))
+    assert list(store) == ["AAA", "BBB"]
+    for ticker, df in stock_data.items():
+        pd.testing.assert_frame_equal(store[ticker], df.reset_index(drop=True))
+
+    window = store.select(tickers=["AAA"], start="2020-02-03", end="2020-02-07")
+    close = window.column("AAA", "close")
+    assert isinstance(close, np.memmap) and len(close) == 5
+    assert window["AAA"]["date"].tolist() == list(pd.bdate_range("2020-02-03", periods=5))
+    assert window.panel("close").shape == (1, 5)
+
+    clone = pickle.loads(pickle.dumps(window))
+    assert len(pickle.dumps(window)) < 1000
+    np.testing.assert_array_equal(clone.column("AAA", "close"), close)
+
+
+@pytest.mark.parametrize("align", ["exact", "next_session"])
+def test_consumers_read_from_store(stock_data, ratings, tmp_path, align):
+    store = build_price_store(stock_data, str(tmp_path / "store"))
+
+    expected = merge_stock_and_ratings(stock_data, ratings, align=align)
+    merged = merge_stock_and_ratings(store, ratings, align=align)
+    pd.testing.assert_frame_equal(merged, expected)
+
+    exact = merge_stock_and_ratings(stock_data, ratings).dropna(subset=["Daily_Returns"])
+    direct = calculate_correlation(
+        exact.drop(columns="Daily_Returns"), price_store=store
+    )
+    assert direct == pytest.approx(calculate_correlation(exact))
+
+    pd.testing.assert_frame_equal(
+        calculate_correlation_matrix(exact, stock_data=store, max_lag=1),
+        calculate_correlation_matrix(exact, stock_data=stock_data, max_lag=1),
+    )
+
+
+def test_export_stock_charts_from_store(stock_data, tmp_path):
+    store = build_price_store(stock_data, str(tmp_path / "store"))
+    paths = export_stock_charts(store, str(tmp_path / "charts"), workers=2)
+    assert [p.split("/")[-1] for p in paths] == ["AAA.png", "BBB.png"]
@@ -0,0 +1,32 @@
+import json
+import pandas as pd
+from src import profiling
+from src.data_processing import merge_stock_and_ratings
+
+
+def test_instrument_records_stage_metrics(tmp_path):
+    stock_data = {
+        "AAA": pd.DataFrame({"date": pd.to_datetime(["2020-01-01"]), "close": [1.0]})
+    }
+    ratings = pd.DataFrame(
+        {"date": pd.to_datetime(["2020-01-01"]), "headline": ["a"], "stock": ["AAA"]}
+    )
+
+    profiling.enable_profiling(
+        capture=["merge_stock_and_ratings"], profile_dir=str(tmp_path)
+    )
+    try:
+        merge_stock_and_ratings(stock_data, ratings)
+    finally:
+        profiling.disable_profiling()
+
+    records = profiling.write_profile_report(str(tmp_path / "report.json"))
+    assert [r["stage"] for r in records] == ["merge_stock_and_ratings"]
+    assert records[0]["rows_in"] == 1 and records[0]["rows_out"] == 1
+    assert records[0]["wall_s"] > 0 and records[0]["process_peak_rss_mb"] > 0
+    assert 0 <= records[0]["peak_rss_growth_mb"] <= records[0]["process_peak_rss_mb"]
+    assert json.loads((tmp_path / "report.json").read_text()) == records
+    assert (tmp_path / "merge_stock_and_ratings.prof").exists()
+
+    merge_stock_and_ratings(stock_data, ratings)
+    assert len(profiling.profiling_records()) == 1
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.correlation_analysis import calculate_correlation
+from src.data_processing import merge_stock_and_ratings, merge_stock_and_rollup
+from src.price_store import build_price_store
+from src.sentiment_rollup import SentimentRollup, refresh_sentiment_rollup
+
+
+@pytest.fixture
+def scored():
+    rng = np.random.default_rng(11)
+    n = 400
+    return pd.DataFrame(
+        {
+            "date": pd.Timestamp("2020-01-01")
+            + pd.to_timedelta(rng.integers(0, 60 * 24, n), unit="h"),
+            "headline": [f"headline {i}" for i in range(n)],
+            "publisher": rng.choice(["Benzinga", "Reuters", "Zacks"], n),
+            "stock": rng.choice(["AAA", "bbb", "CCC"], n),
+            "Sentiment_Polarity": rng.uniform(-1, 1, n).round(2),
+        }
+    )
+
+
+@pytest.fixture
+def stock_data():
+    rng = np.random.default_rng(12)
+    data = {}
+    for ticker in ("AAA", "BBB"):
+        dates = pd.bdate_range("2020-01-01", periods=45)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        data[ticker] = pd.DataFrame(
+            {"date": dates, "close": close, "Daily_Returns": pd.Series(close).pct_change()}
+        )
+    return data
+
+
+def test_rollup_cells_match_headline_groupby(scored):
+    rollup = SentimentRollup.build(scored)
+    expected = (
+        scored.assign(
+            ticker=scored["stock"].str.upper(), trading_date=scored["date"].dt.normalize()
+        )
+        .groupby(["ticker", "trading_date", "publisher"])["Sentiment_Polarity"]
+        .agg(["count", "sum", "min", "max", "std"])
+        .reset_index()
+    )
+    table = rollup.daily(by=None)
+    assert rollup.table["count"].sum() == len(scored)
+    assert len(rollup) == len(expected)
+    np.testing.assert_allclose(rollup.table["sum"], expected["sum"])
+    np.testing.assert_allclose(rollup.table["max"], expected["max"])
+    daily = scored.groupby(scored["date"].dt.normalize())["Sentiment_Polarity"]
+    np.testing.assert_allclose(table["mean"], daily.mean())
+    np.testing.assert_allclose(table["std"], daily.std())
+    assert rollup.totals("publisher").sum() == len(scored)
+
+
+def test_incremental_update_matches_full_build(scored, tmp_path):
+    path = str(tmp_path / "rollup")
+    first = refresh_sentiment_rollup(scored.iloc[:250], path)
+    assert len(first.ledger) == 250
+    # Overlapping append: rows 200-249 were already ingested.
+    refreshed = refresh_sentiment_rollup(scored.iloc[200:], path, snapshot=False)
+    full = SentimentRollup.build(scored)
+    pd.testing.assert_frame_equal(refreshed.table, full.table)
+    loaded = SentimentRollup.load(path)
+    pd.testing.assert_frame_equal(loaded.table, full.table)
+    assert loaded.update(scored) == 0
+
+    rebuilt = refresh_sentiment_rollup(scored, path, align="next_session")
+    assert rebuilt.align == "next_session"
+    assert rebuilt.table["count"].sum() == len(scored)
+    with pytest.raises(FileNotFoundError):
+        SentimentRollup.load(str(tmp_path / "missing"))
+
+
+def test_refresh_retracts_rescored_and_removed_headlines(scored, tmp_path):
+    path = str(tmp_path / "rollup")
+    refresh_sentiment_rollup(scored, path)
+    changed = scored.drop(index=[3, 7]).copy()
+    changed.loc[[0, 1], "Sentiment_Polarity"] = -changed.loc[[0, 1], "Sentiment_Polarity"]
+    changed.loc[2, "Sentiment_Polarity"] = np.nan
+    refreshed = refresh_sentiment_rollup(changed, path)
+    full = SentimentRollup.build(changed)
+    pd.testing.assert_frame_equal(refreshed.table, full.table)
+    pd.testing.assert_frame_equal(SentimentRollup.load(path).table, full.table)
+    assert len(refreshed.ledger) == len(changed)
+    assert refreshed.update(changed, prune=True) == 0
+
+
+def test_merge_with_rollup_matches_headline_merge(scored, stock_data, tmp_path):
+    rollup = SentimentRollup.build(scored)
+    daily = merge_stock_and_rollup(stock_data, rollup)
+    merged = merge_stock_and_ratings(stock_data, scored)
+    expected = merged.groupby(["stock_name", "date"])["Sentiment_Polarity"].agg(
+        ["count", "mean"]
+    )
+    daily = daily.set_index(["stock_name", "date"]).loc[expected.index]
+    np.testing.assert_array_equal(daily["Headline_Count"], expected["count"])
+    np.testing.assert_allclose(daily["Sentiment_Polarity"], expected["mean"])
+
+    store = build_price_store(stock_data, str(tmp_path / "store"))
+    from_store = merge_stock_and_rollup(store, rollup)
+    assert from_store["Headline_Count"].sum() == expected["count"].sum()
+
+    # Weekend headlines reach the next session with 'next_session'.
+    session = merge_stock_and_rollup(
+        stock_data, SentimentRollup.build(scored, align="next_session")
+    )
+    assert session["Headline_Count"].sum() > expected["count"].sum()
+    assert session["date"].dt.dayofweek.max() < 5
+
+
+def test_correlation_from_rollup_matches_merged_frame(scored, stock_data, tmp_path):
+    rollup = SentimentRollup.build(scored)
+    merged = merge_stock_and_ratings(stock_data, scored).dropna(subset=["Daily_Returns"])
+    expected = calculate_correlation(merged)
+    assert calculate_correlation(None, rollup=rollup, stock_data=stock_data) == (
+        pytest.approx(expected)
+    )
+    store = build_price_store(stock_data, str(tmp_path / "store"))
+    assert calculate_correlation(None, rollup=rollup, price_store=store) == (
+        pytest.approx(expected)
+    )
+    with pytest.raises(ValueError):
+        calculate_correlation(None, rollup=rollup)
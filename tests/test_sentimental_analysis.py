@@ -1,6 +1,9 @@
 import pytest
+from src import sentimental_analysis
 from src.sentimental_analysis import (
+    SentimentCache,
     add_sentiment_analysis,
+    score_headlines,
 )
 import pandas as pd
 
@@ -31,3 +34,38 @@ def test_add_sentiment_analysis(sample_headlines):
     assert set(df["sentiment_category"]).issubset(
         {"positive", "negative", "neutral"}
     ), "Sentiment category values should be 'positive', 'negative', or 'neutral'"
+
+
+def test_sentiment_cache_reuses_scores(sample_headlines, tmp_path):
+    from textblob import TextBlob
+
+    headlines = pd.concat([sample_headlines["headline"]] * 2, ignore_index=True)
+    headlines[0] = "  Stock market   is up today!"
+    expected = [TextBlob(str(x)).sentiment.polarity for x in headlines]
+
+    cache = SentimentCache(str(tmp_path / "sentiment.sqlite"))
+    assert score_headlines(headlines, cache=cache).tolist() == expected
+    assert cache.stats() == {"hits": 0, "misses": 3, "hit_rate": 0.0}
+    cache.close()
+
+    cache = SentimentCache(str(tmp_path / "sentiment.sqlite"))
+    df = add_sentiment_analysis(pd.DataFrame({"headline": headlines}), cache=cache)
+    assert df["Sentiment_Polarity"].tolist() == expected
+    assert cache.stats()["hit_rate"] == 1.0
+    cache.close()
+
+
+def test_scorer_version_change_invalidates_cached_scores(tmp_path, monkeypatch):
+    cache = SentimentCache(str(tmp_path / "sentiment.sqlite"))
+    key = sentimental_analysis.headline_key("Great quarter", scorer="lexicon")
+    cache.put_many({key: 0.99})
+    assert score_headlines(["Great quarter"], cache=cache, backend="lexicon")[0] == 0.99
+
+    versions = dict(sentimental_analysis.SCORER_VERSIONS)
+    versions["lexicon"] += 1
+    monkeypatch.setattr(sentimental_analysis, "SCORER_VERSIONS", versions)
+    assert sentimental_analysis.headline_key("Great quarter", scorer="lexicon") != key
+    rescored = score_headlines(["Great quarter"], cache=cache, backend="lexicon")
+    assert rescored[0] != 0.99
+    assert cache.stats()["misses"] == 1
+    cache.close()
@@ -0,0 +1,42 @@
+import pytest
+from benchmarks import startup_time
+from benchmarks.startup_time import measure_command, measure_startup, parse_importtime
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        300 |   numpy.core\n"
+        "import time:       200 |        500 | numpy\n"
+        "import time:        50 |         50 | json\n"
+    )
+    assert parse_importtime(stderr) == (0.55, {"numpy", "json"})
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        None,
+        "run",
+        "load",
+        "sentiment",
+        "indicators",
+        "merge",
+        "correlate",
+        "report",
+        "live",
+        "serve",
+    ],
+)
+def test_subcommands_do_not_import_heavy_dependencies(command):
+    assert measure_startup(command)["heavy_modules"] == []
+
+
+def test_command_runs_reach_lazy_imports(monkeypatch):
+    assert measure_command("load")["heavy_modules"] == []
+    indicators = measure_command("indicators")
+    assert indicators["heavy_modules"] == ["talib"]
+    assert indicators["unexpected_modules"] == []
+
+    monkeypatch.setitem(startup_time.COMMAND_HEAVY_MODULES, "indicators", ())
+    assert measure_command("indicators")["unexpected_modules"] == ["talib"]